@@ -0,0 +1,282 @@
+import csv
+import io
+import json
+import os
+import logging
+import tempfile
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from app.infra.db import get_conn
+from app.screening.matching import normalize_query, prefilter_key
+
+logger = logging.getLogger(__name__)
+
+# Bulk onboarding of monitors and watchlist entries (sql/014_import_jobs.sql).
+# The request body is streamed to a temp file and a job id returned right
+# away; a background task then reads it row by row, validates and normalizes
+# each row, skips names the client already has (or repeats in the file) and
+# COPYs the rest in chunks of CHUNK_ROWS, one commit and progress update per
+# chunk. A job that fails midway keeps the chunks it committed.
+#
+# CSV needs a header with an entity_name column (entity_type optional);
+# NDJSON needs one {"entity_name": ..., "entity_type": ...} object per line.
+
+CHUNK_ROWS = int(os.getenv("IMPORT_CHUNK_ROWS", "5000"))
+MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(100 * 1024 * 1024)))
+MAX_NAME_LENGTH = 500
+MAX_REPORTED_ERRORS = 100
+
+FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+class ImportRejected(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass(frozen=True)
+class Target:
+    table: str
+    default_entity_type: str
+    columns: tuple
+    active: str                 # SQL condition for the rows a new one would duplicate
+
+    def row(self, client_id: str, entity_name: str, entity_type: str, now: datetime) -> tuple:
+        key = prefilter_key(entity_name)
+        if self.table == "monitored_entities":
+            return (str(uuid.uuid4()), client_id, entity_name, entity_type, "active", key, now, now)
+        return (client_id, entity_name, entity_type, key, now)
+
+
+TARGETS = {
+    "monitor": Target(
+        "monitored_entities", "individual",
+        ("id", "client_id", "entity_name", "entity_type", "status", "match_key", "created_at", "updated_at"),
+        "status = 'active'",
+    ),
+    "watchlist": Target(
+        "watchlist", "unknown",
+        ("client_id", "entity_name", "entity_type", "match_key", "added_at"),
+        "is_active = TRUE",
+    ),
+}
+
+
+# ---------------------------
+# Upload
+# ---------------------------
+
+def upload_format(content_type: str | None) -> str:
+    fmt = FORMATS.get((content_type or "").split(";")[0].strip().lower())
+    if fmt is None:
+        raise ImportRejected(415, f"Content-Type must be one of: {', '.join(FORMATS)}")
+    return fmt
+
+
+async def start_import(request, target: str, client_id: str) -> tuple[dict, str]:
+    """Spool the request body and record a queued job. Returns (job, spool path)."""
+    fmt = upload_format(request.headers.get("content-type"))
+    received = 0
+    spool = tempfile.NamedTemporaryFile(prefix="import-", suffix=f".{fmt}", delete=False)
+    try:
+        with spool:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > MAX_BYTES:
+                    raise ImportRejected(413, f"Upload larger than {MAX_BYTES} bytes")
+                spool.write(chunk)
+        if received == 0:
+            raise ImportRejected(400, "Empty upload")
+
+        job_id = str(uuid.uuid4())
+        conn = get_conn()
+        cur = conn.cursor()
+        try:
+            cur.execute("""
+                INSERT INTO import_jobs (job_id, client_id, target, format, bytes_received)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (job_id, client_id, target, fmt, received))
+            conn.commit()
+        finally:
+            cur.close()
+            conn.close()
+    except BaseException:
+        os.unlink(spool.name)
+        raise
+
+    job = {"job_id": job_id, "target": target, "format": fmt, "status": "queued", "bytes_received": received}
+    return job, spool.name
+
+
+# ---------------------------
+# Parsing
+# ---------------------------
+
+def read_rows(path: str, fmt: str):
+    """Yield (line, record dict | None, error | None) for every row of the upload."""
+    with open(path, encoding="utf-8-sig", errors="replace", newline="") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            fields = [(h or "").strip().lower() for h in (reader.fieldnames or [])]
+            if "entity_name" not in fields:
+                raise ValueError("CSV header must include an entity_name column")
+            reader.fieldnames = fields
+            for record in reader:
+                yield reader.line_num, record, None
+            return
+
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line_no, None, "invalid JSON"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "expected a JSON object"
+                continue
+            yield line_no, record, None
+
+
+def normalize_row(record: dict, default_entity_type: str) -> tuple[str, str]:
+    """(entity_name, entity_type) as the single-entity endpoints would store them, or ValueError."""
+    raw_name = record.get("entity_name")
+    entity_name = " ".join(str(raw_name).split()) if raw_name is not None else ""
+    if not entity_name:
+        raise ValueError("entity_name is required")
+    if len(entity_name) > MAX_NAME_LENGTH:
+        raise ValueError(f"entity_name longer than {MAX_NAME_LENGTH} characters")
+    entity_type = " ".join(str(record.get("entity_type") or "").split()).lower() or default_entity_type
+    return entity_name, entity_type
+
+
+# ---------------------------
+# Import
+# ---------------------------
+
+def copy_rows(cur, target: Target, rows: list):
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+    cur.copy_expert(
+        f"COPY {target.table} ({', '.join(target.columns)}) FROM STDIN WITH (FORMAT csv)", buf
+    )
+
+
+def run_import(job: dict, path: str, client_id: str):
+    """Background task: validate and COPY a spooled upload, recording progress on the job."""
+    target = TARGETS[job["target"]]
+    job_id = job["job_id"]
+    counts = {"rows_read": 0, "rows_imported": 0, "rows_duplicate": 0, "rows_rejected": 0}
+    errors = []
+    committed = 0
+    conn = get_conn()
+    cur = conn.cursor()
+
+    def progress(status: str, error: str | None = None):
+        cur.execute("""
+            UPDATE import_jobs
+            SET status = %s, rows_read = %s, rows_imported = %s, rows_duplicate = %s,
+                rows_rejected = %s, errors = %s, error = %s,
+                completed_at = CASE WHEN %s IN ('done', 'failed') THEN NOW() END
+            WHERE job_id = %s
+        """, (status, counts["rows_read"], counts["rows_imported"], counts["rows_duplicate"],
+              counts["rows_rejected"], json.dumps(errors), error, status, job_id))
+
+    try:
+        progress("running")
+        cur.execute(f"""
+            SELECT entity_name, entity_type FROM {target.table}
+            WHERE client_id = %s AND {target.active}
+        """, (client_id,))
+        seen = {(normalize_query(name), entity_type) for name, entity_type in cur.fetchall()}
+        conn.commit()
+
+        chunk = []
+        for line, record, error in read_rows(path, job["format"]):
+            counts["rows_read"] += 1
+            if error is None:
+                try:
+                    entity_name, entity_type = normalize_row(record, target.default_entity_type)
+                except ValueError as e:
+                    error = str(e)
+            if error is not None:
+                counts["rows_rejected"] += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line, "error": error})
+                continue
+
+            key = (normalize_query(entity_name), entity_type)
+            if key in seen:
+                counts["rows_duplicate"] += 1
+                continue
+            seen.add(key)
+            chunk.append(target.row(client_id, entity_name, entity_type, datetime.now(timezone.utc)))
+
+            if len(chunk) >= CHUNK_ROWS:
+                copy_rows(cur, target, chunk)
+                counts["rows_imported"] += len(chunk)
+                chunk = []
+                progress("running")
+                conn.commit()
+                committed = counts["rows_imported"]
+
+        if chunk:
+            copy_rows(cur, target, chunk)
+            counts["rows_imported"] += len(chunk)
+        progress("done")
+        conn.commit()
+        logger.info(f"Import {job_id} into {target.table} done: {counts}")
+
+    except Exception as e:
+        conn.rollback()
+        counts["rows_imported"] = committed
+        logger.error(f"Import {job_id} failed: {str(e)}")
+        progress("failed", str(e))
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+        os.unlink(path)
+
+
+def get_job(job_id: str, client_id: str, target: str) -> dict | None:
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT job_id, target, format, status, bytes_received, rows_read, rows_imported,
+                   rows_duplicate, rows_rejected, errors, error, created_at, completed_at
+            FROM import_jobs
+            WHERE job_id::text = %s AND client_id = %s AND target = %s
+        """, (job_id, client_id, target))
+        row = cur.fetchone()
+    finally:
+        cur.close()
+        conn.close()
+    if not row:
+        return None
+    return {
+        "job_id": str(row[0]),
+        "target": row[1],
+        "format": row[2],
+        "status": row[3],
+        "bytes_received": row[4],
+        "rows_read": row[5],
+        "rows_imported": row[6],
+        "rows_duplicate": row[7],
+        "rows_rejected": row[8],
+        "errors": row[9],
+        "error": row[10],
+        "created_at": row[11].isoformat(),
+        "completed_at": row[12].isoformat() if row[12] else None,
+    }
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import uuid
+from datetime import datetime, timezone
+
+# Transaction-scoped advisory lock serialising appends, so concurrent writers
+# cannot both chain onto the same previous_hash.
+LEDGER_LOCK_ID = 360_001
+
+
+def get_latest_event_hash(cur) -> str | None:
+    """Fetch the most recent event_hash to use as previous_hash in the chain."""
+    cur.execute("""
+        SELECT event_hash FROM events
+        WHERE event_hash IS NOT NULL
+        ORDER BY created_at DESC, event_id DESC
+        LIMIT 1
+    """)
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def compute_event_hash(
+    event_id: str,
+    event_type: str,
+    aggregate_type: str,
+    aggregate_id: str,
+    actor_type: str,
+    actor_id: str,
+    payload: dict,
+    created_at: str,
+    previous_hash: str | None,
+) -> str:
+    """
+    SHA-256 hash of this event's core fields plus the previous event's hash.
+    Including previous_hash links this record to the chain — any alteration
+    of a prior record breaks all subsequent hashes.
+    """
+    canonical = json.dumps(
+        {
+            "event_id": event_id,
+            "event_type": event_type,
+            "aggregate_type": aggregate_type,
+            "aggregate_id": aggregate_id,
+            "actor_type": actor_type,
+            "actor_id": actor_id,
+            "payload": payload,
+            "created_at": created_at,
+            "previous_hash": previous_hash,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return hashlib.sha256(canonical).hexdigest()
+
+
+def append_event(
+    cur,
+    event_type: str,
+    aggregate_type: str,
+    aggregate_id: str,
+    actor_type: str,
+    actor_id: str,
+    payload: dict,
+) -> str:
+    """
+    Append a hash-chained event in the caller's transaction. Returns the event_id.
+    Holds the ledger lock until the caller commits, so commit promptly.
+    """
+    cur.execute("SELECT pg_advisory_xact_lock(%s)", (LEDGER_LOCK_ID,))
+    event_id = str(uuid.uuid4())
+    # created_at is stored as hashed, not left to the column default: NOW() is
+    # fixed per transaction, which would tie every event appended in one.
+    now = datetime.now(timezone.utc)
+    previous_hash = get_latest_event_hash(cur)
+    event_hash = compute_event_hash(
+        event_id=event_id,
+        event_type=event_type,
+        aggregate_type=aggregate_type,
+        aggregate_id=aggregate_id,
+        actor_type=actor_type,
+        actor_id=actor_id,
+        payload=payload,
+        created_at=now.isoformat(),
+        previous_hash=previous_hash,
+    )
+    cur.execute("""
+        INSERT INTO events (event_id, event_type, aggregate_type, aggregate_id, actor_type, actor_id, payload, created_at, event_hash, previous_hash)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, (event_id, event_type, aggregate_type, aggregate_id, actor_type, actor_id,
+          json.dumps(payload), now, event_hash, previous_hash))
+    return event_id
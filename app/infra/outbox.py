@@ -0,0 +1,69 @@
+import hashlib
+import hmac
+import json
+import os
+
+# Webhook outbox (sql/010_webhook_outbox.sql). Producers enqueue alerts in the
+# transaction that produced them; scripts/webhook_dispatcher.py delivers them.
+#
+# Webhooks registered with a batch window get one delivery per window holding
+# every alert queued during it (sql/011_webhook_batching.sql), each alert still
+# with its own receipt_id.
+
+BATCH_MAX_CHANGES = int(os.getenv("WEBHOOK_BATCH_MAX_CHANGES", "1000"))
+
+
+def enqueue_webhooks(cur, client_id: str, event_type: str, payload: dict) -> int:
+    """Queue `payload` for every active webhook of the client. Returns the number of webhooks it was queued for."""
+    cur.execute("""
+        INSERT INTO webhook_outbox (webhook_id, client_id, endpoint_url, event_type, payload)
+        SELECT id, client_id, endpoint_url, %s, %s
+        FROM webhooks
+        WHERE client_id = %s AND is_active = TRUE AND batch_window_seconds IS NULL
+    """, (event_type, json.dumps(payload), client_id))
+    queued = cur.rowcount
+
+    cur.execute("""
+        SELECT id, endpoint_url, batch_window_seconds
+        FROM webhooks
+        WHERE client_id = %s AND is_active = TRUE AND batch_window_seconds IS NOT NULL
+    """, (client_id,))
+    for webhook_id, endpoint_url, window_seconds in cur.fetchall():
+        append_to_batch(cur, webhook_id, client_id, endpoint_url, event_type, payload, window_seconds)
+        queued += 1
+    return queued
+
+
+def append_to_batch(cur, webhook_id: int, client_id: str, endpoint_url: str, event_type: str,
+                    payload: dict, window_seconds: int):
+    """Add `payload` to the webhook's open batch of `event_type`, opening one if there is none."""
+    batch_type = f"{event_type}_batch"
+    cur.execute("""
+        UPDATE webhook_outbox
+        SET payload = jsonb_set(payload, '{changes}', payload->'changes' || jsonb_build_array(%s::jsonb))
+        WHERE id = (
+            SELECT id FROM webhook_outbox
+            WHERE webhook_id = %s AND event_type = %s
+              AND coalesce_until > NOW()
+              AND jsonb_array_length(payload->'changes') < %s
+            ORDER BY id DESC
+            LIMIT 1
+        )
+          AND coalesce_until > NOW()
+    """, (json.dumps(payload), webhook_id, batch_type, BATCH_MAX_CHANGES))
+    if cur.rowcount:
+        return
+    cur.execute("""
+        INSERT INTO webhook_outbox
+          (webhook_id, client_id, endpoint_url, event_type, payload, coalesce_until, next_attempt_at)
+        VALUES (%s, %s, %s, %s, %s,
+                NOW() + make_interval(secs => %s), NOW() + make_interval(secs => %s))
+    """, (webhook_id, client_id, endpoint_url, batch_type,
+          json.dumps({"event": batch_type, "window_seconds": window_seconds, "changes": [payload]}),
+          window_seconds, window_seconds))
+
+
+def sign(secret: str, timestamp: int, body: str) -> str:
+    """X-Webhook-Signature value: HMAC-SHA256 of "<timestamp>.<body>" with the webhook's secret."""
+    digest = hmac.new(secret.encode(), f"{timestamp}.{body}".encode(), hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
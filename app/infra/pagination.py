@@ -0,0 +1,50 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from fastapi import Response
+
+# Keyset pagination for list endpoints. Rows come newest first by
+# (timestamp, id); the cursor is the last row's pair, opaque to clients, and
+# the next page is the rows strictly before it. The body stays a JSON array
+# (as before pagination) and the cursor is returned in X-Next-Cursor, absent
+# on the last page.
+#
+# List queries build each row's JSON in Postgres (json_build_object(...)::text)
+# so a page is joined as text rather than built into models and re-encoded.
+
+MAX_PAGE_SIZE = 1000
+
+
+def page_size(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(sort_value, row_id) -> str:
+    raw = json.dumps([sort_value.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, id_type=uuid.UUID) -> tuple[str, str]:
+    """
+    (timestamp, id) of a cursor from encode_cursor, or ValueError. id_type is
+    the table's id type (uuid.UUID, or int for serial ids).
+    """
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        datetime.fromisoformat(sort_value)
+        row_id = id_type(str(row_id))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return sort_value, str(row_id)
+
+
+def page_response(rows: list, limit: int) -> Response:
+    """rows: (sort_value, id, row_json) - up to limit + 1, the extra one only signalling a next page."""
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1][0], rows[-1][1])
+    body = "[" + ",".join(r[2] for r in rows) + "]"
+    return Response(content=body, media_type="application/json", headers=headers)
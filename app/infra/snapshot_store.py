@@ -0,0 +1,181 @@
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+
+import zstandard
+
+# Content-addressed, zstd-compressed, write-once store for raw list snapshots.
+# Postgres keeps only the content hash and the relative path returned by put().
+
+STORE_DIR = os.getenv(
+    "SNAPSHOT_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "snapshots"),
+)
+ZSTD_LEVEL = int(os.getenv("SNAPSHOT_ZSTD_LEVEL", "10"))
+CHUNK_SIZE = 1024 * 1024
+
+
+class SnapshotIntegrityError(Exception):
+    """Raised when stored bytes do not hash to the content hash they are filed under."""
+
+
+def relative_path(content_hash: str) -> str:
+    return os.path.join("sha256", content_hash[:2], f"{content_hash}.zst")
+
+
+def full_path(store_path: str) -> str:
+    return os.path.join(STORE_DIR, store_path)
+
+
+class SnapshotReader(io.RawIOBase):
+    """
+    Streaming, read-only view of a stored snapshot (decompressed on the fly from
+    a memory-mapped file). Every byte handed out is hashed; hexdigest() drains the
+    remainder and returns the sha256 of the full snapshot.
+    """
+
+    def __init__(self, stream, closers=()):
+        self._stream = stream
+        self._closers = list(closers)
+        self._digest = hashlib.sha256()
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self._stream.read(len(b))
+        n = len(data)
+        b[:n] = data
+        self._digest.update(data)
+        return n
+
+    def hexdigest(self) -> str:
+        while True:
+            data = self._stream.read(CHUNK_SIZE)
+            if not data:
+                break
+            self._digest.update(data)
+        return self._digest.hexdigest()
+
+    def close(self):
+        if not self.closed:
+            for c in self._closers:
+                c.close()
+        super().close()
+
+
+def open_bytes(raw: bytes) -> SnapshotReader:
+    """Wrap inline (legacy, in-database) snapshot bytes in the same reader interface."""
+    return SnapshotReader(io.BytesIO(raw))
+
+
+def open_snapshot(store_path: str) -> SnapshotReader:
+    f = open(full_path(store_path), "rb")
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except Exception:
+        f.close()
+        raise
+    stream = zstandard.ZstdDecompressor().stream_reader(mm)
+    return SnapshotReader(stream, closers=(stream, mm, f))
+
+
+def verify(store_path: str, content_hash: str) -> bool:
+    """Stream the stored snapshot once and check it against its content hash."""
+    with open_snapshot(store_path) as reader:
+        return reader.hexdigest() == content_hash
+
+
+def lock(store_path: str, content_hash: str):
+    """
+    Confirm the WORM lock on a stored snapshot: read-only on disk and hashing to
+    its content hash. Raises SnapshotIntegrityError otherwise.
+    """
+    if os.stat(full_path(store_path)).st_mode & 0o222:
+        raise SnapshotIntegrityError(f"Stored snapshot {store_path} is writable")
+    if not verify(store_path, content_hash):
+        raise SnapshotIntegrityError(f"Stored snapshot {store_path} failed hash verification")
+
+
+def put(source, content_hash: str, locked: bool = True) -> str:
+    """
+    Write a snapshot from a readable binary stream, compressed, under its content hash.
+
+    Write-once: an existing object is never overwritten, only re-verified.
+    Unless `locked=False` (the caller runs lock() itself), the stored object is
+    verified by reading it back before the path is returned.
+    """
+    store_path = relative_path(content_hash)
+    full = full_path(store_path)
+
+    if not os.path.exists(full):
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(full), suffix=".tmp")
+        digest = hashlib.sha256()
+        try:
+            with os.fdopen(fd, "wb") as out:
+                compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+                with compressor.stream_writer(out, closefd=False) as writer:
+                    while True:
+                        chunk = source.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        digest.update(chunk)
+                        writer.write(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+
+            if digest.hexdigest() != content_hash:
+                raise SnapshotIntegrityError(
+                    f"Snapshot bytes hash to {digest.hexdigest()}, expected {content_hash}"
+                )
+
+            os.chmod(tmp, 0o444)
+            try:
+                os.link(tmp, full)
+            except FileExistsError:
+                pass  # a concurrent writer stored the same content first
+        finally:
+            os.unlink(tmp)
+
+    if locked:
+        lock(store_path, content_hash)
+
+    return store_path
+
+
+def put_derived(store_path: str, write) -> str:
+    """
+    Store uncompressed derived bytes (e.g. a parsed artifact) write-once at
+    `store_path`. write(out) streams them into a binary file and returns their
+    sha256, which is returned. An existing file must already hash to it.
+    """
+    full = full_path(store_path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(full), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            content_hash = write(out)
+            out.flush()
+            os.fsync(out.fileno())
+        if not os.path.exists(full):
+            os.chmod(tmp, 0o444)
+            try:
+                os.link(tmp, full)
+            except FileExistsError:
+                pass
+    finally:
+        os.unlink(tmp)
+
+    digest = hashlib.sha256()
+    with open(full, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    if digest.hexdigest() != content_hash:
+        raise SnapshotIntegrityError(f"Stored file {store_path} failed hash verification")
+    return content_hash
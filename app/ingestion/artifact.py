@@ -0,0 +1,283 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+
+from app.infra import snapshot_store
+
+# Pre-parsed columnar artifact derived from one raw snapshot.
+#
+# Layout (little-endian):
+#   MAGIC | u32 header length | header JSON | column sections (8-byte aligned)
+#
+# "str" columns are an offsets section (u64 x count+1) plus a data section of
+# UTF-8 values joined by NUL, so a whole column decodes with one decode+split
+# and single values are a slice away. "sha256" columns are fixed 32-byte digests.
+#
+# The raw snapshot stays the source of truth: the header names the snapshot hash
+# it was derived from, the artifact is stored write-once under that hash, and its
+# own sha256 is recorded in ingestion_snapshots and checked on every open.
+
+MAGIC = b"MICCOL1\n"
+FORMAT_VERSION = 2
+
+COLUMNS = {
+    "key": "str",
+    "row_hash": "sha256",
+    "name": "str",
+    "first_name": "str",
+    "last_name": "str",
+    "entity_type": "str",
+    "programs": "str",
+}
+
+
+class ArtifactError(Exception):
+    """Raised when an artifact is malformed or does not match what it claims to be."""
+
+
+def relative_path(source: str, snapshot_hash: str) -> str:
+    return f"artifacts/{source}/{snapshot_hash[:2]}/{snapshot_hash}.v{FORMAT_VERSION}.col"
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class ArtifactWriter:
+    """
+    Collects one row per entry (in snapshot order) and serializes the columns.
+    Each column is spooled to its own temp file as rows arrive, so memory stays
+    flat however large the list; write() then streams the sections out.
+    """
+
+    OFFSETS_FLUSH = 65536
+
+    def __init__(self, source: str):
+        self.source = source
+        self.count = 0
+        self._dir = tempfile.TemporaryDirectory(prefix="artifact-")
+        self._data = {c: open(os.path.join(self._dir.name, f"{c}.data"), "wb+") for c in COLUMNS}
+        self._offsets = {
+            c: open(os.path.join(self._dir.name, f"{c}.offsets"), "wb+") for c, kind in COLUMNS.items() if kind == "str"
+        }
+        self._pending = {c: array("Q", [0]) for c in self._offsets}
+        self._pos = {c: 0 for c in self._offsets}
+        if array("Q").itemsize != 8:
+            raise ArtifactError("unsupported platform: array('Q') is not 64-bit")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for f in (*self._data.values(), *self._offsets.values()):
+            f.close()
+        self._dir.cleanup()
+
+    def append(self, key: str, row_hash: str, name: str, first_name: str, last_name: str,
+               entity_type: str, programs: str):
+        row = {
+            "key": key, "row_hash": row_hash, "name": name, "first_name": first_name,
+            "last_name": last_name, "entity_type": entity_type, "programs": programs,
+        }
+        for column, kind in COLUMNS.items():
+            value = row[column]
+            if kind == "sha256":
+                self._data[column].write(bytes.fromhex(value))
+                continue
+            encoded = (value or "").replace("\0", "").encode("utf-8") + b"\0"
+            self._data[column].write(encoded)
+            self._pos[column] += len(encoded)
+            pending = self._pending[column]
+            pending.append(self._pos[column])
+            if len(pending) >= self.OFFSETS_FLUSH:
+                self._offsets[column].write(pending.tobytes())
+                del pending[:]
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def _sections(self) -> list:
+        """(column, part, file, length) in file order."""
+        sections = []
+        for column, kind in COLUMNS.items():
+            if kind == "sha256":
+                sections.append((column, "data", self._data[column], 32 * self.count))
+                continue
+            offsets = self._offsets[column]
+            offsets.write(self._pending[column].tobytes())
+            del self._pending[column][:]
+            sections.append((column, "offsets", offsets, 8 * (self.count + 1)))
+            sections.append((column, "data", self._data[column], self._pos[column]))
+        return sections
+
+    def write(self, snapshot_hash: str, out) -> str:
+        """Stream the artifact into binary file `out`. Returns its sha256. Call once."""
+        sections = self._sections()
+
+        # The header carries absolute section positions, which depend on the header's
+        # own length; repeat the layout until that length stops changing.
+        layout = {}
+        header = b""
+        while True:
+            header_len = len(header)
+            pos = _align(len(MAGIC) + 4 + header_len)
+            layout = {}
+            for column, part, _, length in sections:
+                layout.setdefault(column, {"kind": COLUMNS[column]})[part] = [pos, length]
+                pos = _align(pos + length)
+            header = json.dumps({
+                "format": FORMAT_VERSION,
+                "source": self.source,
+                "snapshot_hash": snapshot_hash,
+                "count": self.count,
+                "columns": layout,
+            }, sort_keys=True, separators=(",", ":")).encode("utf-8")
+            if len(header) == header_len:
+                break
+
+        digest = hashlib.sha256()
+
+        def emit(data: bytes):
+            digest.update(data)
+            out.write(data)
+
+        written = 0
+        for data in (MAGIC, struct.pack("<I", len(header)), header):
+            emit(data)
+            written += len(data)
+        for column, part, f, length in sections:
+            start = layout[column][part][0]
+            if start < written:
+                raise ArtifactError("artifact layout overlap")
+            emit(b"\0" * (start - written))
+            f.flush()
+            f.seek(0)
+            copied = 0
+            while chunk := f.read(snapshot_store.CHUNK_SIZE):
+                emit(chunk)
+                copied += len(chunk)
+            if copied != length:
+                raise ArtifactError(f"artifact column {column}/{part}: {copied} bytes, expected {length}")
+            written = start + length
+        return digest.hexdigest()
+
+
+class Artifact:
+    """Read-only, memory-mapped view of an artifact file."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ArtifactError(f"{path}: not a columnar artifact")
+        (header_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = json.loads(self._mm[start:start + header_len])
+        if self.header.get("format") != FORMAT_VERSION:
+            self.close()
+            raise ArtifactError(f"{path}: format {self.header.get('format')}, expected {FORMAT_VERSION}")
+        self.count = self.header["count"]
+        self.snapshot_hash = self.header["snapshot_hash"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if not self._mm.closed:
+            self._mm.close()
+        self._file.close()
+
+    def hexdigest(self) -> str:
+        return hashlib.sha256(self._mm).hexdigest()
+
+    def verify(self, artifact_hash: str, snapshot_hash: str):
+        """Check the file against its recorded hash and its link to the raw snapshot."""
+        if self.snapshot_hash != snapshot_hash:
+            raise ArtifactError(f"artifact derived from {self.snapshot_hash}, expected {snapshot_hash}")
+        if self.hexdigest() != artifact_hash:
+            raise ArtifactError("artifact failed hash verification")
+
+    def _section(self, column: str, part: str) -> bytes:
+        start, length = self.header["columns"][column][part]
+        return self._mm[start:start + length]
+
+    def offsets(self, column: str) -> array:
+        offsets = array("Q")
+        offsets.frombytes(self._section(column, "offsets"))
+        return offsets
+
+    def values(self, column: str) -> list:
+        """Whole column decoded: str values, or hex digests for sha256 columns."""
+        data = self._section(column, "data")
+        if COLUMNS[column] == "sha256":
+            h = data.hex()
+            return [h[i:i + 64] for i in range(0, len(h), 64)]
+        if not self.count:
+            return []
+        return data[:-1].decode("utf-8").split("\0")
+
+    def value(self, column: str, i: int) -> str:
+        start, _ = self.header["columns"][column]["data"]
+        if COLUMNS[column] == "sha256":
+            return self._mm[start + 32 * i:start + 32 * (i + 1)].hex()
+        offsets = self.offsets(column)
+        return self._mm[start + offsets[i]:start + offsets[i + 1] - 1].decode("utf-8")
+
+
+def build(connector, stream) -> ArtifactWriter:
+    """Parse a raw snapshot stream with `connector` into a filled writer (close it when done)."""
+    writer = ArtifactWriter(connector.source)
+    try:
+        seen = set()
+        for key, row_hash, record in connector.entries(stream):
+            if key in seen:
+                continue
+            seen.add(key)
+            writer.append(key, row_hash, *connector.artifact_fields(record))
+    except Exception:
+        writer.close()
+        raise
+    return writer
+
+
+class _Discard:
+    def write(self, data):
+        pass
+
+
+def digest(writer: ArtifactWriter, snapshot_hash: str) -> str:
+    """sha256 of the artifact `writer` would store, without storing it."""
+    return writer.write(snapshot_hash, _Discard())
+
+
+def save(writer: ArtifactWriter, snapshot_hash: str) -> tuple[str, str]:
+    """Store an artifact write-once next to its snapshot. Returns (store_path, artifact_hash)."""
+    store_path = relative_path(writer.source, snapshot_hash)
+    artifact_hash = snapshot_store.put_derived(store_path, lambda out: writer.write(snapshot_hash, out))
+    return store_path, artifact_hash
+
+
+def open_verified(store_path: str, artifact_hash: str, snapshot_hash: str) -> Artifact:
+    artifact = Artifact(snapshot_store.full_path(store_path))
+    try:
+        artifact.verify(artifact_hash, snapshot_hash)
+    except Exception:
+        artifact.close()
+        raise
+    return artifact
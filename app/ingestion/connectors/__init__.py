@@ -0,0 +1,10 @@
+from app.ingestion.connectors.bis import BisDplConnector
+from app.ingestion.connectors.ofac import OfacConsolidatedConnector, OfacSdnConnector, OfacSsiConnector
+
+OFAC_SDN = OfacSdnConnector()
+OFAC_CONSOLIDATED = OfacConsolidatedConnector()
+OFAC_SSI = OfacSsiConnector()
+BIS_DPL = BisDplConnector()
+
+# Every list the pipeline ingests, by source. Adding a list = adding a connector here.
+CONNECTORS = {c.source: c for c in (OFAC_SDN, OFAC_CONSOLIDATED, OFAC_SSI, BIS_DPL)}
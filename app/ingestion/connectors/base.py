@@ -0,0 +1,51 @@
+from app.ingestion.loader import delete_rows, delete_rows_except
+
+DEFAULT_INTERVAL_SECONDS = 4 * 60 * 60  # 4 hours
+
+
+class Connector:
+    """
+    Everything the ingestion pipeline needs to know about one list.
+
+    The pipeline (app/ingestion/pipeline.py) owns Fetch, Snapshot, Hash, Lock,
+    Version, Activate and Log. A connector only says where the list lives, how
+    to parse a snapshot into entries (Parse) and how to write entries to its
+    serving table (Serve).
+    """
+
+    source = ""            # ingestion_versions.source / aggregate_id of ledger events
+    label = ""             # human-readable name for logs and event messages
+    url = ""
+    headers = None
+    timeout = 120
+    verify = True
+    actor_id = ""          # ledger actor for this list's ingestion events
+    table = ""             # serving table
+    key_column = ""        # serving table column holding the entry key
+    interval_seconds = DEFAULT_INTERVAL_SECONDS
+
+    @property
+    def event_type(self) -> str:
+        return f"{self.source}_ingestion"
+
+    def entries(self, stream):
+        """Yield (entry_key, row_hash, record) for each entry of a binary snapshot stream."""
+        raise NotImplementedError
+
+    def manifest(self, stream) -> dict:
+        """{entry_key: row_hash} for a snapshot; what the next version is diffed against."""
+        return {key: row_hash for key, row_hash, _ in self.entries(stream)}
+
+    def artifact_fields(self, record) -> tuple[str, str, str, str, str]:
+        """(name, first_name, last_name, entity_type, programs) artifact columns for one record."""
+        raise NotImplementedError
+
+    def upsert(self, cur, entries, ingested_at) -> int:
+        """Write added/modified (entry_key, record) pairs to the serving table. Returns rows written."""
+        raise NotImplementedError
+
+    def delete(self, cur, keys) -> int:
+        return delete_rows(cur, self.table, self.key_column, keys)
+
+    def delete_except(self, cur, keys) -> int:
+        return delete_rows_except(cur, self.table, self.key_column, keys)
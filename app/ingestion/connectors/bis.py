@@ -0,0 +1,64 @@
+import io
+from datetime import datetime
+
+from app.ingestion.connectors.base import Connector
+from app.ingestion.fetch import decode_text
+from app.ingestion.loader import insert_dpl_rows
+from app.ingestion.parsers import iter_dpl_rows
+
+
+def parse_date(s):
+    s = s.strip()
+    if not s:
+        return None
+    for fmt in ("%m/%d/%Y", "%m/%d/%y"):
+        try:
+            return datetime.strptime(s, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+class BisDplConnector(Connector):
+    """
+    BIS Denied Persons List (tab/CSV text). Rows have no stable id, so each is
+    keyed by its row_hash: an edited row shows up as one removal plus one addition.
+    """
+
+    source = "bis_dpl"
+    label = "BIS DPL"
+    url = "https://media.bis.gov/sites/default/files/documents/denied-persons-list.txt"
+    timeout = 60
+    verify = False
+    actor_id = "bis_scheduler"
+    table = "bis_dpl"
+    key_column = "row_hash"
+
+    def entries(self, stream):
+        # The file is small and may not be UTF-8, so it is decoded whole.
+        text = io.StringIO(decode_text(stream.read()))
+        for row_hash, row in iter_dpl_rows(text):
+            yield row_hash, row_hash, row
+
+    def artifact_fields(self, record):
+        return record.get("Name", "").strip(), "", "", "", ""
+
+    def upsert(self, cur, entries, ingested_at) -> int:
+        rows = (
+            (
+                row.get("Name", "").strip(),
+                row.get("Street_Address", "").strip() or None,
+                row.get("City", "").strip() or None,
+                row.get("State", "").strip() or None,
+                row.get("Country", "").strip() or None,
+                row.get("Postal_Code", "").strip() or None,
+                parse_date(row.get("Effective_Date", "")),
+                parse_date(row.get("Expiration_Date", "")),
+                row.get("Standard_Order", "").strip() or None,
+                parse_date(row.get("Last_Update", "")),
+                row.get("Action", "").strip() or None,
+                row_hash, self.url, ingested_at,
+            )
+            for row_hash, row in entries
+        )
+        return insert_dpl_rows(cur, rows)
@@ -0,0 +1,56 @@
+import json
+
+from app.ingestion.connectors.base import Connector
+from app.ingestion.delta import record_hash
+from app.ingestion.loader import upsert_ofac_rows
+from app.ingestion.parsers import iter_records
+
+
+class OfacXmlConnector(Connector):
+    """OFAC XML exports: one serving row per <sdnEntry> / <nonSdnEntity>, keyed by uid."""
+
+    entry_tag = "sdnEntry"
+    type_field = "sdnType"
+    key_column = "uid"
+
+    def entries(self, stream):
+        for _, r in iter_records(stream, (self.entry_tag,)):
+            yield r["uid"], record_hash(r), r
+
+    def artifact_fields(self, record):
+        name = f"{record['firstName']} {record['lastName']}".strip()
+        return name, record["firstName"], record["lastName"], record[self.type_field], "|".join(record["programs"])
+
+    def upsert(self, cur, entries, ingested_at) -> int:
+        rows = (
+            (r["uid"], r["lastName"], r["firstName"], r[self.type_field], r["programs"], json.dumps(r), ingested_at)
+            for _, r in entries
+        )
+        return upsert_ofac_rows(cur, self.table, rows)
+
+
+class OfacSdnConnector(OfacXmlConnector):
+    source = "ofac_sdn"
+    label = "OFAC SDN"
+    url = "https://sanctionslistservice.ofac.treas.gov/api/publicationpreview/exports/sdn.xml"
+    actor_id = "ofac_scheduler"
+    table = "ofac_sdn"
+
+
+class OfacConsolidatedConnector(OfacXmlConnector):
+    source = "ofac_consolidated"
+    label = "OFAC Consolidated"
+    url = "https://sanctionslistservice.ofac.treas.gov/api/publicationpreview/exports/consolidated.xml"
+    headers = {"User-Agent": "Mozilla/5.0"}
+    actor_id = "ofac_consolidated_scheduler"
+    table = "ofac_consolidated"
+
+
+class OfacSsiConnector(OfacXmlConnector):
+    source = "ofac_ssi"
+    label = "OFAC SSI"
+    url = "https://sanctionslistservice.ofac.treas.gov/api/publicationpreview/exports/nonsdn.xml"
+    actor_id = "ofac_ssi_scheduler"
+    table = "ofac_ssi"
+    entry_tag = "nonSdnEntity"
+    type_field = "nonSdnType"
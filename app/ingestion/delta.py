@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+
+from psycopg2.extras import execute_values
+
+from app.infra import snapshot_store
+from app.ingestion import artifact
+
+logger = logging.getLogger(__name__)
+
+
+def record_hash(record: dict) -> str:
+    """Stable hash of a parsed entry, used to detect modifications between versions."""
+    canonical = json.dumps(record, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(canonical).hexdigest()
+
+
+def get_previous_snapshot(cur, source: str):
+    """
+    Latest activated snapshot for `source`:
+    (version_id, content_hash, store_path, raw_bytes, artifact_path, artifact_hash) or None.
+    """
+    cur.execute("""
+        SELECT v.version_id, s.content_hash, s.store_path, s.raw_bytes, s.artifact_path, s.artifact_hash
+        FROM ingestion_versions v
+        JOIN ingestion_snapshots s ON s.version_id = v.version_id
+        WHERE v.source = %s
+          AND v.activated_at IS NOT NULL
+        ORDER BY v.version_id DESC
+        LIMIT 1
+    """, (source,))
+    return cur.fetchone()
+
+
+def load_manifest(cur, source: str, build_manifest):
+    """
+    Re-derive {entry_key: row_hash} for the previous version of `source`.
+
+    Read from the version's verified pre-parsed artifact when it has one; otherwise
+    `build_manifest(reader)` re-parses its immutable snapshot (the snapshot, not
+    the serving table, is the truth).
+    Returns (previous_version_id, manifest); (None, {}) when there is no usable
+    previous snapshot, in which case the caller performs a full load.
+    """
+    previous = get_previous_snapshot(cur, source)
+    if not previous:
+        return None, {}
+
+    version_id, content_hash, store_path, raw_bytes, artifact_path, artifact_hash = previous
+
+    if artifact_path:
+        try:
+            with artifact.open_verified(artifact_path, artifact_hash, content_hash) as parsed:
+                return version_id, dict(zip(parsed.values("key"), parsed.values("row_hash")))
+        except Exception as e:
+            logger.warning(f"Artifact for {source} version {version_id} unusable ({e}); re-parsing snapshot")
+
+    try:
+        if store_path:
+            reader = snapshot_store.open_snapshot(store_path)
+        else:
+            reader = snapshot_store.open_bytes(raw_bytes.encode())
+        with reader:
+            manifest = build_manifest(reader)
+            if reader.hexdigest() != content_hash:
+                raise snapshot_store.SnapshotIntegrityError(
+                    f"Snapshot for version {version_id} failed hash verification"
+                )
+    except Exception as e:
+        logger.warning(f"Previous snapshot for {source} unusable ({e}); falling back to full load")
+        return None, {}
+
+    return version_id, manifest
+
+
+class ChangeSet:
+    """Keyed diff (added / modified / removed) of one version against the previous one."""
+
+    def __init__(self, previous: dict, previous_version_id: int | None = None):
+        self.previous = previous
+        self.previous_version_id = previous_version_id
+        self.seen = set()
+        self.added = []      # (key, row_hash)
+        self.modified = []   # (key, row_hash, previous_row_hash)
+        self._removed = None
+
+    def classify(self, key: str, row_hash: str) -> str | None:
+        """Record one current entry. Returns 'added', 'modified', or None if unchanged."""
+        if key in self.seen:
+            return None
+        self.seen.add(key)
+
+        previous_hash = self.previous.get(key)
+        if previous_hash is None:
+            self.added.append((key, row_hash))
+            return "added"
+        if previous_hash != row_hash:
+            self.modified.append((key, row_hash, previous_hash))
+            return "modified"
+        return None
+
+    @property
+    def removed(self) -> list:
+        """(key, previous_row_hash) for entries absent from the current version."""
+        if self._removed is None:
+            self._removed = [(k, h) for k, h in self.previous.items() if k not in self.seen]
+        return self._removed
+
+    @property
+    def total(self) -> int:
+        return len(self.added) + len(self.modified) + len(self.removed)
+
+    def summary(self) -> dict:
+        return {
+            "previous_version_id": self.previous_version_id,
+            "added": len(self.added),
+            "modified": len(self.modified),
+            "removed": len(self.removed),
+        }
+
+    def save(self, cur, version_id: int, source: str):
+        rows = (
+            [(version_id, source, k, "added", h, None) for k, h in self.added]
+            + [(version_id, source, k, "modified", h, p) for k, h, p in self.modified]
+            + [(version_id, source, k, "removed", None, p) for k, p in self.removed]
+        )
+        if not rows:
+            return
+        execute_values(cur, """
+            INSERT INTO ingestion_changes (
+                version_id, source, entry_key, change_type, row_hash, previous_row_hash
+            )
+            VALUES %s
+        """, rows, page_size=1000)
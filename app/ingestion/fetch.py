@@ -0,0 +1,113 @@
+import hashlib
+import tempfile
+from dataclasses import dataclass
+
+import requests
+
+CHUNK_SIZE = 1024 * 1024          # 1 MiB per network read
+SPOOL_MAX_BYTES = 8 * 1024 * 1024  # spill to disk above 8 MiB
+
+
+@dataclass
+class Download:
+    spool: object
+    content_hash: str
+    size: int
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def close(self):
+        self.spool.close()
+
+
+def download(
+    url: str,
+    headers: dict | None = None,
+    timeout: int = 120,
+    verify: bool = True,
+    validators: dict | None = None,
+) -> Download | None:
+    """
+    Stream a list file into a spooled temp file, hashing the raw bytes as they arrive.
+
+    When `validators` (as returned by get_validators) are given, the request is
+    conditional (If-None-Match / If-Modified-Since) and None is returned on a
+    304 Not Modified. Otherwise the spool is rewound and ready to read; the
+    caller owns it and must close it.
+    """
+    request_headers = dict(headers or {})
+    if validators:
+        if validators.get("etag"):
+            request_headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            request_headers["If-Modified-Since"] = validators["last_modified"]
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with requests.get(url, headers=request_headers, timeout=timeout, verify=verify, stream=True) as response:
+            if response.status_code == 304:
+                spool.close()
+                return None
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if not chunk:
+                    continue
+                digest.update(chunk)
+                spool.write(chunk)
+                size += len(chunk)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+    except Exception:
+        spool.close()
+        raise
+
+    spool.seek(0)
+    return Download(spool, digest.hexdigest(), size, etag, last_modified)
+
+
+def decode_text(raw: bytes) -> str:
+    """Decode list bytes as text (UTF-8, falling back to Latin-1)."""
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
+
+
+def read_text(spool) -> str:
+    """Decode a downloaded spool as text."""
+    spool.seek(0)
+    raw = spool.read()
+    spool.seek(0)
+    return decode_text(raw)
+
+
+# ---------------------------
+# Validators (ETag / Last-Modified per source URL)
+# ---------------------------
+
+def get_validators(cur, url: str) -> dict | None:
+    cur.execute("""
+        SELECT etag, last_modified, content_hash
+        FROM fetch_validators
+        WHERE source_url = %s
+    """, (url,))
+    row = cur.fetchone()
+    if not row:
+        return None
+    return {"etag": row[0], "last_modified": row[1], "content_hash": row[2]}
+
+
+def save_validators(cur, url: str, result: Download):
+    """Remember the validators for `url`. Written in the caller's transaction."""
+    cur.execute("""
+        INSERT INTO fetch_validators (source_url, etag, last_modified, content_hash, updated_at)
+        VALUES (%s, %s, %s, %s, NOW())
+        ON CONFLICT (source_url) DO UPDATE SET
+            etag = EXCLUDED.etag,
+            last_modified = EXCLUDED.last_modified,
+            content_hash = EXCLUDED.content_hash,
+            updated_at = EXCLUDED.updated_at
+    """, (url, result.etag, result.last_modified, result.content_hash))
@@ -0,0 +1,104 @@
+from itertools import islice
+
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+PAGE_SIZE = 1000
+
+OFAC_UPSERT = sql.SQL("""
+    INSERT INTO {table} (uid, last_name, first_name, entity_type, programs, raw, ingested_at)
+    VALUES %s
+    ON CONFLICT (uid) DO UPDATE SET
+        last_name = EXCLUDED.last_name,
+        first_name = EXCLUDED.first_name,
+        entity_type = EXCLUDED.entity_type,
+        programs = EXCLUDED.programs,
+        raw = EXCLUDED.raw,
+        ingested_at = EXCLUDED.ingested_at
+""")
+
+
+class OfacUpserter:
+    """
+    Buffers (uid, last_name, first_name, entity_type, programs, raw, ingested_at)
+    tuples and upserts them into an OFAC serving table one page at a time.
+    At most one page is held in memory.
+    """
+
+    def __init__(self, cur, table: str, page_size: int = PAGE_SIZE):
+        self.cur = cur
+        self.statement = OFAC_UPSERT.format(table=sql.Identifier(table)).as_string(cur)
+        self.page_size = page_size
+        self.batch = []
+        self.count = 0
+
+    def add(self, row):
+        self.batch.append(row)
+        if len(self.batch) >= self.page_size:
+            self.flush()
+
+    def flush(self):
+        if not self.batch:
+            return
+        # ON CONFLICT DO UPDATE cannot touch the same uid twice in one statement,
+        # so collapse duplicates within the page (last one wins, as row-by-row did).
+        rows = list({row[0]: row for row in self.batch}.values())
+        execute_values(self.cur, self.statement, rows, page_size=len(rows))
+        self.count += len(self.batch)
+        self.batch = []
+
+
+def upsert_ofac_rows(cur, table: str, rows, page_size: int = PAGE_SIZE) -> int:
+    """Stream an iterable of row tuples into `table`. Returns the number of rows consumed."""
+    upserter = OfacUpserter(cur, table, page_size)
+    for row in rows:
+        upserter.add(row)
+    upserter.flush()
+    return upserter.count
+
+
+def delete_rows(cur, table: str, key_column: str, keys) -> int:
+    """Delete serving rows whose `key_column` is in `keys`. Returns rows deleted."""
+    keys = list(keys)
+    if not keys:
+        return 0
+    cur.execute(
+        sql.SQL("DELETE FROM {table} WHERE {column} = ANY(%s)").format(
+            table=sql.Identifier(table), column=sql.Identifier(key_column)
+        ),
+        (keys,),
+    )
+    return cur.rowcount
+
+
+def delete_rows_except(cur, table: str, key_column: str, keys) -> int:
+    """Delete serving rows whose `key_column` is not in `keys` (full rebuilds). Returns rows deleted."""
+    cur.execute(
+        sql.SQL("DELETE FROM {table} WHERE NOT ({column} = ANY(%s))").format(
+            table=sql.Identifier(table), column=sql.Identifier(key_column)
+        ),
+        (list(keys),),
+    )
+    return cur.rowcount
+
+
+BIS_DPL_INSERT = """
+    INSERT INTO bis_dpl (
+        name, street_address, city, state, country, postal_code,
+        effective_date, expiration_date, standard_order,
+        last_update, action, row_hash, source_url, ingested_at
+    ) VALUES %s
+    ON CONFLICT (row_hash) DO NOTHING
+"""
+
+
+def insert_dpl_rows(cur, rows, page_size: int = PAGE_SIZE) -> int:
+    """Insert bis_dpl row tuples one page per statement. Returns rows actually inserted."""
+    inserted = 0
+    rows = iter(rows)
+    while True:
+        page = list(islice(rows, page_size))
+        if not page:
+            return inserted
+        execute_values(cur, BIS_DPL_INSERT, page, page_size=len(page))
+        inserted += cur.rowcount
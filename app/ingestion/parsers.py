@@ -0,0 +1,124 @@
+import csv
+import hashlib
+import xml.etree.ElementTree as ET
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_elements(source, tags):
+    """
+    Stream an XML document and yield each element whose local name is in `tags`.
+
+    Elements are cleared and detached from their parent once the caller has
+    consumed them, so memory stays flat regardless of document size.
+    """
+    tags = set(tags)
+    stack = []
+
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        if _local(elem.tag) not in tags:
+            continue
+
+        yield elem
+
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+
+def _text(entry, tag: str) -> str:
+    el = entry.find(f"{{*}}{tag}")
+    return el.text.strip() if el is not None and el.text else ""
+
+
+def _common_fields(entry) -> dict:
+    return {
+        "programs": [p.text.strip() for p in entry.findall(".//{*}program") if p.text],
+        "aliases": [a.text.strip() for a in entry.findall(".//{*}aka") if a.text],
+        "addresses": [
+            {
+                "address": el.findtext("{*}address1") or "",
+                "city": el.findtext("{*}city") or "",
+                "country": el.findtext("{*}country") or "",
+            }
+            for el in entry.findall(".//{*}address")
+        ],
+        "ids": [
+            {
+                "idType": el.findtext("{*}idType") or "",
+                "idNumber": el.findtext("{*}idNumber") or "",
+            }
+            for el in entry.findall(".//{*}id")
+        ],
+    }
+
+
+def sdn_entry_record(entry) -> dict:
+    """Flatten an <sdnEntry> element into the record shape stored in `raw`."""
+    record = {
+        "uid": _text(entry, "uid"),
+        "lastName": _text(entry, "lastName"),
+        "firstName": _text(entry, "firstName"),
+        "sdnType": _text(entry, "sdnType"),
+    }
+    record.update(_common_fields(entry))
+    record["nationalities"] = [n.text.strip() for n in entry.findall(".//{*}nationality") if n.text]
+    record["dateOfBirth"] = entry.findtext(".//{*}dateOfBirth") or ""
+    record["placeOfBirth"] = entry.findtext(".//{*}placeOfBirth") or ""
+    return record
+
+
+def non_sdn_entity_record(entry) -> dict:
+    """Flatten a <nonSdnEntity> element into the record shape stored in `raw`."""
+    record = {
+        "uid": _text(entry, "id"),
+        "lastName": _text(entry, "lastName"),
+        "firstName": _text(entry, "firstName"),
+        "nonSdnType": _text(entry, "nonSdnType"),
+    }
+    record.update(_common_fields(entry))
+    return record
+
+
+RECORD_BUILDERS = {
+    "sdnEntry": sdn_entry_record,
+    "nonSdnEntity": non_sdn_entity_record,
+}
+
+
+def iter_records(source, tags=("sdnEntry",)):
+    """Yield (tag, record) pairs for every matching entry, one at a time."""
+    for elem in iter_elements(source, tags):
+        tag = _local(elem.tag)
+        yield tag, RECORD_BUILDERS[tag](elem)
+
+
+# ---------------------------
+# BIS Denied Persons List (CSV)
+# ---------------------------
+
+def dpl_row_hash(row: dict) -> str:
+    """Identity of a DPL row: name, street address, city, country and effective date."""
+    row_data = "|".join([
+        row.get("Name", "").strip(),
+        row.get("Street_Address", "").strip(),
+        row.get("City", "").strip(),
+        row.get("Country", "").strip(),
+        row.get("Effective_Date", "").strip(),
+    ])
+    return hashlib.sha256(row_data.encode()).hexdigest()
+
+
+def iter_dpl_rows(text_stream):
+    """Yield (row_hash, row) for every named row of a DPL file, one at a time."""
+    for row in csv.DictReader(text_stream):
+        if not row.get("Name", "").strip():
+            continue
+        yield dpl_row_hash(row), row
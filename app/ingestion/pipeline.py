@@ -0,0 +1,289 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from app.infra import snapshot_store
+from app.infra.db import get_conn
+from app.infra.ledger import append_event
+from app.ingestion import artifact
+from app.ingestion.delta import ChangeSet, load_manifest
+from app.ingestion.fetch import download, get_validators, save_validators
+
+logger = logging.getLogger(__name__)
+
+# The one ingestion pipeline (CORE_INFRA_RULES Rule 2):
+#   Fetch -> Snapshot -> Hash -> Lock -> Version -> Parse -> Serve -> Activate -> Log
+# Connectors (app/ingestion/connectors) supply Parse and Serve; everything else is here.
+# "artifact" (writing the pre-parsed artifact built during Parse) is timed separately.
+STAGES = ("fetch", "snapshot", "hash", "lock", "version", "parse", "serve", "artifact", "activate", "log")
+
+# NOTIFY channel announcing each activated version: {"source": ..., "version_id": ...}
+ACTIVATION_CHANNEL = "version_activated"
+
+
+class PipelineRun:
+    """Per-run stage timings (milliseconds), logged and recorded in the ledger event."""
+
+    def __init__(self, connector):
+        self.connector = connector
+        self.seconds = {}
+
+    @property
+    def timings(self) -> dict:
+        return {name: round(s * 1000, 1) for name, s in self.seconds.items()}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+            logger.info(f"[{self.connector.source}] {name}: {self.seconds[name] * 1000:.1f} ms")
+
+    def add(self, name: str, seconds: float):
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def timed(self, name: str, iterable):
+        """Yield from `iterable`, charging only the time spent producing items to `name`."""
+        it = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.add(name, time.perf_counter() - start)
+                return
+            self.add(name, time.perf_counter() - start)
+            yield item
+
+
+def get_last_hash(cur, connector) -> str | None:
+    cur.execute("""
+        SELECT payload->>'content_hash'
+        FROM events
+        WHERE event_type = %s
+        ORDER BY created_at DESC
+        LIMIT 1
+    """, (connector.event_type,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def log_event(cur, connector, status, content_hash, entries_updated, message, changes=None, timings=None):
+    payload = {
+        "status": status,
+        "content_hash": content_hash,
+        "entries_updated": entries_updated,
+        "message": message,
+    }
+    if changes is not None:
+        payload["changes"] = changes
+    if timings is not None:
+        payload["stage_ms"] = timings
+    append_event(
+        cur,
+        event_type=connector.event_type,
+        aggregate_type="system",
+        aggregate_id=connector.source,
+        actor_type="scheduler",
+        actor_id=connector.actor_id,
+        payload=payload,
+    )
+
+
+def record_version(cur, connector, content_hash) -> int:
+    """Insert the (not yet active) version row; entry_count is filled in at activation."""
+    cur.execute("""
+        INSERT INTO ingestion_versions (source, content_hash, entry_count)
+        VALUES (%s, %s, 0)
+        RETURNING version_id
+    """, (connector.source, content_hash))
+    return cur.fetchone()[0]
+
+
+def save_snapshot(cur, connector, version_id, content_hash, store_path):
+    cur.execute("""
+        INSERT INTO ingestion_snapshots (version_id, source, content_hash, store_path)
+        VALUES (%s, %s, %s, %s)
+    """, (version_id, connector.source, content_hash, store_path))
+
+
+def save_artifact(cur, version_id, artifact_path, artifact_hash):
+    cur.execute("""
+        UPDATE ingestion_snapshots
+        SET artifact_path = %s, artifact_hash = %s
+        WHERE version_id = %s
+    """, (artifact_path, artifact_hash, version_id))
+
+
+def activate_version(cur, source, version_id, entry_count, previous_version_id):
+    cur.execute("""
+        UPDATE ingestion_versions
+        SET entry_count = %s,
+            previous_version_id = %s,
+            activated_at = NOW()
+        WHERE version_id = %s
+    """, (entry_count, previous_version_id, version_id))
+    # Delivered to listeners (the orchestrator's re-screening) only on commit.
+    cur.execute("SELECT pg_notify(%s, %s)", (ACTIVATION_CHANNEL, json.dumps({"source": source, "version_id": version_id})))
+
+
+def run_once(connector, full: bool = False) -> dict:
+    """
+    Run one ingestion cycle for `connector` in a single transaction.
+
+    full=True is a rebuild: no conditional fetch, no same-hash skip, and every
+    entry is written to the serving table (rows absent from the list are removed).
+    The change set is still recorded against the previous version.
+
+    Returns {"status": ..., "version_id": ..., "stage_ms": {...}}.
+    """
+    run = PipelineRun(connector)
+    logger.info(f"Starting {connector.label} check...")
+
+    fetched = None
+    writer = None
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor()
+
+        with run.stage("fetch"):
+            validators = None if full else get_validators(cur, connector.url)
+            fetched = download(
+                connector.url,
+                headers=connector.headers,
+                timeout=connector.timeout,
+                verify=connector.verify,
+                validators=validators,
+            )
+
+        if fetched is None:
+            logger.info(f"{connector.label}: not modified (304) — no download needed.")
+            log_event(cur, connector, "unchanged", validators["content_hash"], 0,
+                      "Source returned 304 Not Modified. No download performed.", timings=run.timings)
+            conn.commit()
+            return {"status": "unchanged", "version_id": None, "stage_ms": run.timings}
+
+        content_hash = fetched.content_hash
+        logger.info(f"{connector.label}: downloaded {fetched.size:,} bytes | Hash: {content_hash[:16]}...")
+
+        with run.stage("hash"):
+            last_hash = get_last_hash(cur, connector)
+
+        if last_hash == content_hash and not full:
+            logger.info(f"{connector.label}: hash unchanged — no update needed.")
+            save_validators(cur, connector.url, fetched)
+            log_event(cur, connector, "skipped", content_hash, 0,
+                      "Hash matched last ingestion. No update performed.", timings=run.timings)
+            conn.commit()
+            return {"status": "skipped", "version_id": None, "stage_ms": run.timings}
+
+        # Snapshot: the downloaded bytes were spooled (and hashed) during the fetch;
+        # this stage persists them, compressed, under that hash. Unchanged lists
+        # (skipped above) never touch the store.
+        with run.stage("snapshot"):
+            fetched.spool.seek(0)
+            store_path = snapshot_store.put(fetched.spool, content_hash, locked=False)
+
+        with run.stage("lock"):
+            snapshot_store.lock(store_path, content_hash)
+
+        with run.stage("version"):
+            version_id = record_version(cur, connector, content_hash)
+            save_snapshot(cur, connector, version_id, content_hash, store_path)
+
+        # Parse and Serve are streamed together so memory stays flat; time spent
+        # producing entries is charged to "parse", the remainder to "serve".
+        serve_start = time.perf_counter()
+        with run.stage("parse"):
+            previous_version_id, previous = load_manifest(cur, connector.source, connector.manifest)
+        changes = ChangeSet(previous, previous_version_id)
+
+        # The same pass fills the pre-parsed artifact (every entry, in snapshot order),
+        # spooled to disk column by column.
+        writer = artifact.ArtifactWriter(connector.source)
+
+        def parsed():
+            for key, row_hash, record in connector.entries(fetched.spool):
+                if key in changes.seen:
+                    continue
+                writer.append(key, row_hash, *connector.artifact_fields(record))
+                yield key, row_hash, record
+
+        fetched.spool.seek(0)
+        changed = (
+            (key, record)
+            for key, row_hash, record in run.timed("parse", parsed())
+            if changes.classify(key, row_hash) or full
+        )
+        ingested_at = datetime.now(timezone.utc)
+        written = connector.upsert(cur, changed, ingested_at)
+        if full or previous_version_id is None:
+            # Without a previous manifest nothing is known to be removed: prune
+            # whatever the serving table holds that this version does not.
+            deleted = connector.delete_except(cur, changes.seen)
+        else:
+            deleted = connector.delete(cur, [k for k, _ in changes.removed])
+        run.add("serve", time.perf_counter() - serve_start - run.seconds["parse"])
+
+        entry_count = len(changes.seen)
+        logger.info(
+            f"{connector.label}: parsed {entry_count} entries | added {len(changes.added)}, "
+            f"modified {len(changes.modified)}, removed {len(changes.removed)}"
+        )
+
+        with run.stage("artifact"):
+            artifact_path, artifact_hash = artifact.save(writer, content_hash)
+            save_artifact(cur, version_id, artifact_path, artifact_hash)
+
+        with run.stage("activate"):
+            changes.save(cur, version_id, connector.source)
+            activate_version(cur, connector.source, version_id, entry_count, previous_version_id)
+            save_validators(cur, connector.url, fetched)
+
+        with run.stage("log"):
+            log_event(
+                cur, connector, "updated", content_hash, changes.total,
+                f"Applied {changes.total} changes ({written} written, {deleted} removed) "
+                f"from updated {connector.label} list. Version ID: {version_id}",
+                changes.summary(), run.timings,
+            )
+            conn.commit()
+
+        logger.info(f"{connector.label}: version {version_id} active — {entry_count} entries, {changes.total} changed")
+        logger.info(f"{connector.label}: stage_ms {run.timings}")
+        return {"status": "updated", "version_id": version_id, "stage_ms": run.timings}
+
+    except Exception as e:
+        logger.exception(f"{connector.label} ingestion failed: {e}")
+        if conn is not None:
+            conn.rollback()
+        try:
+            err_conn = get_conn()
+            err_cur = err_conn.cursor()
+            log_event(err_cur, connector, "error", "", 0, str(e), timings=run.timings)
+            err_conn.commit()
+            err_cur.close()
+            err_conn.close()
+        except Exception:
+            pass
+        return {"status": "error", "version_id": None, "stage_ms": run.timings}
+    finally:
+        if writer is not None:
+            writer.close()
+        if fetched is not None:
+            fetched.close()
+        if conn is not None:
+            conn.close()
+
+
+def run_scheduler(connector):
+    logger.info(f"{connector.label} scheduler started. Interval: {connector.interval_seconds // 3600} hours.")
+    while True:
+        run_once(connector)
+        logger.info(f"Next {connector.label} check in {connector.interval_seconds // 3600} hours...")
+        time.sleep(connector.interval_seconds)
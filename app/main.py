@@ -21,8 +21,10 @@ from fastapi import Header, Depends
 from typing import Optional
 import time
 import logging
+from app.infra.ledger import append_event
 from app.infra.redis_client import get_redis_client
-from rapidfuzz import fuzz, process
+from app.screening.engine import screen_version, serving_rows
+from app.screening.matching import MATCHING_VERSION, SCREENS
 
 app = FastAPI(title="MIC POC", version="0.2")
 app.include_router(monitor_router)
@@ -378,21 +380,8 @@ def compute_request_hash(payload: dict) -> str:
     normalized = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
     return hashlib.sha256(normalized).hexdigest()
 
-def get_latest_event_hash(cur) -> str | None:
-    """Fetch the most recent event_hash to use as previous_hash in the chain."""
-    cur.execute(
-        """
-        SELECT event_hash FROM events
-        WHERE event_hash IS NOT NULL
-        ORDER BY created_at DESC, event_id DESC
-        LIMIT 1
-        """
-    )
-    row = cur.fetchone()
-    return row[0] if row else None
-
 def get_active_ingestion_version(source: str, as_of: datetime) -> dict | None:
-    """Fetch the most recent ingestion version for a source at a given moment."""
+    """Fetch the ingestion version that was active for a source at a given moment."""
     conn = get_conn()
     cur = conn.cursor()
     cur.execute(
@@ -400,8 +389,8 @@ def get_active_ingestion_version(source: str, as_of: datetime) -> dict | None:
         SELECT version_id, source, content_hash, entry_count, ingested_at
         FROM ingestion_versions
         WHERE source = %s
-          AND ingested_at <= %s
-        ORDER BY ingested_at DESC
+          AND activated_at <= %s
+        ORDER BY activated_at DESC
         LIMIT 1
         """,
         (source, as_of),
@@ -420,39 +409,6 @@ def get_active_ingestion_version(source: str, as_of: datetime) -> dict | None:
     }
 
 
-def compute_event_hash(
-    event_id: str,
-    event_type: str,
-    aggregate_type: str,
-    aggregate_id: str,
-    actor_type: str,
-    actor_id: str,
-    payload: dict,
-    created_at: str,
-    previous_hash: str | None,
-) -> str:
-    """
-    SHA-256 hash of this event's core fields plus the previous event's hash.
-    Including previous_hash links this record to the chain — any alteration
-    of a prior record breaks all subsequent hashes.
-    """
-    canonical = json.dumps(
-        {
-            "event_id": event_id,
-            "event_type": event_type,
-            "aggregate_type": aggregate_type,
-            "aggregate_id": aggregate_id,
-            "actor_type": actor_type,
-            "actor_id": actor_id,
-            "payload": payload,
-            "created_at": created_at,
-            "previous_hash": previous_hash,
-        },
-        sort_keys=True,
-        separators=(",", ":"),
-    ).encode("utf-8")
-    return hashlib.sha256(canonical).hexdigest()
-
 def get_idempotency_record(actor_type: str, actor_id: str, idempotency_key: str):
     conn = get_conn()
     cur = conn.cursor()
@@ -1128,65 +1084,81 @@ def list_verdicts(claim_id: str):
 # OFAC Sanctions Verification
 # ---------------------------
 
+def screen_ofac_list(cur, screen_name: str, table: str, entity_name: str, data_version: dict | None,
+                     list_types: bool = False) -> list:
+    """Hits for an OFAC screen against its recorded list version, with display fields from `table`."""
+    index, hits = screen_version(cur, SCREENS[screen_name], entity_name, data_version)
+    keys = [index.keys[h.index] for h in hits]
+    raw = serving_rows(cur, table, "uid", ("raw",), keys)
+    results = []
+    for h, key in zip(hits, keys):
+        codes = index.entry_programs(h.index)
+        hit = {
+            "uid": key,
+            "name": index.names[h.index],
+            "entity_type": index.entity_types[h.index],
+            "program_codes": codes,
+            "match_score": h.match_score,
+            "match_type": h.match_type,
+            "raw_match_data": raw.get(key, (None,))[0],
+        }
+        if list_types:
+            hit["list_types"] = [PROGRAM_CODE_LABELS.get(c, c) for c in codes]
+        results.append(hit)
+    return results
+
+
 class OFACVerifyRequest(BaseModel):
     entity_name: str
 
+
+def record_verification(event_type: str, entity_name: str, payload: dict) -> tuple[str, datetime]:
+    """
+    Write a verify receipt: the claim and its ledger event, appended through
+    append_event under the ledger lock. Returns (claim_id, verified_at), where
+    verified_at is the event's timestamp, taken once screening is done.
+    """
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        claim_id = str(uuid.uuid4())
+        event_id = append_event(cur, event_type, "claim", claim_id, "system", "system", payload)
+        cur.execute("SELECT created_at FROM events WHERE event_id = %s", (event_id,))
+        verified_at = cur.fetchone()[0]
+        cur.execute("""
+            INSERT INTO claims (claim_id, content, created_at)
+            VALUES (%s, %s, %s)
+        """, (claim_id, entity_name, verified_at))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    finally:
+        cur.close()
+        conn.close()
+    return claim_id, verified_at
+
+
 @app.post("/verify/ofac")
 async def verify_ofac(request: OFACVerifyRequest):
     entity_name = request.entity_name.strip()
     if not entity_name:
         raise HTTPException(status_code=400, detail="entity_name is required")
 
-    # Step 1: Check OFAC sanctions list (local database)
+    # Step 1: Screen against the active OFAC SDN version
     ofac_match = False
     ofac_detail = ""
+    ofac_hits = []
+    match_type = "none"
+    sdn_version = get_active_ingestion_version("ofac_sdn", datetime.now(timezone.utc))
     try:
         sdn_conn = get_conn()
         sdn_cur = sdn_conn.cursor()
-        sdn_cur.execute("""
-            SELECT uid, last_name, first_name, entity_type, programs, raw
-            FROM ofac_sdn
-            WHERE UPPER(last_name) LIKE %s
-            OR UPPER(first_name || ' ' || last_name) LIKE %s
-            OR UPPER(last_name || ' ' || first_name) LIKE %s
-            LIMIT 200
-        """, (
-            f"%{entity_name.upper()[:4]}%",
-            f"%{entity_name.upper()[:4]}%",
-            f"%{entity_name.upper()[:4]}%"
-        ))
-        candidates = sdn_cur.fetchall()
-        sdn_cur.close()
-        sdn_conn.close()
-
-        FUZZY_THRESHOLD = 85
-        ofac_hits = []
-        for row in candidates:
-            full_name = f"{row[2] or ''} {row[1]}".strip()
-            score_full = fuzz.token_sort_ratio(entity_name.upper(), full_name.upper())
-            score_last = fuzz.token_sort_ratio(entity_name.upper(), (row[1] or '').upper())
-            score_partial = fuzz.partial_ratio(entity_name.upper(), full_name.upper())
-            best_score = max(score_full, score_last, score_partial)
-            if best_score >= FUZZY_THRESHOLD:
-                codes = row[4] or []
-                if best_score == 100:
-                    mt = "exact"
-                elif best_score >= 95:
-                    mt = "partial"
-                else:
-                    mt = "fuzzy"
-                ofac_hits.append({
-                    "uid": row[0],
-                    "name": full_name,
-                    "entity_type": row[3],
-                    "program_codes": codes,
-                    "match_score": round(best_score / 100, 2),
-                    "match_type": mt,
-                    "raw_match_data": row[5],
-                })
-
-        ofac_hits.sort(key=lambda x: x["match_score"], reverse=True)
-        ofac_hits = ofac_hits[:10]
+        try:
+            ofac_hits = screen_ofac_list(sdn_cur, "ofac_sdn", "ofac_sdn", entity_name, sdn_version)
+        finally:
+            sdn_cur.close()
+            sdn_conn.close()
 
         if ofac_hits:
             ofac_match = True
@@ -1201,52 +1173,15 @@ async def verify_ofac(request: OFACVerifyRequest):
         ofac_detail = f"OFAC lookup error: {str(e)}"
 
     # Step 2: Write full audit trail to database
-    conn = get_conn()
-    cur = conn.cursor()
-    try:
-        claim_id = str(uuid.uuid4())
-        validation_id = str(uuid.uuid4())
-        verdict_id = str(uuid.uuid4())
-        event_id = str(uuid.uuid4())
-        now = datetime.now(timezone.utc)
-        sdn_version = get_active_ingestion_version("ofac_sdn", now)
-        content_hash = hashlib.sha256(entity_name.encode()).hexdigest()
-
-        cur.execute("""
-            INSERT INTO claims (claim_id, content, created_at)
-            VALUES (%s, %s, %s)
-        """, (claim_id, entity_name, now))
-
-        previous_hash = get_latest_event_hash(cur)
-        event_hash = compute_event_hash(
-            event_id=event_id,
-            event_type="ofac_verification",
-            aggregate_type="claim",
-            aggregate_id=claim_id,
-            actor_type="system",
-            actor_id="system",
-            payload={"entity": entity_name, "match": ofac_match, "detail": ofac_detail, "data_version": sdn_version},
-            created_at=now.isoformat(),
-            previous_hash=previous_hash,
-        )
-
-        cur.execute("""
-            INSERT INTO events (event_id, event_type, aggregate_type, aggregate_id, actor_type, actor_id, payload, created_at, event_hash, previous_hash)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (event_id, "ofac_verification", "claim", claim_id, "system", "system", json.dumps({
-            "entity": entity_name,
-            "match": ofac_match,
-            "detail": ofac_detail,
-            "data_version": sdn_version
-        }), now, event_hash, previous_hash))
-
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    finally:
-        cur.close()
-        conn.close()
+    payload = {
+        "entity": entity_name,
+        "match": ofac_match,
+        "detail": ofac_detail,
+        "data_version": sdn_version,
+        "matching_version": MATCHING_VERSION,
+        "hit_keys": [h["uid"] for h in ofac_hits],
+    }
+    claim_id, verified_at = record_verification("ofac_verification", entity_name, payload)
 
     return {
         "entity": entity_name,
@@ -1256,7 +1191,7 @@ async def verify_ofac(request: OFACVerifyRequest):
         "hits": ofac_hits,
         "sources_checked": ["OFAC SDN List (sanctionslistservice.ofac.treas.gov)"],
         "claim_id": claim_id,
-        "verified_at": now.isoformat(),
+        "verified_at": verified_at.isoformat(),
         "source_url": "https://sanctionslistservice.ofac.treas.gov/api/publicationpreview/exports/sdn.xml",
         "data_version": sdn_version,
         "compliance_disclaimer": "This receipt documents the results of a query against government-published sanctions lists. Compliance determinations remain the responsibility of the querying organization.",
@@ -1271,46 +1206,33 @@ async def verify_bis(request: OFACVerifyRequest):
     bis_match = False
     bis_detail = ""
     bis_hits = []
+    bis_version = get_active_ingestion_version("bis_dpl", datetime.now(timezone.utc))
 
     try:
         bis_conn = get_conn()
         bis_cur = bis_conn.cursor()
-        bis_cur.execute("""
-            SELECT name, city, country, effective_date, expiration_date, action
-            FROM bis_dpl
-            WHERE UPPER(name) LIKE %s
-            LIMIT 200
-        """, (f"%{entity_name.upper()[:4]}%",))
-        candidates = bis_cur.fetchall()
-        bis_cur.close()
-        bis_conn.close()
-
-        FUZZY_THRESHOLD = 85
-        bis_hits = []
-        for row in candidates:
-            score_full = fuzz.token_sort_ratio(entity_name.upper(), (row[0] or '').upper())
-            score_partial = fuzz.partial_ratio(entity_name.upper(), (row[0] or '').upper())
-            score = max(score_full, score_partial)
-            if score >= FUZZY_THRESHOLD:
-                if score == 100:
-                    mt = "exact"
-                elif score >= 95:
-                    mt = "partial"
-                else:
-                    mt = "fuzzy"
-                bis_hits.append({
-                    "name": row[0],
-                    "city": row[1],
-                    "country": row[2],
-                    "effective_date": str(row[3]) if row[3] else None,
-                    "expiration_date": str(row[4]) if row[4] else None,
-                    "action": row[5],
-                    "match_score": round(score / 100, 2),
-                    "match_type": mt,
-                })
-
-        bis_hits.sort(key=lambda x: x["match_score"], reverse=True)
-        bis_hits = bis_hits[:10]
+        try:
+            index, hits = screen_version(bis_cur, SCREENS["bis_dpl"], entity_name, bis_version)
+            keys = [index.keys[h.index] for h in hits]
+            details = serving_rows(bis_cur, "bis_dpl", "row_hash",
+                                   ("city", "country", "effective_date", "expiration_date", "action"), keys)
+        finally:
+            bis_cur.close()
+            bis_conn.close()
+
+        for h, key in zip(hits, keys):
+            city, country, effective_date, expiration_date, action = details.get(key, (None,) * 5)
+            bis_hits.append({
+                "name": index.names[h.index],
+                "row_hash": key,
+                "city": city,
+                "country": country,
+                "effective_date": str(effective_date) if effective_date else None,
+                "expiration_date": str(expiration_date) if expiration_date else None,
+                "action": action,
+                "match_score": h.match_score,
+                "match_type": h.match_type,
+            })
 
         if bis_hits:
             bis_match = True
@@ -1322,49 +1244,15 @@ async def verify_bis(request: OFACVerifyRequest):
     except Exception as e:
         bis_detail = f"BIS lookup error: {str(e)}"
 
-    conn = get_conn()
-    cur = conn.cursor()
-    try:
-        claim_id = str(uuid.uuid4())
-        event_id = str(uuid.uuid4())
-        now = datetime.now(timezone.utc)
-        bis_version = get_active_ingestion_version("bis_dpl", now)
-
-        cur.execute("""
-            INSERT INTO claims (claim_id, content, created_at)
-            VALUES (%s, %s, %s)
-        """, (claim_id, entity_name, now))
-
-        previous_hash = get_latest_event_hash(cur)
-        event_hash = compute_event_hash(
-            event_id=event_id,
-            event_type="bis_dpl_verification",
-            aggregate_type="claim",
-            aggregate_id=claim_id,
-            actor_type="system",
-            actor_id="system",
-            payload={"entity": entity_name, "match": bis_match, "detail": bis_detail, "data_version": bis_version},
-            created_at=now.isoformat(),
-            previous_hash=previous_hash,
-        )
-
-        cur.execute("""
-            INSERT INTO events (event_id, event_type, aggregate_type, aggregate_id, actor_type, actor_id, payload, created_at, event_hash, previous_hash)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (event_id, "bis_dpl_verification", "claim", claim_id, "system", "system", json.dumps({
-            "entity": entity_name,
-            "match": bis_match,
-            "detail": bis_detail,
-            "data_version": bis_version
-        }), now, event_hash, previous_hash))
-
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    finally:
-        cur.close()
-        conn.close()
+    payload = {
+        "entity": entity_name,
+        "match": bis_match,
+        "detail": bis_detail,
+        "data_version": bis_version,
+        "matching_version": MATCHING_VERSION,
+        "hit_keys": [h["row_hash"] for h in bis_hits],
+    }
+    claim_id, verified_at = record_verification("bis_dpl_verification", entity_name, payload)
 
     return {
         "entity": entity_name,
@@ -1374,7 +1262,7 @@ async def verify_bis(request: OFACVerifyRequest):
         "hits": bis_hits,
         "sources_checked": ["BIS Denied Persons List (media.bis.gov)"],
         "claim_id": claim_id,
-        "verified_at": now.isoformat(),
+        "verified_at": verified_at.isoformat(),
         "source_url": "https://www.bis.doc.gov/dpl/dpl.txt",
         "data_version": bis_version,
         "compliance_disclaimer": "This receipt documents the results of a query against government-published sanctions lists. Compliance determinations remain the responsibility of the querying organization.",
@@ -1407,55 +1295,17 @@ async def verify_ofac_consolidated(request: OFACVerifyRequest):
     program_codes = []
     list_types = []
     match_type = "none"
+    con_version = get_active_ingestion_version("ofac_consolidated", datetime.now(timezone.utc))
 
     try:
         con_conn = get_conn()
         con_cur = con_conn.cursor()
-        con_cur.execute("""
-            SELECT uid, last_name, first_name, entity_type, programs, raw
-            FROM ofac_consolidated
-            WHERE UPPER(last_name) LIKE %s
-            OR UPPER(first_name || ' ' || last_name) LIKE %s
-            OR UPPER(last_name || ' ' || first_name) LIKE %s
-            LIMIT 200
-        """, (
-            f"%{entity_name.upper()[:4]}%",
-            f"%{entity_name.upper()[:4]}%",
-            f"%{entity_name.upper()[:4]}%"
-        ))
-        candidates = con_cur.fetchall()
-        con_cur.close()
-        con_conn.close()
-
-        FUZZY_THRESHOLD = 85
-        con_hits = []
-        for row in candidates:
-            full_name = f"{row[2] or ''} {row[1]}".strip()
-            score_full = fuzz.token_sort_ratio(entity_name.upper(), full_name.upper())
-            score_last = fuzz.token_sort_ratio(entity_name.upper(), (row[1] or '').upper())
-            score_partial = fuzz.partial_ratio(entity_name.upper(), full_name.upper())
-            best_score = max(score_full, score_last, score_partial)
-            if best_score >= FUZZY_THRESHOLD:
-                codes = row[4] or []
-                if best_score == 100:
-                    mt = "exact"
-                elif best_score >= 95:
-                    mt = "partial"
-                else:
-                    mt = "fuzzy"
-                con_hits.append({
-                    "uid": row[0],
-                    "name": full_name,
-                    "entity_type": row[3],
-                    "program_codes": codes,
-                    "list_types": [PROGRAM_CODE_LABELS.get(c, c) for c in codes],
-                    "match_score": round(best_score / 100, 2),
-                    "match_type": mt,
-                    "raw_match_data": row[5],
-                })
-
-        con_hits.sort(key=lambda x: x["match_score"], reverse=True)
-        con_hits = con_hits[:10]
+        try:
+            con_hits = screen_ofac_list(con_cur, "ofac_consolidated", "ofac_consolidated", entity_name, con_version,
+                                        list_types=True)
+        finally:
+            con_cur.close()
+            con_conn.close()
 
         if con_hits:
             con_match = True
@@ -1470,49 +1320,15 @@ async def verify_ofac_consolidated(request: OFACVerifyRequest):
     except Exception as e:
         con_detail = f"Consolidated lookup error: {str(e)}"
 
-    conn = get_conn()
-    cur = conn.cursor()
-    try:
-        claim_id = str(uuid.uuid4())
-        event_id = str(uuid.uuid4())
-        now = datetime.now(timezone.utc)
-        con_version = get_active_ingestion_version("ofac_consolidated", now)
-
-        cur.execute("""
-            INSERT INTO claims (claim_id, content, created_at)
-            VALUES (%s, %s, %s)
-        """, (claim_id, entity_name, now))
-
-        previous_hash = get_latest_event_hash(cur)
-        event_hash = compute_event_hash(
-            event_id=event_id,
-            event_type="ofac_consolidated_verification",
-            aggregate_type="claim",
-            aggregate_id=claim_id,
-            actor_type="system",
-            actor_id="system",
-            payload={"entity": entity_name, "match": con_match, "detail": con_detail, "data_version": con_version},
-            created_at=now.isoformat(),
-            previous_hash=previous_hash,
-        )
-
-        cur.execute("""
-            INSERT INTO events (event_id, event_type, aggregate_type, aggregate_id, actor_type, actor_id, payload, created_at, event_hash, previous_hash)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (event_id, "ofac_consolidated_verification", "claim", claim_id, "system", "system", json.dumps({
-            "entity": entity_name,
-            "match": con_match,
-            "detail": con_detail,
-            "data_version": con_version
-        }), now, event_hash, previous_hash))
-        conn.commit()
-
-    except Exception as e:
-        conn.rollback()
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    finally:
-        cur.close()
-        conn.close()
+    payload = {
+        "entity": entity_name,
+        "match": con_match,
+        "detail": con_detail,
+        "data_version": con_version,
+        "matching_version": MATCHING_VERSION,
+        "hit_keys": [h["uid"] for h in con_hits],
+    }
+    claim_id, verified_at = record_verification("ofac_consolidated_verification", entity_name, payload)
 
     return {
         "entity": entity_name,
@@ -1524,7 +1340,7 @@ async def verify_ofac_consolidated(request: OFACVerifyRequest):
         "hits": con_hits,
         "sources_checked": ["OFAC Consolidated Sanctions List (sanctionslistservice.ofac.treas.gov)"],
         "claim_id": claim_id,
-        "verified_at": now.isoformat(),
+        "verified_at": verified_at.isoformat(),
         "source_url": "https://sanctionslistservice.ofac.treas.gov/api/publicationpreview/exports/consolidated.xml",
         "data_version": con_version,
         "compliance_disclaimer": "This receipt documents the results of a query against government-published sanctions lists. Compliance determinations remain the responsibility of the querying organization.",
@@ -1540,66 +1356,17 @@ async def verify_ssi(request: OFACVerifyRequest):
     ssi_detail = ""
     ssi_hits = []
     match_type = "none"
-
-    SSI_PROGRAMS = [
-        "UKRAINE-EO13662",
-        "CAATSA - RUSSIA",
-        "RUSSIA-EO14024",
-        "CMIC-EO13959",
-        "VENEZUELA-EO13850",
-    ]
+    ssi_version = get_active_ingestion_version("ofac_consolidated", datetime.now(timezone.utc))
 
     try:
         ssi_conn = get_conn()
         ssi_cur = ssi_conn.cursor()
-        ssi_cur.execute("""
-            SELECT uid, last_name, first_name, entity_type, programs, raw
-            FROM ofac_consolidated
-            WHERE (
-                UPPER(last_name) LIKE %s
-                OR UPPER(first_name || ' ' || last_name) LIKE %s
-                OR UPPER(last_name || ' ' || first_name) LIKE %s
-            )
-            AND programs && %s::text[]
-            LIMIT 200
-        """, (
-            f"%{entity_name.upper()[:4]}%",
-            f"%{entity_name.upper()[:4]}%",
-            f"%{entity_name.upper()[:4]}%",
-            SSI_PROGRAMS,
-        ))
-        candidates = ssi_cur.fetchall()
-        ssi_cur.close()
-        ssi_conn.close()
-
-        FUZZY_THRESHOLD = 85
-        for row in candidates:
-            full_name = f"{row[2] or ''} {row[1]}".strip()
-            score_full = fuzz.token_sort_ratio(entity_name.upper(), full_name.upper())
-            score_last = fuzz.token_sort_ratio(entity_name.upper(), (row[1] or '').upper())
-            score_partial = fuzz.partial_ratio(entity_name.upper(), full_name.upper())
-            best_score = max(score_full, score_last, score_partial)
-            if best_score >= FUZZY_THRESHOLD:
-                codes = row[4] or []
-                if best_score == 100:
-                    mt = "exact"
-                elif best_score >= 95:
-                    mt = "partial"
-                else:
-                    mt = "fuzzy"
-                ssi_hits.append({
-                    "uid": row[0],
-                    "name": full_name,
-                    "entity_type": row[3],
-                    "program_codes": codes,
-                    "list_types": [PROGRAM_CODE_LABELS.get(c, c) for c in codes],
-                    "match_score": round(best_score / 100, 2),
-                    "match_type": mt,
-                    "raw_match_data": row[5],
-                })
-
-        ssi_hits.sort(key=lambda x: x["match_score"], reverse=True)
-        ssi_hits = ssi_hits[:10]
+        try:
+            ssi_hits = screen_ofac_list(ssi_cur, "ssi", "ofac_consolidated", entity_name, ssi_version,
+                                        list_types=True)
+        finally:
+            ssi_cur.close()
+            ssi_conn.close()
 
         if ssi_hits:
             ssi_match = True
@@ -1612,49 +1379,15 @@ async def verify_ssi(request: OFACVerifyRequest):
     except Exception as e:
         ssi_detail = f"SSI lookup error: {str(e)}"
 
-    conn = get_conn()
-    cur = conn.cursor()
-    try:
-        claim_id = str(uuid.uuid4())
-        event_id = str(uuid.uuid4())
-        now = datetime.now(timezone.utc)
-        ssi_version = get_active_ingestion_version("ofac_consolidated", now)
-
-        cur.execute("""
-            INSERT INTO claims (claim_id, content, created_at)
-            VALUES (%s, %s, %s)
-        """, (claim_id, entity_name, now))
-
-        previous_hash = get_latest_event_hash(cur)
-        event_hash = compute_event_hash(
-            event_id=event_id,
-            event_type="ssi_verification",
-            aggregate_type="claim",
-            aggregate_id=claim_id,
-            actor_type="system",
-            actor_id="system",
-            payload={"entity": entity_name, "match": ssi_match, "detail": ssi_detail, "data_version": ssi_version},
-            created_at=now.isoformat(),
-            previous_hash=previous_hash,
-        )
-
-        cur.execute("""
-            INSERT INTO events (event_id, event_type, aggregate_type, aggregate_id, actor_type, actor_id, payload, created_at, event_hash, previous_hash)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (event_id, "ssi_verification", "claim", claim_id, "system", "system", json.dumps({
-            "entity": entity_name,
-            "match": ssi_match,
-            "detail": ssi_detail,
-            "data_version": ssi_version
-        }), now, event_hash, previous_hash))
-
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    finally:
-        cur.close()
-        conn.close()
+    payload = {
+        "entity": entity_name,
+        "match": ssi_match,
+        "detail": ssi_detail,
+        "data_version": ssi_version,
+        "matching_version": MATCHING_VERSION,
+        "hit_keys": [h["uid"] for h in ssi_hits],
+    }
+    claim_id, verified_at = record_verification("ssi_verification", entity_name, payload)
 
     return {
         "entity": entity_name,
@@ -1664,7 +1397,7 @@ async def verify_ssi(request: OFACVerifyRequest):
         "hits": ssi_hits,
         "sources_checked": ["OFAC Consolidated Sanctions List — SSI-designated programs (sanctionslistservice.ofac.treas.gov)"],
         "claim_id": claim_id,
-        "verified_at": now.isoformat(),
+        "verified_at": verified_at.isoformat(),
         "source_url": "https://sanctionslistservice.ofac.treas.gov/api/PublicationPreview/exports/CONSOLIDATED.XML",
         "data_version": ssi_version,
         "data_note": "SSI-designated entities are sourced from OFAC's Consolidated Sanctions List export. OFAC does not publish SSI as a standalone machine-readable file.",
@@ -1,11 +1,18 @@
+import os
+import time
 import uuid
 import json
+import asyncio
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Header, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from app.infra import bulk_import
 from app.infra.db import get_conn
+from app.infra.pagination import MAX_PAGE_SIZE, decode_cursor, page_response, page_size
+from app.screening.matching import prefilter_key
 
 router = APIRouter(prefix="/monitor", tags=["monitor"])
 
@@ -54,10 +61,10 @@ async def create_monitor(
 
         cur.execute("""
             INSERT INTO monitored_entities (
-                id, client_id, entity_name, entity_type, status, created_at, updated_at
+                id, client_id, entity_name, entity_type, status, match_key, created_at, updated_at
             )
-            VALUES (%s, %s, %s, %s, 'active', %s, %s)
-        """, (monitor_id, client_id, entity_name, request.entity_type, now, now))
+            VALUES (%s, %s, %s, %s, 'active', %s, %s, %s)
+        """, (monitor_id, client_id, entity_name, request.entity_type, prefilter_key(entity_name), now, now))
 
         conn.commit()
 
@@ -81,6 +88,186 @@ async def create_monitor(
         conn.close()
 
 
+# ---------------------------
+# POST /monitor/import
+# ---------------------------
+
+@router.post("/import", status_code=202)
+async def import_monitors(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    x_api_key: str = Header(default="DEVKEY123")
+):
+    """
+    Bulk-add monitors from a CSV (text/csv) or NDJSON (application/x-ndjson)
+    body. Returns a job to poll at GET /monitor/import/{job_id}.
+    """
+    client_id = x_api_key or "unknown"
+    try:
+        job, path = await bulk_import.start_import(request, "monitor", client_id)
+    except bulk_import.ImportRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    background_tasks.add_task(bulk_import.run_import, job, path, client_id)
+    return job
+
+
+# ---------------------------
+# GET /monitor/import/{job_id}
+# ---------------------------
+
+@router.get("/import/{job_id}")
+async def get_monitor_import(job_id: str, x_api_key: str = Header(default="DEVKEY123")):
+    try:
+        job = bulk_import.get_job(job_id, x_api_key or "unknown", "monitor")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+# ---------------------------
+# GET /monitor/events (change feed)
+# ---------------------------
+
+# A client's monitor_events in (txid, seq) order (sql/016_monitor_event_feed.sql),
+# served only once no running transaction can still add an event before them,
+# so a cursor never skips one. Cursors are "<txid>-<seq>"; no cursor starts
+# from the client's first event. Declared before /{monitor_id} so "events" is
+# not taken for a monitor id.
+#
+# Lag: that horizon is the oldest write transaction still running anywhere in
+# the database, not only monitor writers. An ingestion cycle
+# (app/ingestion/pipeline.py run_once) writes a new version in one transaction,
+# so events committed while it parses and serves a large list are held back
+# until it commits (seconds for the real lists, minutes for very large ones)
+# and then arrive together. Events are delayed, never lost or reordered.
+#
+# Long polls and streams hold no connection while they wait: each poll opens
+# a short-lived one and runs in the threadpool, off the event loop.
+
+EVENT_POLL_SECONDS = float(os.getenv("MONITOR_EVENT_POLL_SECONDS", "1"))
+EVENT_MAX_WAIT_SECONDS = 30
+EVENT_HEARTBEAT_SECONDS = 15
+
+
+def parse_event_cursor(cursor: str | None) -> tuple[str, int]:
+    if not cursor:
+        return "0", 0
+    try:
+        txid, seq = cursor.split("-")
+        return str(int(txid)), int(seq)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def fetch_events(cur, client_id: str, after: tuple[str, int], limit: int) -> list:
+    """(txid, seq, event_json) of the client's next `limit` events after `after`."""
+    cur.execute("""
+        SELECT e.txid::text, e.seq, json_build_object(
+            'event_id', e.id::text,
+            'monitor_id', e.monitor_id::text,
+            'entity_name', m.entity_name,
+            'event_type', e.event_type,
+            'previous_result', e.previous_result,
+            'current_result', e.current_result,
+            'detected_at', e.detected_at,
+            'cursor', e.txid::text || '-' || e.seq
+        )::text
+        FROM monitor_events e
+        JOIN monitored_entities m ON m.id = e.monitor_id
+        WHERE e.client_id = %s
+          AND (e.txid, e.seq) > (%s::xid8, %s)
+          AND e.txid < pg_snapshot_xmin(pg_current_snapshot())
+        ORDER BY e.txid, e.seq
+        LIMIT %s
+    """, (client_id, after[0], after[1], limit))
+    return cur.fetchall()
+
+
+def poll_events(client_id: str, after: tuple[str, int], limit: int) -> list:
+    """fetch_events on a connection of its own, closed before returning."""
+    conn = get_conn()
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        return fetch_events(cur, client_id, after, limit)
+    finally:
+        cur.close()
+        conn.close()
+
+
+@router.get("/events")
+async def list_monitor_events(
+    cursor: str | None = None,
+    limit: int = 100,
+    wait: int = 0,
+    x_api_key: str = Header(default="DEVKEY123")
+):
+    """
+    The client's monitor events after `cursor`, oldest first. With `wait`
+    (seconds, up to 30) the request is held until an event arrives (long
+    poll). Always returns next_cursor to continue from. Events can lag while
+    an ingestion cycle is writing (see above).
+    """
+    client_id = x_api_key or "unknown"
+    after = parse_event_cursor(cursor)
+    limit = page_size(limit)
+    deadline = time.monotonic() + max(0, min(wait, EVENT_MAX_WAIT_SECONDS))
+
+    try:
+        while True:
+            rows = await asyncio.to_thread(poll_events, client_id, after, limit)
+            if rows or time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(EVENT_POLL_SECONDS)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    next_cursor = f"{rows[-1][0]}-{rows[-1][1]}" if rows else f"{after[0]}-{after[1]}"
+    body = '{"events": [' + ",".join(r[2] for r in rows) + '], "next_cursor": ' + json.dumps(next_cursor) + "}"
+    return Response(content=body, media_type="application/json")
+
+
+async def _event_stream(request: Request, client_id: str, after: tuple[str, int]):
+    idle = 0.0
+    while not await request.is_disconnected():
+        rows = await asyncio.to_thread(poll_events, client_id, after, MAX_PAGE_SIZE)
+        for txid, seq, event in rows:
+            yield f"id: {txid}-{seq}\ndata: {event}\n\n"
+        if rows:
+            after, idle = (rows[-1][0], rows[-1][1]), 0.0
+            continue
+        if idle >= EVENT_HEARTBEAT_SECONDS:
+            yield ": keep-alive\n\n"
+            idle = 0.0
+        await asyncio.sleep(EVENT_POLL_SECONDS)
+        idle += EVENT_POLL_SECONDS
+
+
+@router.get("/events/stream")
+async def stream_monitor_events(
+    request: Request,
+    cursor: str | None = None,
+    last_event_id: str | None = Header(default=None),
+    x_api_key: str = Header(default="DEVKEY123")
+):
+    """
+    Server-sent events: one `data:` message per monitor event, with its cursor
+    as the SSE id, so a reconnecting EventSource resumes from Last-Event-ID.
+    """
+    after = parse_event_cursor(last_event_id or cursor)
+    return StreamingResponse(
+        _event_stream(request, x_api_key or "unknown", after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ---------------------------
 # GET /monitor/{monitor_id}
 # ---------------------------
@@ -153,44 +340,72 @@ async def delete_monitor(monitor_id: str):
 
 
 # ---------------------------
-# GET /monitor (list all for client)
+# GET /monitor (list for client, paginated)
 # ---------------------------
 
-@router.get("", response_model=list[MonitorOut])
+@router.get("")
 async def list_monitors(
+    limit: int = 100,
+    cursor: str | None = None,
+    status: str | None = None,
+    last_match_status: str | None = None,
+    changed_since: datetime | None = None,
     x_api_key: str = Header(default="DEVKEY123")
 ):
+    """
+    The client's monitors, newest first, `limit` per page; pass the
+    X-Next-Cursor response header back as `cursor` for the next page.
+    Filters: status, last_match_status ("match" / "clear": whether the last
+    check matched any list) and changed_since (status changed at or after).
+    """
     client_id = x_api_key or "unknown"
+    limit = page_size(limit)
+
+    conditions, params = ["client_id = %s"], [client_id]
+    if status:
+        conditions.append("status = %s")
+        params.append(status)
+    if last_match_status:
+        if last_match_status not in ("match", "clear"):
+            raise HTTPException(status_code=400, detail="last_match_status must be 'match' or 'clear'")
+        conditions.append("(last_check_result->>'any_match')::boolean = %s")
+        params.append(last_match_status == "match")
+    if changed_since:
+        conditions.append("last_status_change_at >= %s")
+        params.append(changed_since)
+    if cursor:
+        try:
+            conditions.append("(created_at, id) < (%s::timestamptz, %s::uuid)")
+            params.extend(decode_cursor(cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
 
     conn = get_conn()
     cur = conn.cursor()
     try:
-        cur.execute("""
-            SELECT id, client_id, entity_name, entity_type, status,
-                   last_check_at, last_check_result, last_status_change_at, created_at
+        cur.execute(f"""
+            SELECT created_at, id::text, json_build_object(
+                'monitor_id', id::text,
+                'client_id', client_id,
+                'entity_name', entity_name,
+                'entity_type', entity_type,
+                'status', status,
+                'last_check_at', last_check_at,
+                'last_check_result', last_check_result,
+                'last_status_change_at', last_status_change_at,
+                'created_at', created_at
+            )::text
             FROM monitored_entities
-            WHERE client_id = %s
-            ORDER BY created_at DESC
-        """, (client_id,))
+            WHERE {" AND ".join(conditions)}
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s
+        """, params + [limit + 1])
         rows = cur.fetchall()
 
-        return [
-            MonitorOut(
-                monitor_id=str(r[0]),
-                client_id=r[1],
-                entity_name=r[2],
-                entity_type=r[3],
-                status=r[4],
-                last_check_at=r[5].isoformat() if r[5] else None,
-                last_check_result=r[6] if isinstance(r[6], dict) else None,
-                last_status_change_at=r[7].isoformat() if r[7] else None,
-                created_at=r[8].isoformat(),
-            )
-            for r in rows
-        ]
-
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     finally:
         cur.close()
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+    return page_response(rows, limit)
@@ -1,18 +1,105 @@
-import hashlib
+import os
 import json
-import xml.etree.ElementTree as ET
-import io
-import csv
+import math
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, HTTPException
-from rapidfuzz import fuzz
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
 from app.infra.db import get_conn
+from app.screening.index import INDEX_CACHE, SnapshotMissing, VersionIndex, get_index
+from app.screening.matching import MATCHING_VERSION
+from app.screening.replay import LATENCY_BUCKETS_MS, compare, replay_event, replay_hits, screen_for
 
 router = APIRouter(prefix="/replay", tags=["replay"])
 
 
+def load_version(cur, version_id: int, source: str) -> VersionIndex:
+    try:
+        return get_index(cur, version_id, source)
+    except SnapshotMissing as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+# Process-pool workers for bulk replay: each worker receives one version's index
+# once (initializer) and then scores batches of (query, programs) against it.
+_WORKER_INDEX = None
+
+
+def _init_worker(index):
+    global _WORKER_INDEX
+    _WORKER_INDEX = index
+
+
+def _score_batch(queries: list) -> list:
+    return [_WORKER_INDEX.match(q, programs) for q, programs in queries]
+
+
+# ---------------------------
+# GET /replay/cache/stats
+# ---------------------------
+
+@router.get("/cache/stats")
+async def replay_cache_stats():
+    return INDEX_CACHE.stats()
+
+
+# ---------------------------
+# GET /replay/audit/stats
+# ---------------------------
+
+@router.get("/audit/stats")
+async def replay_audit_stats(hours: int = 24):
+    """Outcomes and latency histogram of the background replay auditor over the last `hours`."""
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT COUNT(*),
+                   COUNT(*) FILTER (WHERE result_consistent AND hash_verified),
+                   COUNT(*) FILTER (WHERE NOT result_consistent OR NOT hash_verified),
+                   COUNT(*) FILTER (WHERE result_consistent IS NULL),
+                   percentile_cont(0.5) WITHIN GROUP (ORDER BY latency_ms),
+                   percentile_cont(0.99) WITHIN GROUP (ORDER BY latency_ms)
+            FROM replay_audits
+            WHERE audited_at >= NOW() - make_interval(hours => %s)
+        """, (hours,))
+        audited, consistent, mismatched, unreplayable, p50, p99 = cur.fetchone()
+
+        # width_bucket(x, bounds) = number of bounds <= x, so shift by one for "<= bound" buckets
+        cur.execute("""
+            SELECT width_bucket(latency_ms - 1e-9, %s::float8[]), COUNT(*)
+            FROM replay_audits
+            WHERE audited_at >= NOW() - make_interval(hours => %s)
+            GROUP BY 1
+        """, (list(LATENCY_BUCKETS_MS), hours))
+        counts = dict(cur.fetchall())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    finally:
+        cur.close()
+        conn.close()
+
+    labels = [f"le_{b}" for b in LATENCY_BUCKETS_MS] + [f"gt_{LATENCY_BUCKETS_MS[-1]}"]
+    return {
+        "window_hours": hours,
+        "audited": audited,
+        "consistent": consistent,
+        "mismatched": mismatched,
+        "unreplayable": unreplayable,
+        "latency_ms": {
+            "p50": round(p50, 2) if p50 is not None else None,
+            "p99": round(p99, 2) if p99 is not None else None,
+            "histogram": {label: counts.get(i, 0) for i, label in enumerate(labels)},
+        },
+    }
+
+
 # ---------------------------
 # GET /replay/{receipt_id}
 # ---------------------------
@@ -49,73 +136,14 @@ async def replay_receipt(receipt_id: str):
         if not version_id:
             raise HTTPException(status_code=400, detail="Receipt has no version_id — cannot replay")
 
-        # Step 2: Get the raw snapshot for that version
-        cur.execute("""
-            SELECT raw_bytes, content_hash
-            FROM ingestion_snapshots
-            WHERE version_id = %s
-        """, (version_id,))
-        snapshot = cur.fetchone()
-
-        if not snapshot:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No raw snapshot found for version_id {version_id}. Snapshots are stored from ingestion cycles after this feature was added."
-            )
-
-        raw_bytes, snapshot_hash = snapshot
-
-        # Step 3: Verify snapshot integrity
-        computed_hash = hashlib.sha256(raw_bytes.encode()).hexdigest()
-        hash_verified = computed_hash == original_hash
-
-        # Step 4: Re-run the screen against the snapshot
-        replay_hits = []
-        FUZZY_THRESHOLD = 85
-
-        if source in ("ofac_sdn", "ofac_consolidated"):
-            try:
-                root = ET.fromstring(raw_bytes)
-                entries = root.findall(".//{*}sdnEntry")
-                for entry in entries:
-                    def get(tag):
-                        el = entry.find(f"{{*}}{tag}")
-                        return el.text.strip() if el is not None and el.text else ""
-                    full_name = f"{get('firstName')} {get('lastName')}".strip()
-                    score = max(
-                        fuzz.token_sort_ratio(entity_name.upper(), full_name.upper()),
-                        fuzz.partial_ratio(entity_name.upper(), full_name.upper()),
-                    )
-                    if score >= FUZZY_THRESHOLD:
-                        replay_hits.append({
-                            "name": full_name,
-                            "match_score": round(score / 100, 2),
-                        })
-            except Exception as e:
-                replay_hits = [{"error": f"Parse error: {str(e)}"}]
-
-        elif source == "bis_dpl":
-            try:
-                reader = csv.DictReader(io.StringIO(raw_bytes))
-                for row in reader:
-                    name = row.get("Name", "").strip()
-                    if not name:
-                        continue
-                    score = max(
-                        fuzz.token_sort_ratio(entity_name.upper(), name.upper()),
-                        fuzz.partial_ratio(entity_name.upper(), name.upper()),
-                    )
-                    if score >= FUZZY_THRESHOLD:
-                        replay_hits.append({
-                            "name": name,
-                            "match_score": round(score / 100, 2),
-                        })
-            except Exception as e:
-                replay_hits = [{"error": f"Parse error: {str(e)}"}]
-
-        replay_match = len(replay_hits) > 0
+        # Step 2: Re-run the same screen with the shared matcher against the
+        # verified index of that version (the one live screening used)
+        try:
+            result = replay_event(cur, event_type, payload)
+        except SnapshotMissing as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        hits_out = ([{"error": result.parse_error}] if result.parse_error else []) + result.hits
         original_match = payload.get("match", False)
-        result_consistent = replay_match == original_match
 
     except HTTPException:
         raise
@@ -138,18 +166,171 @@ async def replay_receipt(receipt_id: str):
             "ingested_at": data_version.get("ingested_at"),
         },
         "integrity": {
-            "hash_verified": hash_verified,
-            "computed_hash": computed_hash,
+            "hash_verified": result.hash_verified,
+            "computed_hash": result.computed_hash,
             "original_hash": original_hash,
+            "verified_via": result.verified_via,
         },
         "original_result": {
             "match": original_match,
+            "hit_keys": payload.get("hit_keys"),
+            "matching_version": payload.get("matching_version"),
             "event_hash": event_hash,
         },
         "replay_result": {
-            "match": replay_match,
-            "hits": replay_hits[:5],
+            "match": result.replay_match,
+            "hits": hits_out,
+            "matching_version": MATCHING_VERSION,
         },
-        "result_consistent": result_consistent,
-        "note": "Replay re-ran the original check against the raw snapshot stored at ingestion time. Hash verification confirms the snapshot is unmodified."
-    }
\ No newline at end of file
+        "result_consistent": result.result_consistent,
+        "note": "Replay re-ran the original check with the shared matcher against the list version stored at ingestion time. Hash verification confirms the snapshot is unmodified."
+    }
+
+# ---------------------------
+# POST /replay/bulk
+# ---------------------------
+
+REPLAY_POOL_WORKERS = int(os.getenv("REPLAY_POOL_WORKERS", str(os.cpu_count() or 1)))
+REPLAY_POOL_MIN_RECEIPTS = int(os.getenv("REPLAY_POOL_MIN_RECEIPTS", "64"))
+BULK_REPLAY_MAX_RECEIPTS = int(os.getenv("BULK_REPLAY_MAX_RECEIPTS", "100000"))
+
+
+class BulkReplayRequest(BaseModel):
+    version_id: int | None = None
+    from_time: datetime | None = None
+    to_time: datetime | None = None
+
+
+def _score_version(index, queries: list) -> list:
+    """Score every (query, programs) of one version; large groups are spread over a process pool."""
+    if len(queries) < REPLAY_POOL_MIN_RECEIPTS or REPLAY_POOL_WORKERS <= 1:
+        return [index.match(q, programs) for q, programs in queries]
+
+    chunk = max(1, math.ceil(len(queries) / (REPLAY_POOL_WORKERS * 4)))
+    batches = [queries[i:i + chunk] for i in range(0, len(queries), chunk)]
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(REPLAY_POOL_WORKERS, mp_context=ctx,
+                             initializer=_init_worker, initargs=(index,)) as pool:
+        return [result for batch in pool.map(_score_batch, batches) for result in batch]
+
+
+def receipt_version_id(payload: dict) -> int | None:
+    """The version a receipt was screened against, or None when it has none to replay."""
+    data_version = payload.get("data_version")
+    if not isinstance(data_version, dict) or not isinstance(data_version.get("version_id"), int):
+        return None
+    return data_version["version_id"]
+
+
+def _bulk_replay_lines(req: BulkReplayRequest):
+    started = time.perf_counter()
+    conn = get_conn()
+    cur = conn.cursor()
+    summary = {"type": "summary", "receipts": 0, "consistent": 0, "inconsistent": 0, "truncated": False,
+               "versions": {}}
+
+    try:
+        # One screening event per receipt, grouped by version. Receipts without
+        # a data_version object and version_id (JSON null on old receipts)
+        # cannot be replayed, as in scripts/replay_auditor.py.
+        filters, params = [
+            "jsonb_typeof(payload->'data_version') = 'object'",
+            "jsonb_typeof(payload->'data_version'->'version_id') = 'number'",
+        ], []
+        if req.version_id is not None:
+            filters.append("(payload->'data_version'->>'version_id')::int = %s")
+            params.append(req.version_id)
+        if req.from_time is not None:
+            filters.append("created_at >= %s")
+            params.append(req.from_time)
+        if req.to_time is not None:
+            filters.append("created_at < %s")
+            params.append(req.to_time)
+        # One row over the cap tells a complete run from a truncated one.
+        params.append(BULK_REPLAY_MAX_RECEIPTS + 1)
+
+        cur.execute(f"""
+            SELECT aggregate_id, event_type, payload, created_at
+            FROM (
+                SELECT DISTINCT ON (aggregate_id) aggregate_id, event_type, payload, created_at
+                FROM events
+                WHERE {" AND ".join(filters)}
+                ORDER BY aggregate_id, created_at ASC
+            ) receipts
+            ORDER BY (payload->'data_version'->>'version_id')::int, created_at
+            LIMIT %s
+        """, params)
+        rows = cur.fetchall()
+        summary["truncated"] = len(rows) > BULK_REPLAY_MAX_RECEIPTS
+        rows = [r for r in rows[:BULK_REPLAY_MAX_RECEIPTS] if receipt_version_id(r[2]) is not None]
+
+        for version_id, group in groupby(rows, key=lambda r: receipt_version_id(r[2])):
+            group = list(group)
+            data_version = group[0][2]["data_version"]
+            source = data_version.get("source")
+            try:
+                loaded = load_version(cur, version_id, source)
+            except HTTPException as e:
+                summary["versions"][version_id] = {"receipts": len(group), "error": e.detail}
+                yield json.dumps({"type": "version_error", "version_id": version_id, "error": e.detail}) + "\n"
+                continue
+
+            index = loaded.index
+            hash_verified = loaded.computed_hash == data_version.get("content_hash")
+            queries = [
+                (payload.get("entity") or "", screen_for(event_type, source).programs)
+                for _, event_type, payload, _ in group
+            ]
+            results = _score_version(index, queries)
+            consistent = 0
+
+            for (receipt_id, event_type, payload, verified_at), hits in zip(group, results):
+                original_match = payload.get("match", False)
+                replay_match, result_consistent = compare(payload, index, hits, loaded.parse_error)
+                consistent += result_consistent
+                yield json.dumps({
+                    "type": "receipt",
+                    "receipt_id": receipt_id,
+                    "entity": payload.get("entity"),
+                    "event_type": event_type,
+                    "verified_at": verified_at.isoformat(),
+                    "version_id": version_id,
+                    "hash_verified": hash_verified,
+                    "original_match": original_match,
+                    "replay_match": replay_match,
+                    "result_consistent": result_consistent,
+                    "hits": replay_hits(index, hits),
+                }) + "\n"
+
+            summary["receipts"] += len(group)
+            summary["consistent"] += consistent
+            summary["inconsistent"] += len(group) - consistent
+            summary["versions"][version_id] = {
+                "receipts": len(group),
+                "consistent": consistent,
+                "hash_verified": hash_verified,
+                "verified_via": loaded.verified_via,
+            }
+
+    except Exception as e:
+        summary["error"] = f"Replay error: {str(e)}"
+    finally:
+        cur.close()
+        conn.close()
+
+    summary["elapsed_s"] = round(time.perf_counter() - started, 3)
+    summary["replayed_at"] = datetime.now(timezone.utc).isoformat()
+    yield json.dumps(summary) + "\n"
+
+
+@router.post("/bulk")
+def bulk_replay(req: BulkReplayRequest):
+    """
+    Replay every receipt screened against a version and/or within a time window.
+    Streams NDJSON: one line per receipt, then a summary line. At most
+    BULK_REPLAY_MAX_RECEIPTS are replayed; the summary's `truncated` says
+    whether more matched.
+    """
+    if req.version_id is None and (req.from_time is None or req.to_time is None):
+        raise HTTPException(status_code=400, detail="Provide version_id, or both from_time and to_time")
+    return StreamingResponse(_bulk_replay_lines(req), media_type="application/x-ndjson")
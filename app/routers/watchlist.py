@@ -1,10 +1,13 @@
 import uuid
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Header, Request
 from pydantic import BaseModel
 
+from app.infra import bulk_import
 from app.infra.db import get_conn
+from app.infra.pagination import decode_cursor, page_response, page_size
+from app.screening.matching import prefilter_key
 
 router = APIRouter(prefix="/watchlist", tags=["watchlist"])
 
@@ -48,10 +51,10 @@ async def add_to_watchlist(
     cur = conn.cursor()
     try:
         cur.execute("""
-            INSERT INTO watchlist (client_id, entity_name, entity_type)
-            VALUES (%s, %s, %s)
+            INSERT INTO watchlist (client_id, entity_name, entity_type, match_key)
+            VALUES (%s, %s, %s, %s)
             RETURNING id, client_id, entity_name, entity_type, added_at, last_checked_at, last_receipt_id, is_active
-        """, (client_id, entity_name, request.entity_type))
+        """, (client_id, entity_name, request.entity_type, prefilter_key(entity_name)))
 
         row = cur.fetchone()
         conn.commit()
@@ -75,48 +78,121 @@ async def add_to_watchlist(
         conn.close()
 
 
+# ---------------------------
+# POST /watchlist/import
+# ---------------------------
+
+@router.post("/import", status_code=202)
+async def import_watchlist(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    x_api_key: str = Header(default="DEVKEY123")
+):
+    """
+    Bulk-add watchlist entries from a CSV (text/csv) or NDJSON (application/x-ndjson)
+    body. Returns a job to poll at GET /watchlist/import/{job_id}.
+    """
+    client_id = x_api_key or "unknown"
+    try:
+        job, path = await bulk_import.start_import(request, "watchlist", client_id)
+    except bulk_import.ImportRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    background_tasks.add_task(bulk_import.run_import, job, path, client_id)
+    return job
+
+
+# ---------------------------
+# GET /watchlist/import/{job_id}
+# ---------------------------
+
+@router.get("/import/{job_id}")
+async def get_watchlist_import(job_id: str, x_api_key: str = Header(default="DEVKEY123")):
+    try:
+        job = bulk_import.get_job(job_id, x_api_key or "unknown", "watchlist")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
 # ---------------------------
 # GET /watchlist
 # ---------------------------
 
-@router.get("", response_model=list[WatchlistOut])
+@router.get("")
 async def list_watchlist(
+    limit: int = 100,
+    cursor: str | None = None,
+    status: str = "active",
+    last_match_status: str | None = None,
+    changed_since: datetime | None = None,
     x_api_key: str = Header(default="DEVKEY123")
 ):
+    """
+    The client's watchlist entries, newest first, `limit` per page; pass the
+    X-Next-Cursor response header back as `cursor` for the next page.
+    Filters: status ("active", "inactive" or "all"), last_match_status
+    ("match" / "clear") and changed_since (match status changed at or after).
+    """
     client_id = x_api_key or "unknown"
+    limit = page_size(limit)
+
+    conditions, params = ["client_id = %s"], [client_id]
+    if status not in ("active", "inactive", "all"):
+        raise HTTPException(status_code=400, detail="status must be 'active', 'inactive' or 'all'")
+    if status != "all":
+        conditions.append("is_active = %s")
+        params.append(status == "active")
+    if last_match_status:
+        if last_match_status not in ("match", "clear"):
+            raise HTTPException(status_code=400, detail="last_match_status must be 'match' or 'clear'")
+        conditions.append("last_match_status = %s")
+        params.append(last_match_status)
+    if changed_since:
+        conditions.append("last_status_change_at >= %s")
+        params.append(changed_since)
+    if cursor:
+        try:
+            conditions.append("(added_at, id) < (%s::timestamptz, %s::int)")
+            params.extend(decode_cursor(cursor, int))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
 
     conn = get_conn()
     cur = conn.cursor()
     try:
-        cur.execute("""
-            SELECT id, client_id, entity_name, entity_type, added_at,
-                   last_checked_at, last_receipt_id, is_active
+        cur.execute(f"""
+            SELECT added_at, id, json_build_object(
+                'id', id,
+                'client_id', client_id,
+                'entity_name', entity_name,
+                'entity_type', entity_type,
+                'added_at', added_at,
+                'last_checked_at', last_checked_at,
+                'last_receipt_id', last_receipt_id,
+                'last_match_status', last_match_status,
+                'last_status_change_at', last_status_change_at,
+                'is_active', is_active
+            )::text
             FROM watchlist
-            WHERE client_id = %s AND is_active = TRUE
-            ORDER BY added_at DESC
-        """, (client_id,))
+            WHERE {" AND ".join(conditions)}
+            ORDER BY added_at DESC, id DESC
+            LIMIT %s
+        """, params + [limit + 1])
         rows = cur.fetchall()
 
-        return [
-            WatchlistOut(
-                id=r[0],
-                client_id=r[1],
-                entity_name=r[2],
-                entity_type=r[3],
-                added_at=r[4].isoformat(),
-                last_checked_at=r[5].isoformat() if r[5] else None,
-                last_receipt_id=r[6],
-                is_active=r[7],
-            )
-            for r in rows
-        ]
-
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     finally:
         cur.close()
         conn.close()
 
+    return page_response(rows, limit)
+
 
 # ---------------------------
 # DELETE /watchlist/{id}
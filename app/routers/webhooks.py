@@ -1,10 +1,13 @@
+import secrets
 import uuid
 from datetime import datetime, timezone
+from urllib.parse import urlsplit
 
 from fastapi import APIRouter, HTTPException, Header
 from pydantic import BaseModel
 
 from app.infra.db import get_conn
+from app.infra.pagination import decode_cursor, page_response, page_size
 
 router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 
@@ -15,6 +18,8 @@ router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 
 class WebhookCreateRequest(BaseModel):
     endpoint_url: str
+    # Opt in to batched delivery: alerts queued within the window arrive as one payload.
+    batch_window_seconds: int | None = None
 
 
 class WebhookOut(BaseModel):
@@ -23,6 +28,24 @@ class WebhookOut(BaseModel):
     endpoint_url: str
     is_active: bool
     created_at: str
+    batch_window_seconds: int | None = None
+    # Only returned on registration: the key deliveries are signed with (X-Webhook-Signature).
+    signing_secret: str | None = None
+
+
+MAX_BATCH_WINDOW_SECONDS = 3600
+
+
+def valid_endpoint_url(url: str) -> bool:
+    """An http(s) URL with a host, that the dispatcher can post to."""
+    if any(c.isspace() for c in url):
+        return False
+    try:
+        parsed = urlsplit(url)
+        parsed.port   # ValueError on a malformed port
+    except ValueError:
+        return False
+    return parsed.scheme in ("http", "https") and bool(parsed.hostname)
 
 
 # ---------------------------
@@ -37,6 +60,12 @@ async def register_webhook(
     endpoint_url = request.endpoint_url.strip()
     if not endpoint_url:
         raise HTTPException(status_code=400, detail="endpoint_url is required")
+    if not valid_endpoint_url(endpoint_url):
+        raise HTTPException(status_code=400, detail="endpoint_url must be an http(s) URL with a host")
+
+    window = request.batch_window_seconds
+    if window is not None and not 1 <= window <= MAX_BATCH_WINDOW_SECONDS:
+        raise HTTPException(status_code=400, detail=f"batch_window_seconds must be between 1 and {MAX_BATCH_WINDOW_SECONDS}")
 
     client_id = x_api_key or "unknown"
 
@@ -44,10 +73,10 @@ async def register_webhook(
     cur = conn.cursor()
     try:
         cur.execute("""
-            INSERT INTO webhooks (client_id, endpoint_url)
-            VALUES (%s, %s)
-            RETURNING id, client_id, endpoint_url, is_active, created_at
-        """, (client_id, endpoint_url))
+            INSERT INTO webhooks (client_id, endpoint_url, secret, batch_window_seconds)
+            VALUES (%s, %s, %s, %s)
+            RETURNING id, client_id, endpoint_url, is_active, created_at, batch_window_seconds, secret
+        """, (client_id, endpoint_url, secrets.token_hex(32), window))
 
         row = cur.fetchone()
         conn.commit()
@@ -58,6 +87,8 @@ async def register_webhook(
             endpoint_url=row[2],
             is_active=row[3],
             created_at=row[4].isoformat(),
+            batch_window_seconds=row[5],
+            signing_secret=row[6],
         )
 
     except Exception as e:
@@ -72,35 +103,190 @@ async def register_webhook(
 # GET /webhooks
 # ---------------------------
 
-@router.get("", response_model=list[WebhookOut])
+@router.get("")
 async def list_webhooks(
+    limit: int = 100,
+    cursor: str | None = None,
+    status: str = "active",
     x_api_key: str = Header(default="DEVKEY123")
 ):
+    """
+    The client's webhooks, newest first, `limit` per page; pass the
+    X-Next-Cursor response header back as `cursor` for the next page.
+    Filter: status ("active", "inactive" or "all").
+    """
     client_id = x_api_key or "unknown"
+    limit = page_size(limit)
+
+    conditions, params = ["client_id = %s"], [client_id]
+    if status not in ("active", "inactive", "all"):
+        raise HTTPException(status_code=400, detail="status must be 'active', 'inactive' or 'all'")
+    if status != "all":
+        conditions.append("is_active = %s")
+        params.append(status == "active")
+    if cursor:
+        try:
+            conditions.append("(created_at, id) < (%s::timestamptz, %s::int)")
+            params.extend(decode_cursor(cursor, int))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
 
     conn = get_conn()
     cur = conn.cursor()
     try:
-        cur.execute("""
-            SELECT id, client_id, endpoint_url, is_active, created_at
+        cur.execute(f"""
+            SELECT created_at, id, json_build_object(
+                'id', id,
+                'client_id', client_id,
+                'endpoint_url', endpoint_url,
+                'is_active', is_active,
+                'created_at', created_at,
+                'batch_window_seconds', batch_window_seconds,
+                'signing_secret', NULL
+            )::text
             FROM webhooks
-            WHERE client_id = %s AND is_active = TRUE
+            WHERE {" AND ".join(conditions)}
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s
+        """, params + [limit + 1])
+        rows = cur.fetchall()
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    finally:
+        cur.close()
+        conn.close()
+
+    return page_response(rows, limit)
+
+
+# ---------------------------
+# GET /webhooks/deliveries/stats
+# ---------------------------
+
+@router.get("/deliveries/stats")
+async def delivery_stats(
+    hours: int = 24,
+    x_api_key: str = Header(default="DEVKEY123")
+):
+    """Outbox deliveries of the client's alerts queued in the last `hours`, with end-to-end latency."""
+    client_id = x_api_key or "unknown"
+
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT COUNT(*),
+                   COUNT(*) FILTER (WHERE status = 'delivered'),
+                   COUNT(*) FILTER (WHERE status = 'pending'),
+                   COUNT(*) FILTER (WHERE status = 'dead'),
+                   COUNT(*) FILTER (WHERE status = 'pending' AND attempts > 0),
+                   percentile_cont(0.5) WITHIN GROUP (ORDER BY latency_ms),
+                   percentile_cont(0.99) WITHIN GROUP (ORDER BY latency_ms),
+                   AVG(attempts) FILTER (WHERE status = 'delivered')
+            FROM webhook_outbox
+            WHERE client_id = %s
+              AND created_at >= NOW() - make_interval(hours => %s)
+        """, (client_id, hours))
+        queued, delivered, pending, dead, retrying, p50, p99, attempts = cur.fetchone()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    finally:
+        cur.close()
+        conn.close()
+
+    return {
+        "window_hours": hours,
+        "queued": queued,
+        "delivered": delivered,
+        "pending": pending,
+        "retrying": retrying,
+        "dead": dead,
+        "avg_attempts": round(float(attempts), 2) if attempts is not None else None,
+        "latency_ms": {
+            "p50": round(p50, 2) if p50 is not None else None,
+            "p99": round(p99, 2) if p99 is not None else None,
+        },
+    }
+
+
+# ---------------------------
+# GET /webhooks/deliveries/dead
+# ---------------------------
+
+@router.get("/deliveries/dead")
+async def dead_deliveries(
+    limit: int = 100,
+    x_api_key: str = Header(default="DEVKEY123")
+):
+    """The client's dead-lettered deliveries (attempts exhausted), newest first."""
+    client_id = x_api_key or "unknown"
+
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT id, webhook_id, endpoint_url, event_type, payload, attempts,
+                   last_status_code, last_error, created_at
+            FROM webhook_outbox
+            WHERE client_id = %s AND status = 'dead'
             ORDER BY created_at DESC
-        """, (client_id,))
+            LIMIT %s
+        """, (client_id, min(limit, 1000)))
         rows = cur.fetchall()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    finally:
+        cur.close()
+        conn.close()
+
+    return [
+        {
+            "delivery_id": r[0],
+            "webhook_id": r[1],
+            "endpoint_url": r[2],
+            "event_type": r[3],
+            "payload": r[4],
+            "attempts": r[5],
+            "last_status_code": r[6],
+            "last_error": r[7],
+            "created_at": r[8].isoformat(),
+        }
+        for r in rows
+    ]
+
 
-        return [
-            WebhookOut(
-                id=r[0],
-                client_id=r[1],
-                endpoint_url=r[2],
-                is_active=r[3],
-                created_at=r[4].isoformat(),
-            )
-            for r in rows
-        ]
+# ---------------------------
+# POST /webhooks/deliveries/{id}/retry
+# ---------------------------
+
+@router.post("/deliveries/{delivery_id}/retry")
+async def retry_delivery(
+    delivery_id: int,
+    x_api_key: str = Header(default="DEVKEY123")
+):
+    """Put a dead-lettered delivery back in the outbox with a fresh set of attempts."""
+    client_id = x_api_key or "unknown"
+
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            UPDATE webhook_outbox
+            SET status = 'pending', attempts = 0, next_attempt_at = NOW()
+            WHERE id = %s AND client_id = %s AND status = 'dead'
+        """, (delivery_id, client_id))
 
+        if cur.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Dead delivery not found")
+
+        conn.commit()
+        return {"delivery_id": delivery_id, "status": "pending"}
+
+    except HTTPException:
+        raise
     except Exception as e:
+        conn.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     finally:
         cur.close()
@@ -0,0 +1,150 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from app.screening.index import get_index
+from app.screening.matching import SCREENS, Screen
+
+SCREEN_WORKERS = int(os.getenv("SCREEN_WORKERS", str(os.cpu_count() or 1)))
+
+
+class ScreeningError(Exception):
+    """A screen could not run against the version it must be recorded with."""
+
+
+def verified_index(cur, screen: Screen, data_version: dict | None):
+    """The NameIndex of `data_version`, refusing one whose data does not hash to its content_hash."""
+    if not data_version:
+        raise ScreeningError(f"no active {screen.source} version")
+    loaded = get_index(cur, data_version["version_id"], screen.source)
+    if loaded.parse_error:
+        raise ScreeningError(loaded.parse_error)
+    if loaded.computed_hash != data_version["content_hash"]:
+        raise ScreeningError(f"version {data_version['version_id']} failed hash verification")
+    return loaded.index
+
+
+def screen_version(cur, screen: Screen, entity_name: str, data_version: dict | None):
+    """
+    Match `entity_name` against the list version recorded on the receipt.
+    Returns (NameIndex, [Hit]).
+    """
+    index = verified_index(cur, screen, data_version)
+    return index, index.match(entity_name, screen.programs)
+
+
+def serving_rows(cur, table: str, key_column: str, columns: tuple, keys: list) -> dict:
+    """Display columns for hit keys from a serving table: {key: row tuple}."""
+    if not keys:
+        return {}
+    cur.execute(
+        f"SELECT {key_column}, {', '.join(columns)} FROM {table} WHERE {key_column} = ANY(%s)",
+        (list(keys),),
+    )
+    return {row[0]: row[1:] for row in cur.fetchall()}
+
+
+def active_versions(cur, sources) -> dict:
+    """{source: data_version} of the versions active right now, in the receipt's data_version shape."""
+    cur.execute("""
+        SELECT DISTINCT ON (source) version_id, source, content_hash, entry_count, ingested_at
+        FROM ingestion_versions
+        WHERE source = ANY(%s)
+          AND activated_at <= NOW()
+        ORDER BY source, activated_at DESC
+    """, (list(sources),))
+    return {
+        row[1]: {
+            "version_id": row[0],
+            "source": row[1],
+            "content_hash": row[2],
+            "entry_count": row[3],
+            "ingested_at": row[4].isoformat(),
+        }
+        for row in cur.fetchall()
+    }
+
+
+# ---------------------------
+# Batch screening
+# ---------------------------
+
+# Pool workers receive every screen's index once (initializer) and then score
+# batches of names against all of them.
+_WORKER_SCREENS = None
+
+
+def _init_worker(screens: dict):
+    global _WORKER_SCREENS
+    _WORKER_SCREENS = screens
+
+
+def _screen_names(screens: dict, names: list, limit) -> list:
+    return [
+        {name: index.match(entity_name, programs, limit) for name, (index, programs) in screens.items()}
+        for entity_name in names
+    ]
+
+
+def _screen_batch(args) -> list:
+    names, limit = args
+    return _screen_names(_WORKER_SCREENS, names, limit)
+
+
+class BatchScreener:
+    """
+    Screens many names against a fixed set of (screen, version) pairs, loaded
+    once. Batches are spread over a process pool when there is more than one
+    worker. Use as a context manager so the pool is shut down.
+    """
+
+    def __init__(self, cur, screen_names, workers: int = SCREEN_WORKERS):
+        screens = [SCREENS[n] for n in screen_names]
+        self.versions = active_versions(cur, {s.source for s in screens})
+        self.indexes = {}
+        self.errors = {}
+        for screen in screens:
+            try:
+                self.indexes[screen.name] = verified_index(cur, screen, self.versions.get(screen.source))
+            except Exception as e:
+                self.errors[screen.name] = str(e)
+        self.screens = {s.name: s for s in screens}
+        self.workers = workers
+        self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    def data_version(self, screen_name: str) -> dict | None:
+        return self.versions.get(self.screens[screen_name].source)
+
+    def _payload(self) -> dict:
+        return {name: (index, self.screens[name].programs) for name, index in self.indexes.items()}
+
+    def screen(self, batches, limit=None):
+        """
+        Yield, per batch of names (in order), one {screen_name: [Hit]} per name.
+        Screens whose version could not be loaded are left out (see .errors).
+        """
+        if self.workers <= 1:
+            screens = self._payload()
+            for names in batches:
+                yield _screen_names(screens, names, limit)
+            return
+
+        if self.pool is None:
+            ctx = multiprocessing.get_context("spawn")
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=ctx,
+                                            initializer=_init_worker, initargs=(self._payload(),))
+        # Keep a bounded number of batches in flight so results stream back in order.
+        pending = []
+        for names in batches:
+            pending.append(self.pool.submit(_screen_batch, (names, limit)))
+            if len(pending) >= self.workers * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
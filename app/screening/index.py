@@ -0,0 +1,151 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.infra import snapshot_store
+from app.ingestion import artifact
+from app.ingestion.connectors import CONNECTORS
+from app.screening.matching import NameIndex
+
+# Per-version NameIndex loading and caching. Versions are immutable once locked,
+# so an index never goes stale: the cache only bounds memory.
+
+INDEX_CACHE_MAX_BYTES = int(os.getenv("INDEX_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+class SnapshotMissing(LookupError):
+    """The version has no stored snapshot to build an index from."""
+
+
+@dataclass
+class VersionIndex:
+    """A version's NameIndex plus how its source data was verified when loaded."""
+    index: NameIndex
+    computed_hash: str
+    verified_via: str
+    parse_error: str | None = None
+
+    @property
+    def size_bytes(self) -> int:
+        return self.index.size_bytes
+
+
+class IndexCache:
+    """Bounded LRU of VersionIndex keyed by version_id, evicting by estimated memory."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()   # version_id -> (VersionIndex, size)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, version_id: int) -> VersionIndex | None:
+        with self.lock:
+            entry = self.entries.get(version_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(version_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, version_id: int, loaded: VersionIndex):
+        size = loaded.size_bytes
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if version_id in self.entries:
+                return
+            self.entries[version_id] = (loaded, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "versions": list(self.entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+            }
+
+
+INDEX_CACHE = IndexCache(INDEX_CACHE_MAX_BYTES)
+
+
+def _artifact_rows(parsed: artifact.Artifact):
+    columns = ("key", "name", "first_name", "last_name", "entity_type", "programs")
+    return zip(*(parsed.values(c) for c in columns))
+
+
+def _snapshot_rows(connector, reader):
+    seen = set()
+    for key, _, record in connector.entries(reader):
+        if key in seen:
+            continue
+        seen.add(key)
+        yield (key, *connector.artifact_fields(record))
+
+
+def load_index(cur, version_id: int, source: str) -> VersionIndex:
+    """
+    Build the NameIndex of `version_id`. The pre-parsed artifact is verified
+    against its own hash and its link to the snapshot; without a usable one, the
+    raw snapshot is streamed through the list's connector and every byte read is
+    hashed.
+    """
+    cur.execute("""
+        SELECT raw_bytes, content_hash, store_path, artifact_path, artifact_hash
+        FROM ingestion_snapshots
+        WHERE version_id = %s
+    """, (version_id,))
+    row = cur.fetchone()
+    if not row:
+        raise SnapshotMissing(
+            f"No raw snapshot found for version_id {version_id}. Snapshots are stored from ingestion cycles after this feature was added."
+        )
+
+    raw_bytes, snapshot_hash, store_path, artifact_path, artifact_hash = row
+
+    if artifact_path:
+        try:
+            with artifact.open_verified(artifact_path, artifact_hash, snapshot_hash) as parsed:
+                index = NameIndex.build(source, version_id, _artifact_rows(parsed))
+            return VersionIndex(index, snapshot_hash, "artifact")
+        except Exception:
+            pass
+
+    if store_path:
+        reader = snapshot_store.open_snapshot(store_path)
+    else:
+        reader = snapshot_store.open_bytes(raw_bytes.encode())
+    parse_error = None
+    with reader:
+        try:
+            index = NameIndex.build(source, version_id, _snapshot_rows(CONNECTORS[source], reader))
+        except Exception as e:
+            index, parse_error = NameIndex.build(source, version_id, ()), f"Parse error: {str(e)}"
+        # drains anything the parser left unread
+        computed_hash = reader.hexdigest()
+    return VersionIndex(index, computed_hash, "snapshot", parse_error)
+
+
+def get_index(cur, version_id: int, source: str) -> VersionIndex:
+    """Cached load_index; indexes that failed to parse are not cached."""
+    loaded = INDEX_CACHE.get(version_id)
+    if loaded is None:
+        loaded = load_index(cur, version_id, source)
+        if not loaded.parse_error:
+            INDEX_CACHE.put(version_id, loaded)
+    return loaded
@@ -0,0 +1,232 @@
+import sys
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+from rapidfuzz import fuzz, process
+
+# Name matching shared by live screening (/verify/*), monitors and replay.
+#
+# Every screen runs against a NameIndex built from one list version's artifact,
+# never against the serving tables, so a receipt can be replayed bit-for-bit:
+# same version + same MATCHING_VERSION = same hits (Rule 7).
+#
+# Bump MATCHING_VERSION whenever candidate selection or scoring changes; it is
+# recorded in every receipt.
+#
+# v1: the live algorithm, made deterministic.
+#   - Prefilter: the first 4 characters of the upper-cased query must occur in a
+#     blocking string (OFAC: last, "first last", "last first"; BIS: name). This is
+#     the old LIKE '%XXXX%' scan as a plain substring test (no SQL wildcards) and
+#     without its unordered LIMIT 200, which made results depend on heap order.
+#   - Scores: OFAC max(token_sort full, token_sort last, partial full),
+#     others max(token_sort name, partial name). Hits >= FUZZY_THRESHOLD, best
+#     first, ties in snapshot order.
+
+MATCHING_VERSION = 1
+FUZZY_THRESHOLD = 85
+PREFILTER_CHARS = 4
+MAX_HITS = 10
+
+_SEP = "\0"   # never occurs in artifact values
+
+
+@dataclass(frozen=True)
+class Profile:
+    blocking: tuple   # index columns searched by the prefilter
+    scorers: tuple    # (scorer, index column) pairs; a candidate's score is the max
+
+
+OFAC_PROFILE = Profile(
+    blocking=("last", "first_last", "last_first"),
+    scorers=((fuzz.token_sort_ratio, "full"), (fuzz.token_sort_ratio, "last"), (fuzz.partial_ratio, "full")),
+)
+NAME_PROFILE = Profile(
+    blocking=("full",),
+    scorers=((fuzz.token_sort_ratio, "full"), (fuzz.partial_ratio, "full")),
+)
+
+PROFILES = {
+    "ofac_sdn": OFAC_PROFILE,
+    "ofac_consolidated": OFAC_PROFILE,
+    "ofac_ssi": OFAC_PROFILE,
+    "bis_dpl": NAME_PROFILE,
+}
+
+
+@dataclass(frozen=True)
+class Screen:
+    """One screening product: which list version it runs against and how."""
+    name: str
+    source: str           # ingestion source whose active version is screened
+    event_type: str       # ledger event type of its receipts
+    programs: tuple = ()  # when set, only entries carrying one of these programs
+
+
+SSI_PROGRAMS = (
+    "UKRAINE-EO13662",
+    "CAATSA - RUSSIA",
+    "RUSSIA-EO14024",
+    "CMIC-EO13959",
+    "VENEZUELA-EO13850",
+)
+
+SCREENS = {
+    s.name: s for s in (
+        Screen("ofac_sdn", "ofac_sdn", "ofac_verification"),
+        Screen("bis_dpl", "bis_dpl", "bis_dpl_verification"),
+        Screen("ofac_consolidated", "ofac_consolidated", "ofac_consolidated_verification"),
+        Screen("ssi", "ofac_consolidated", "ssi_verification", SSI_PROGRAMS),
+    )
+}
+SCREENS_BY_EVENT_TYPE = {s.event_type: s for s in SCREENS.values()}
+
+
+def normalize_query(query: str) -> str:
+    return query.strip().upper().replace(_SEP, "")
+
+
+def prefilter_key(name: str) -> str:
+    """The blocking key `name` is screened with: an entry is a candidate iff a blocking string contains it."""
+    return normalize_query(name)[:PREFILTER_CHARS]
+
+
+def match_type(score: float) -> str:
+    if score == 100:
+        return "exact"
+    if score >= 95:
+        return "partial"
+    return "fuzzy"
+
+
+@dataclass
+class Hit:
+    index: int      # position in the NameIndex (snapshot order)
+    score: float    # 0-100
+
+    @property
+    def match_score(self) -> float:
+        return round(self.score / 100, 2)
+
+    @property
+    def match_type(self) -> str:
+        return match_type(self.score)
+
+
+@dataclass
+class NameIndex:
+    """
+    Matching view of one list version: upper-cased name columns plus one
+    concatenated blocking string per profile column set, so the prefilter is a
+    C-level str.find walk instead of a per-entry loop.
+    """
+    source: str
+    version_id: int | None
+    keys: list
+    names: list
+    entity_types: list
+    programs: list
+    columns: dict                       # "full" / "last" / ... -> upper-cased values
+    blob: str = ""
+    starts: list = field(default_factory=list)
+
+    @classmethod
+    def build(cls, source: str, version_id, rows) -> "NameIndex":
+        """rows: (key, name, first_name, last_name, entity_type, programs) in snapshot order."""
+        profile = PROFILES.get(source, NAME_PROFILE)
+        keys, names, entity_types, programs = [], [], [], []
+        columns = {"full": [], "last": [], "first_last": [], "last_first": []}
+        for key, name, first, last, entity_type, progs in rows:
+            keys.append(key)
+            names.append(name)
+            entity_types.append(entity_type)
+            programs.append(progs)
+            first, last = (first or "").upper(), (last or "").upper()
+            columns["full"].append(name.upper())
+            columns["last"].append(last)
+            columns["first_last"].append(f"{first} {last}")
+            columns["last_first"].append(f"{last} {first}")
+        columns = {c: v for c, v in columns.items()
+                   if c in profile.blocking or c in {col for _, col in profile.scorers}}
+
+        index = cls(source, version_id, keys, names, entity_types, programs, columns)
+        index._build_blocking(profile)
+        return index
+
+    def _build_blocking(self, profile: Profile):
+        parts, starts, pos = [], [], 0
+        for i in range(len(self.keys)):
+            part = _SEP.join(self.columns[c][i] for c in profile.blocking) + _SEP
+            starts.append(pos)
+            parts.append(part)
+            pos += len(part)
+        self.blob = "".join(parts)
+        self.starts = starts
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def profile(self) -> Profile:
+        return PROFILES.get(self.source, NAME_PROFILE)
+
+    @property
+    def size_bytes(self) -> int:
+        size = sys.getsizeof(self.blob) + sys.getsizeof(self.starts) * 2
+        for values in (self.keys, self.names, self.entity_types, self.programs, *self.columns.values()):
+            size += sys.getsizeof(values) + sum(sys.getsizeof(v) for v in values)
+        return size
+
+    def entry_programs(self, i: int) -> list:
+        return self.programs[i].split("|") if self.programs[i] else []
+
+    def blocking_grams(self, i: int) -> set:
+        """
+        Every prefilter key entry `i` is a candidate for: the substrings of its
+        blocking strings up to PREFILTER_CHARS long (shorter keys come from
+        names under PREFILTER_CHARS characters).
+        """
+        grams = set()
+        for column in self.profile.blocking:
+            value = self.columns[column][i]
+            for n in range(1, PREFILTER_CHARS + 1):
+                grams.update(value[j:j + n] for j in range(len(value) - n + 1))
+        return grams
+
+    def candidates(self, key: str) -> list:
+        """Indices whose blocking strings contain `key`, in snapshot order."""
+        found = []
+        pos = self.blob.find(key)
+        while pos != -1:
+            i = bisect_right(self.starts, pos) - 1
+            found.append(i)
+            # skip the rest of this entry
+            next_start = self.starts[i + 1] if i + 1 < len(self.starts) else len(self.blob)
+            pos = self.blob.find(key, next_start)
+        return found
+
+    def match(self, query: str, programs=(), limit: int | None = MAX_HITS) -> list:
+        """Hits for one query, best first."""
+        query = normalize_query(query)
+        key = query[:PREFILTER_CHARS]
+        if not key:
+            return []
+        candidates = self.candidates(key)
+        if programs:
+            wanted = set(programs)
+            candidates = [i for i in candidates if wanted.intersection(self.entry_programs(i))]
+        if not candidates:
+            return []
+
+        scores = {}
+        for scorer, column in self.profile.scorers:
+            values = self.columns[column]
+            choices = {i: values[i] for i in candidates}
+            for _, score, i in process.extract(query, choices, scorer=scorer,
+                                               score_cutoff=FUZZY_THRESHOLD, limit=None):
+                if score > scores.get(i, -1):
+                    scores[i] = score
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [Hit(i, score) for i, score in ranked]
@@ -0,0 +1,41 @@
+import uuid
+from datetime import datetime
+
+from app.infra.ledger import append_event
+from app.screening.matching import MATCHING_VERSION, Screen
+
+# Screening receipts written by in-process screeners (the watchlist scheduler).
+# Same claim + ledger event shape as the /verify/* endpoints, so the receipts
+# are served by /receipt/{claim_id} and replayed like any other.
+
+LIST_LABELS = {
+    "ofac_sdn": "OFAC SDN list",
+    "bis_dpl": "BIS Denied Persons List",
+    "ofac_consolidated": "OFAC Consolidated Sanctions List",
+    "ssi": "SSI list",
+}
+
+
+def issue_receipt(cur, screen: Screen, entity_name: str, data_version: dict, hit_keys: list,
+                  created_at: datetime) -> str:
+    """Record one screen of `entity_name` as a claim and its ledger event. Returns the claim_id."""
+    claim_id = str(uuid.uuid4())
+    cur.execute("""
+        INSERT INTO claims (claim_id, content, created_at)
+        VALUES (%s, %s, %s)
+    """, (claim_id, entity_name, created_at))
+
+    label = LIST_LABELS.get(screen.name, screen.name)
+    if hit_keys:
+        detail = f"MATCH FOUND: {len(hit_keys)} result(s) on {label}"
+    else:
+        detail = f"No match found on {label}"
+    append_event(cur, screen.event_type, "claim", claim_id, "system", "system", {
+        "entity": entity_name,
+        "match": bool(hit_keys),
+        "detail": detail,
+        "data_version": data_version,
+        "matching_version": MATCHING_VERSION,
+        "hit_keys": hit_keys,
+    })
+    return claim_id
@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+
+from app.screening.index import get_index
+from app.screening.matching import SCREENS_BY_EVENT_TYPE, Screen
+
+# Re-running a receipt's screen against the version it recorded. Used by the
+# /replay endpoints and the background auditor (scripts/replay_auditor.py).
+
+# Upper bounds (ms) of the replay latency histogram buckets.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def screen_for(event_type: str, source: str) -> Screen:
+    """The screen a receipt was produced by; receipts of unknown types replay as a plain name screen."""
+    screen = SCREENS_BY_EVENT_TYPE.get(event_type)
+    if screen is None:
+        screen = Screen(source, source, event_type)
+    return screen
+
+
+def replay_hits(index, hits) -> list:
+    return [
+        {
+            "key": index.keys[h.index],
+            "name": index.names[h.index],
+            "match_score": h.match_score,
+            "match_type": h.match_type,
+        }
+        for h in hits
+    ]
+
+
+def compare(payload: dict, index, hits, parse_error) -> tuple[bool, bool]:
+    """(replay_match, result_consistent). Receipts that recorded hit keys must reproduce them exactly."""
+    replay_match = bool(hits) or bool(parse_error)
+    consistent = replay_match == payload.get("match", False)
+    if consistent and "hit_keys" in payload and not parse_error:
+        consistent = [index.keys[h.index] for h in hits] == payload["hit_keys"]
+    return replay_match, consistent
+
+
+@dataclass
+class ReplayResult:
+    version_id: int
+    source: str
+    hash_verified: bool
+    computed_hash: str
+    verified_via: str
+    parse_error: str | None
+    hits: list
+    replay_match: bool
+    result_consistent: bool
+
+
+def replay_event(cur, event_type: str, payload: dict) -> ReplayResult:
+    """
+    Replay one screening event. The payload must carry a data_version with a
+    version_id; raises SnapshotMissing when that version has no stored snapshot.
+    """
+    data_version = payload["data_version"]
+    version_id, source = data_version["version_id"], data_version.get("source")
+    loaded = get_index(cur, version_id, source)
+    index = loaded.index
+    hits = index.match(payload.get("entity") or "", screen_for(event_type, source).programs)
+    replay_match, consistent = compare(payload, index, hits, loaded.parse_error)
+    return ReplayResult(
+        version_id=version_id,
+        source=source,
+        hash_verified=loaded.computed_hash == data_version.get("content_hash"),
+        computed_hash=loaded.computed_hash,
+        verified_via=loaded.verified_via,
+        parse_error=loaded.parse_error,
+        hits=replay_hits(index, hits),
+        replay_match=replay_match,
+        result_consistent=consistent,
+    )
@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+
+from psycopg2.extras import execute_values
+
+from app.screening.engine import active_versions, verified_index
+from app.screening.matching import SCREENS, prefilter_key
+
+# Reverse screening: instead of re-screening every monitored name when a list
+# version is activated, find the names the version's changes can affect.
+#
+# A name can only hit an entry whose blocking strings contain its prefilter key
+# (see NameIndex.match). So a name's result on a list can only change if its key
+# is a blocking gram of an added or modified entry in the new version, or of a
+# modified or removed entry in the previous one. monitored_entities and
+# watchlist store each name's key in match_key (indexed), and the grams of the
+# changed entries are looked up there: the cost follows the size of the delta,
+# not of the portfolio. Candidates are then confirmed with the normal screen.
+#
+# The rest are not written: a completed reverse screen is recorded in
+# reverse_screens (sql/017_reverse_screens.sql), and a row last screened
+# against an older version counts as confirmed against every version that
+# chain of reverse screens carried it to (confirmed_versions).
+
+
+class ReverseScreenUnavailable(Exception):
+    """The activated version has no usable change set; fall back to a full re-screen."""
+
+
+@dataclass
+class VersionDelta:
+    source: str
+    data_version: dict            # the active version, in the receipt's data_version shape
+    previous_version_id: int
+    changes: int
+    keys: set                     # prefilter keys that may now screen differently
+
+
+def _previous_version(cur, version_id: int):
+    cur.execute("""
+        SELECT p.version_id, p.source, p.content_hash, p.entry_count, p.ingested_at
+        FROM ingestion_versions v
+        JOIN ingestion_versions p ON p.version_id = v.previous_version_id
+        WHERE v.version_id = %s
+    """, (version_id,))
+    row = cur.fetchone()
+    if not row:
+        return None
+    return {
+        "version_id": row[0],
+        "source": row[1],
+        "content_hash": row[2],
+        "entry_count": row[3],
+        "ingested_at": row[4].isoformat(),
+    }
+
+
+def _positions(index, keys: set) -> list:
+    return [i for i, key in enumerate(index.keys) if key in keys]
+
+
+def version_delta(cur, screen_name: str) -> VersionDelta:
+    """The keys affected by the active version of the screen's list, relative to the version it replaced."""
+    screen = SCREENS[screen_name]
+    data_version = active_versions(cur, [screen.source]).get(screen.source)
+    if not data_version:
+        raise ReverseScreenUnavailable(f"no active {screen.source} version")
+    previous_version = _previous_version(cur, data_version["version_id"])
+    if previous_version is None:
+        raise ReverseScreenUnavailable(f"{screen.source} version {data_version['version_id']} has no previous version")
+
+    cur.execute("""
+        SELECT entry_key, change_type FROM ingestion_changes
+        WHERE version_id = %s
+    """, (data_version["version_id"],))
+    changes = cur.fetchall()
+    if not changes:
+        raise ReverseScreenUnavailable(f"{screen.source} version {data_version['version_id']} has no recorded changes")
+
+    try:
+        current = verified_index(cur, screen, data_version)
+        replaced = verified_index(cur, screen, previous_version)
+    except Exception as e:
+        raise ReverseScreenUnavailable(str(e))
+
+    keys = set()
+    for i in _positions(current, {k for k, t in changes if t in ("added", "modified")}):
+        keys |= current.blocking_grams(i)
+    for i in _positions(replaced, {k for k, t in changes if t in ("modified", "removed")}):
+        keys |= replaced.blocking_grams(i)
+
+    return VersionDelta(screen.source, data_version, previous_version["version_id"], len(changes), keys)
+
+
+def confirmed_versions(cur, target: str, list_name: str, version_id: int) -> list:
+    """
+    Versions whose `target` rows count as confirmed against `version_id`: it,
+    and every version completed reverse screens carried forward into it.
+    """
+    cur.execute("""
+        WITH RECURSIVE chain (version_id) AS (
+            SELECT %s::int
+            UNION
+            SELECT r.previous_version_id
+            FROM reverse_screens r
+            JOIN chain c ON r.version_id = c.version_id
+            WHERE r.target = %s AND r.list_name = %s
+        )
+        SELECT version_id FROM chain
+    """, (version_id, target, list_name))
+    return [row[0] for row in cur.fetchall()]
+
+
+def record_reverse_screen(cur, target: str, list_name: str, delta: VersionDelta, rescreened: int):
+    """Record that `target` was brought up to the delta's version: rows not re-screened are carried over."""
+    cur.execute("""
+        INSERT INTO reverse_screens (target, list_name, version_id, previous_version_id, rescreened)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (target, list_name, version_id) DO UPDATE
+        SET rescreened = reverse_screens.rescreened + EXCLUDED.rescreened,
+            completed_at = NOW()
+    """, (target, list_name, delta.data_version["version_id"], delta.previous_version_id, rescreened))
+
+
+def backfill_match_keys(cur, table: str):
+    """Set match_key on rows written before it existed (or by writers that do not set it)."""
+    cur.execute(f"SELECT id::text, entity_name FROM {table} WHERE match_key IS NULL")
+    rows = [(row_id, prefilter_key(name)) for row_id, name in cur.fetchall()]
+    if rows:
+        execute_values(cur, f"""
+            UPDATE {table} t SET match_key = v.match_key
+            FROM (VALUES %s) AS v (id, match_key)
+            WHERE t.id::text = v.id
+        """, rows, page_size=1000)
+    return len(rows)
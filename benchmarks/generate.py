@@ -0,0 +1,148 @@
+"""
+Synthetic list generators for the ingestion benchmarks.
+
+Files follow the shape of the real exports (namespaced OFAC XML, comma-separated
+BIS DPL) closely enough to exercise the same parser paths. Output is deterministic
+for a given (size, seed, mutate) so repeated runs hash identically.
+
+    python benchmarks/generate.py sdn 100000 /tmp/sdn_100k.xml
+"""
+import os
+import random
+import sys
+from xml.sax.saxutils import escape
+
+OFAC_NS = "https://sanctionslistservice.ofac.treas.gov/api/PublicationPreview/exports/XML"
+
+SDN_PROGRAMS = ["SDGT", "IRAN", "RUSSIA-EO14024", "UKRAINE-EO13662", "CYBER2", "SDNTK", "DPRK3", "IFSR", "BALKANS"]
+CONSOLIDATED_PROGRAMS = ["SSI", "UKRAINE-EO13662", "NS-PLC", "FSE-IR", "CAPTA", "NS-MBS"]
+COUNTRIES = ["Iran", "Russia", "Syria", "Venezuela", "Cuba", "North Korea", "Belarus", "China", "Turkey", "United Arab Emirates"]
+SYLLABLES = ["al", "an", "bar", "dor", "ev", "far", "gol", "ha", "ik", "jan", "kov", "lev", "mir", "nas",
+             "or", "pet", "ra", "sar", "tan", "uz", "vak", "yel", "zad", "ko", "ri", "sha", "mu", "den"]
+ENTITY_SUFFIXES = ["LLC", "LTD", "TRADING CO", "HOLDING", "GROUP", "BANK", "SHIPPING", "INDUSTRIES"]
+
+
+def _word(rng, parts=(2, 4)) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(*parts))).capitalize()
+
+
+def _entry_rng(seed: int, i: int, mutate: float):
+    """Per-entry RNG; a `mutate` fraction of entries get a different stream (i.e. are modified)."""
+    rng = random.Random(seed * 1_000_003 + i)
+    if mutate and rng.random() < mutate:
+        rng = random.Random(seed * 1_000_003 + i + 7_919_000_000)
+    return rng
+
+
+def _sdn_entry(uid: int, rng, programs) -> str:
+    kind = rng.choices(["Individual", "Entity", "Vessel"], weights=[55, 40, 5])[0]
+    parts = [f"<uid>{uid}</uid>"]
+    if kind == "Individual":
+        parts.append(f"<firstName>{_word(rng)}</firstName>")
+        parts.append(f"<lastName>{_word(rng).upper()}</lastName>")
+    else:
+        name = f"{_word(rng).upper()} {_word(rng).upper()} {rng.choice(ENTITY_SUFFIXES)}"
+        parts.append(f"<lastName>{escape(name)}</lastName>")
+    parts.append(f"<sdnType>{kind}</sdnType>")
+    parts.append("<programList>" + "".join(
+        f"<program>{p}</program>" for p in rng.sample(programs, rng.randint(1, 3))
+    ) + "</programList>")
+
+    akas = rng.randint(0, 4)
+    if akas:
+        parts.append("<akaList>" + "".join(
+            f"<aka><uid>{uid * 10 + a}</uid><type>a.k.a.</type><category>strong</category>"
+            f"<lastName>{_word(rng).upper()}</lastName></aka>"
+            for a in range(akas)
+        ) + "</akaList>")
+
+    addresses = rng.randint(0, 3)
+    if addresses:
+        parts.append("<addressList>" + "".join(
+            f"<address><uid>{uid * 10 + a}</uid><address1>{rng.randint(1, 999)} {_word(rng)} St</address1>"
+            f"<city>{_word(rng)}</city><country>{rng.choice(COUNTRIES)}</country></address>"
+            for a in range(addresses)
+        ) + "</addressList>")
+
+    ids = rng.randint(0, 2)
+    if ids:
+        parts.append("<idList>" + "".join(
+            f"<id><uid>{uid * 10 + a}</uid><idType>{rng.choice(['Passport', 'Tax ID No.', 'Registration ID'])}</idType>"
+            f"<idNumber>{rng.randint(10**7, 10**9)}</idNumber></id>"
+            for a in range(ids)
+        ) + "</idList>")
+
+    if kind == "Individual":
+        parts.append(
+            f"<nationalityList><nationality><uid>{uid}</uid><country>{rng.choice(COUNTRIES)}</country>"
+            f"<mainEntry>true</mainEntry></nationality></nationalityList>"
+        )
+        parts.append(
+            f"<dateOfBirthList><dateOfBirthItem><uid>{uid}</uid>"
+            f"<dateOfBirth>{rng.randint(1, 28):02d} Jan {rng.randint(1940, 2000)}</dateOfBirth>"
+            f"<mainEntry>true</mainEntry></dateOfBirthItem></dateOfBirthList>"
+        )
+    return "<sdnEntry>" + "".join(parts) + "</sdnEntry>\n"
+
+
+def _write_ofac_xml(path: str, n: int, seed: int, mutate: float, programs):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" standalone="yes"?>\n')
+        f.write(f'<sdnList xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns="{OFAC_NS}">\n')
+        f.write(f"<publshInformation><Publish_Date>01/01/2026</Publish_Date><Record_Count>{n}</Record_Count></publshInformation>\n")
+        for i in range(n):
+            f.write(_sdn_entry(i + 1, _entry_rng(seed, i, mutate), programs))
+        f.write("</sdnList>\n")
+
+
+def write_sdn_xml(path: str, n: int, seed: int = 1, mutate: float = 0.0):
+    _write_ofac_xml(path, n, seed, mutate, SDN_PROGRAMS)
+
+
+def write_consolidated_xml(path: str, n: int, seed: int = 2, mutate: float = 0.0):
+    _write_ofac_xml(path, n, seed, mutate, CONSOLIDATED_PROGRAMS)
+
+
+def write_dpl_csv(path: str, n: int, seed: int = 3, mutate: float = 0.0):
+    header = "Name,Street_Address,City,State,Country,Postal_Code,Effective_Date,Expiration_Date,Standard_Order,Last_Update,Action,FR_Citation\n"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(header)
+        for i in range(n):
+            rng = _entry_rng(seed, i, mutate)
+            name = f"{_word(rng).upper()} {_word(rng).upper()}"
+            if rng.random() < 0.4:
+                name += f" {rng.choice(ENTITY_SUFFIXES)}"
+            f.write(
+                f'"{name}","{rng.randint(1, 9999)} {_word(rng)} Road",{_word(rng)},'
+                f'{rng.choice(["", "CA", "NY", "TX"])},{rng.choice(["US", "CN", "RU", "AE", "IR"])},'
+                f'{rng.randint(10000, 99999)},{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/20{rng.randint(10, 25)},'
+                f'{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/20{rng.randint(26, 40)},Y,'
+                f'01/0{rng.randint(1, 9)}/2025,{rng.choice(["DENIAL", "STANDARD", "MODIFICATION"])},'
+                f'"{rng.randint(70, 90)} F.R. {rng.randint(1000, 99999)}"\n'
+            )
+
+
+GENERATORS = {
+    "sdn": (write_sdn_xml, "xml"),
+    "consolidated": (write_consolidated_xml, "xml"),
+    "bis": (write_dpl_csv, "txt"),
+}
+
+
+def ensure_file(data_dir: str, kind: str, n: int, mutate: float = 0.0) -> str:
+    """Generate (or reuse) the synthetic file for (kind, n, mutate) under data_dir."""
+    write, ext = GENERATORS[kind]
+    suffix = f"_m{int(mutate * 10000)}" if mutate else ""
+    path = os.path.join(data_dir, f"{kind}_{n}{suffix}.{ext}")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        tmp = path + ".tmp"
+        write(tmp, n, mutate=mutate)
+        os.replace(tmp, path)
+    return path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in GENERATORS:
+        sys.exit(f"usage: {sys.argv[0]} {{{','.join(GENERATORS)}}} ENTRIES OUTPUT")
+    GENERATORS[sys.argv[1]][0](sys.argv[3], int(sys.argv[2]))
@@ -0,0 +1,182 @@
+"""
+Ingestion throughput benchmark.
+
+For each list and size, generates a synthetic file, serves it over a local HTTP
+server and runs it through the real ingestion pipeline (app/ingestion/pipeline.py)
+against a scratch Postgres database:
+
+  full   first load into empty serving tables (pipeline full=True)
+  delta  the same list with 1% of entries modified (incremental path)
+
+Each case runs in a fresh subprocess so peak RSS is per case. Reports entries/s,
+peak RSS and the pipeline's own per-stage timings, and compares against the
+stored baseline (--save-baseline records a new one).
+
+The target database must already have the schema (sql/sanctions_schema.sql plus
+the numbered migrations and the bis_dpl table) and is reset between cases, so it
+must not be a real one: its name has to contain "bench" unless --force is given.
+
+    DB_NAME=mic_bench python benchmarks/ingest_bench.py --sizes 10000,100000
+"""
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate import ensure_file
+
+DEFAULT_SIZES = "10000,100000,1000000"
+DEFAULT_LISTS = "sdn,consolidated,bis"
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DELTA_FRACTION = 0.01
+
+# benchmark list name -> connector name in app.ingestion.connectors
+CONNECTOR_NAMES = {"sdn": "OFAC_SDN", "consolidated": "OFAC_CONSOLIDATED", "bis": "BIS_DPL"}
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve_directory(directory: str):
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def reset(connector):
+    """Empty the connector's serving table and version history in the scratch DB."""
+    from app.infra.db import get_conn
+
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute(f"TRUNCATE {connector.table}")
+    cur.execute("DELETE FROM ingestion_changes WHERE source = %s", (connector.source,))
+    cur.execute("DELETE FROM ingestion_snapshots WHERE source = %s", (connector.source,))
+    cur.execute("DELETE FROM ingestion_versions WHERE source = %s", (connector.source,))
+    cur.execute("DELETE FROM fetch_validators WHERE source_url = %s", (connector.url,))
+    conn.commit()
+    cur.close()
+    conn.close()
+
+
+def run_case(list_name: str, url: str, phase: str, entries: int) -> dict:
+    """Runs in a child process: one pipeline run, plus its wall time and peak RSS."""
+    from app.ingestion import connectors, pipeline
+
+    connector = getattr(connectors, CONNECTOR_NAMES[list_name])
+    connector.url = url
+    if phase == "full":
+        reset(connector)
+
+    start = time.perf_counter()
+    result = pipeline.run_once(connector, full=(phase == "full"))
+    elapsed = time.perf_counter() - start
+    if result["status"] != "updated":
+        raise RuntimeError(f"{list_name}/{phase}: pipeline returned {result['status']}")
+
+    return {
+        "entries": entries,
+        "seconds": round(elapsed, 3),
+        "entries_per_s": round(entries / elapsed, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "stage_ms": result["stage_ms"],
+    }
+
+
+def run_in_subprocess(*args) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(run_case, args)
+
+
+def compare(key: str, result: dict, baseline: dict | None, tolerance: float) -> list[str]:
+    """Print the result next to its baseline; return regressions beyond `tolerance`."""
+    line = f"{key:<28} {result['entries_per_s']:>12,.0f} entries/s {result['peak_rss_mb']:>8.1f} MB"
+    regressions = []
+    if baseline:
+        speed = result["entries_per_s"] / baseline["entries_per_s"] - 1
+        rss = result["peak_rss_mb"] / baseline["peak_rss_mb"] - 1
+        line += f"   vs baseline: {speed:+.1%} throughput, {rss:+.1%} RSS"
+        if speed < -tolerance:
+            regressions.append(f"{key}: throughput {speed:+.1%}")
+        if rss > tolerance:
+            regressions.append(f"{key}: peak RSS {rss:+.1%}")
+    print(line)
+    stages = ", ".join(f"{k} {v:,.0f}" for k, v in result["stage_ms"].items())
+    print(f"{'':<28} stage ms: {stages}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated entry counts (default {DEFAULT_SIZES})")
+    parser.add_argument("--lists", default=DEFAULT_LISTS, help=f"comma-separated lists (default {DEFAULT_LISTS})")
+    parser.add_argument("--data-dir", default=os.getenv("BENCH_DATA_DIR", "/tmp/mic-bench"), help="where generated files are cached")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression before failing (default 0.2 = 20%%)")
+    parser.add_argument("--force", action="store_true", help="allow a database whose name does not contain 'bench'")
+    args = parser.parse_args()
+
+    db_name = os.getenv("DB_NAME", "mic")
+    if "bench" not in db_name and not args.force:
+        sys.exit(f"Refusing to reset database '{db_name}'. Point DB_NAME at a scratch benchmark database or pass --force.")
+
+    # Benchmark snapshots go to the data dir, not the repo's data/snapshots.
+    os.environ.setdefault("SNAPSHOT_STORE_DIR", os.path.join(args.data_dir, "snapshots"))
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    lists = [name.strip() for name in args.lists.split(",")]
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    server = serve_directory(args.data_dir)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    results, regressions = {}, []
+
+    try:
+        for list_name in lists:
+            for size in sizes:
+                print(f"Generating {list_name} x {size:,}...")
+                files = {
+                    "full": ensure_file(args.data_dir, list_name, size),
+                    "delta": ensure_file(args.data_dir, list_name, size, mutate=DELTA_FRACTION),
+                }
+                for phase, path in files.items():
+                    key = f"{list_name}/{size}/{phase}"
+                    url = f"{base_url}/{os.path.basename(path)}"
+                    results[key] = run_in_subprocess(list_name, url, phase, size)
+                    regressions += compare(key, results[key], baselines.get(key), args.tolerance)
+    finally:
+        server.shutdown()
+
+    if args.save_baseline:
+        baselines.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions:
+        print("\nRegressions:")
+        for r in regressions:
+            print(f"  {r}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
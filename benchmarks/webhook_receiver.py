@@ -0,0 +1,87 @@
+"""
+Local stand-in for a customer webhook endpoint, for exercising
+scripts/webhook_dispatcher.py without a real receiver.
+
+Every path accepts POSTs. Responses can be slowed down (--delay-ms) or made to
+fail (--fail-rate: that fraction answers 503; --down: every request does), so
+retries, backoff and the circuit breaker can be observed. With --secret, the
+X-Webhook-Signature of every request is checked. Prints a summary of the
+deliveries received every --report seconds.
+
+    python benchmarks/webhook_receiver.py --port 9100 --delay-ms 200 --fail-rate 0.2
+    # register http://localhost:9100/<anything> as a webhook, then run the dispatcher
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+stats = Counter()
+deliveries = set()
+lock = threading.Lock()
+
+
+def make_handler(args):
+    class Receiver(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if args.delay_ms:
+                time.sleep(args.delay_ms / 1000)
+            fail = args.down or random.random() < args.fail_rate
+            with lock:
+                stats["requests"] += 1
+                delivery = self.headers.get("X-Webhook-Delivery")
+                if args.secret:
+                    expected = hmac.new(args.secret.encode(), self.headers.get("X-Webhook-Timestamp", "").encode()
+                                        + b"." + body, hashlib.sha256).hexdigest()
+                    if self.headers.get("X-Webhook-Signature") != f"sha256={expected}":
+                        stats["bad_signature"] += 1
+                if fail:
+                    stats["failed"] += 1
+                else:
+                    stats["ok"] += 1
+                    if delivery in deliveries:
+                        stats["duplicates"] += 1
+                    deliveries.add(delivery)
+                    try:
+                        stats["changes"] += len(json.loads(body).get("changes", [None]))
+                    except ValueError:
+                        stats["invalid_json"] += 1
+            self.send_response(503 if fail else 200)
+            self.end_headers()
+
+        def log_message(self, *_):
+            pass
+
+    return Receiver
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--delay-ms", type=int, default=0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--down", action="store_true")
+    parser.add_argument("--secret", help="signing secret of the registered webhook")
+    parser.add_argument("--report", type=int, default=5)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("0.0.0.0", args.port), make_handler(args))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Receiving on :{args.port}")
+    try:
+        while True:
+            time.sleep(args.report)
+            with lock:
+                print(dict(stats), flush=True)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
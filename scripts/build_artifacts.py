@@ -0,0 +1,81 @@
+import os
+import sys
+import logging
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv()
+
+from app.infra import snapshot_store
+from app.infra.db import get_conn
+from app.ingestion import artifact
+from app.ingestion.connectors import CONNECTORS
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+# Backfill pre-parsed artifacts for snapshots stored before they existed, or
+# rebuild those written in an older artifact format. With --verify, every existing artifact is rebuilt from its raw snapshot and
+# must come out byte-identical (artifacts are deterministic).
+
+
+def rebuild(connector, content_hash, store_path, raw_bytes) -> artifact.ArtifactWriter:
+    if store_path:
+        reader = snapshot_store.open_snapshot(store_path)
+    else:
+        reader = snapshot_store.open_bytes(raw_bytes.encode())
+    with reader:
+        writer = artifact.build(connector, reader)
+        if reader.hexdigest() != content_hash:
+            writer.close()
+            raise snapshot_store.SnapshotIntegrityError("raw snapshot failed hash verification")
+    return writer
+
+
+def main(verify: bool = False):
+    conn = get_conn()
+    cur = conn.cursor()
+    current = f"%.v{artifact.FORMAT_VERSION}.col"
+    cur.execute(f"""
+        SELECT version_id, source, content_hash, store_path, raw_bytes, artifact_path, artifact_hash
+        FROM ingestion_snapshots
+        {"" if verify else "WHERE artifact_path IS NULL OR artifact_path NOT LIKE %s"}
+        ORDER BY version_id
+    """, None if verify else (current,))
+    rows = cur.fetchall()
+    built = verified = failed = 0
+
+    for version_id, source, content_hash, store_path, raw_bytes, artifact_path, artifact_hash in rows:
+        connector = CONNECTORS.get(source)
+        if connector is None:
+            logger.warning(f"Version {version_id}: no connector for source {source}, skipped")
+            continue
+        try:
+            with rebuild(connector, content_hash, store_path, raw_bytes) as writer:
+                if verify and artifact_path:
+                    rebuilt_path = artifact.relative_path(source, content_hash)
+                    if rebuilt_path != artifact_path or artifact.digest(writer, content_hash) != artifact_hash:
+                        raise artifact.ArtifactError("rebuilt artifact does not match the stored one")
+                    verified += 1
+                    continue
+                path, digest = artifact.save(writer, content_hash)
+            cur.execute("""
+                UPDATE ingestion_snapshots
+                SET artifact_path = %s, artifact_hash = %s
+                WHERE version_id = %s
+            """, (path, digest, version_id))
+            conn.commit()
+            built += 1
+        except Exception as e:
+            conn.rollback()
+            failed += 1
+            logger.error(f"Version {version_id} ({source}): {e}")
+
+    cur.close()
+    conn.close()
+    logger.info(f"Artifacts built: {built} | verified: {verified} | failed: {failed}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main(verify="--verify" in sys.argv[1:]) else 1)
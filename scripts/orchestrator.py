@@ -0,0 +1,235 @@
+import os
+import sys
+import json
+import time
+import random
+import signal
+import asyncio
+import logging
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv()
+
+import psycopg2.extensions
+
+from app.infra.db import get_conn
+from app.ingestion import pipeline
+from app.ingestion.connectors import OFAC_SDN, OFAC_CONSOLIDATED, BIS_DPL
+import scheduler_monitor
+import scheduler_watchlist
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("orchestrator")
+
+# One process schedules every domain (replaces the per-domain scheduler containers).
+# Each domain runs on its own single-thread executor and its own asyncio task, so a
+# slow fetch or a crash in one domain never delays or stops another (Rule 9).
+#
+# Re-screening domains (monitor, watchlist) are driven by version activations:
+# the pipeline NOTIFYs on every activation and the listener below wakes the
+# domains that screen against that source, passing them the sources that
+# changed. Their timed runs are a full sweep on a long interval, as a safety net.
+
+JITTER_SECONDS = int(os.getenv("ORCHESTRATOR_JITTER_SECONDS", "300"))
+RETRY_SECONDS = int(os.getenv("ORCHESTRATOR_RETRY_SECONDS", "300"))
+RUN_ON_START = os.getenv("ORCHESTRATOR_RUN_ON_START", "true").lower() == "true"
+SWEEP_SECONDS = int(os.getenv("RESCREEN_SWEEP_SECONDS", str(24 * 60 * 60)))
+DEBOUNCE_SECONDS = int(os.getenv("RESCREEN_DEBOUNCE_SECONDS", "5"))
+LISTEN_HEALTHCHECK_SECONDS = 60
+
+
+@dataclass
+class Domain:
+    name: str
+    run: Callable[[], object]
+    interval_seconds: int
+    # Sources whose activations trigger rescreen(changed_sources) between timed runs.
+    sources: tuple = ()
+    rescreen: Callable[[set], object] | None = None
+
+
+def ingestion_domain(connector) -> Domain:
+    def run():
+        result = pipeline.run_once(connector)
+        if result["status"] == "error":
+            raise RuntimeError(f"{connector.label} ingestion failed (see ledger)")
+        return result
+    return Domain(connector.source, run, connector.interval_seconds)
+
+
+DOMAINS = [
+    ingestion_domain(OFAC_SDN),
+    ingestion_domain(OFAC_CONSOLIDATED),
+    ingestion_domain(BIS_DPL),
+    Domain(
+        "monitor", scheduler_monitor.run_monitor_cycle, SWEEP_SECONDS,
+        sources=scheduler_monitor.MONITOR_SCREENS,
+        rescreen=scheduler_monitor.run_reverse_cycle,
+    ),
+    Domain(
+        "watchlist", scheduler_watchlist.run_once, SWEEP_SECONDS,
+        sources=scheduler_watchlist.WATCHLIST_SCREENS,
+        rescreen=scheduler_watchlist.run_reverse,
+    ),
+]
+
+
+def next_slot(interval_seconds: int, now: float) -> float:
+    """Next wall-clock boundary for the interval (cron-like: every 4h at 00:00, 04:00, ... UTC)."""
+    return (now // interval_seconds + 1) * interval_seconds
+
+
+async def listen_activations(queues: dict):
+    """
+    LISTEN for version activations and put each activated source on the queues
+    of the domains that screen against it. After a reconnect, activations
+    missed while disconnected are replayed from ingestion_versions.
+    """
+    loop = asyncio.get_running_loop()
+    since = None
+
+    while True:
+        conn = None
+        try:
+            conn = get_conn()
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            cur = conn.cursor()
+            cur.execute(f"LISTEN {pipeline.ACTIVATION_CHANNEL}")
+            cur.execute("SELECT NOW()")
+            connected_at = cur.fetchone()[0]
+            if since is not None:
+                cur.execute("""
+                    SELECT source, version_id FROM ingestion_versions
+                    WHERE activated_at >= %s ORDER BY activated_at
+                """, (since,))
+                for source, version_id in cur.fetchall():
+                    dispatch(queues, source, version_id)
+            since = connected_at
+            logger.info(f"Listening for activations on {pipeline.ACTIVATION_CHANNEL}")
+
+            readable = asyncio.Event()
+            loop.add_reader(conn.fileno(), readable.set)
+            try:
+                while True:
+                    try:
+                        await asyncio.wait_for(readable.wait(), LISTEN_HEALTHCHECK_SECONDS)
+                    except asyncio.TimeoutError:
+                        cur.execute("SELECT NOW()")
+                        since = cur.fetchone()[0]
+                    readable.clear()
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            payload = json.loads(notify.payload)
+                            dispatch(queues, payload["source"], payload.get("version_id"))
+                        except (ValueError, KeyError):
+                            logger.warning(f"Ignoring malformed activation notice: {notify.payload!r}")
+            finally:
+                loop.remove_reader(conn.fileno())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Activation listener error, reconnecting: {e}")
+            await asyncio.sleep(RETRY_SECONDS // 10 or 1)
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def dispatch(queues: dict, source: str, version_id):
+    for name, queue in queues.get(source, ()):
+        logger.info(f"[{name}] {source} version {version_id} activated, re-screening")
+        queue.put_nowait(source)
+
+
+async def next_trigger(queue: asyncio.Queue | None, delay: float) -> set | None:
+    """Wait up to `delay` for activated sources. Returns them (debounced and drained), or None on timeout."""
+    if queue is None:
+        await asyncio.sleep(delay)
+        return None
+    try:
+        sources = {await asyncio.wait_for(queue.get(), delay)}
+    except asyncio.TimeoutError:
+        return None
+    # Lists often activate together; batch them into one re-screen.
+    await asyncio.sleep(DEBOUNCE_SECONDS)
+    while not queue.empty():
+        sources.add(queue.get_nowait())
+    return sources
+
+
+async def run_domain(domain: Domain, executor: ThreadPoolExecutor, queue: asyncio.Queue | None = None):
+    loop = asyncio.get_running_loop()
+    failures = 0
+    first = RUN_ON_START
+
+    while True:
+        if first:
+            delay = random.uniform(0, min(JITTER_SECONDS, 30))
+            first = False
+        elif failures:
+            # Back off on this domain only; others keep their schedule.
+            delay = min(RETRY_SECONDS * 2 ** (failures - 1), domain.interval_seconds)
+        else:
+            now = time.time()
+            delay = next_slot(domain.interval_seconds, now) - now + random.uniform(0, JITTER_SECONDS)
+
+        logger.info(f"[{domain.name}] next run in {delay:.0f}s")
+        sources = await next_trigger(queue, delay)
+
+        start = time.perf_counter()
+        try:
+            if sources is None:
+                await loop.run_in_executor(executor, domain.run)
+            else:
+                await loop.run_in_executor(executor, domain.rescreen, sources)
+            failures = 0
+            logger.info(f"[{domain.name}] run finished in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            # A failed re-screen is retried as a full run once the backoff expires.
+            failures += 1
+            logger.error(f"[{domain.name}] run failed ({failures} in a row): {e}")
+
+
+async def main(domains):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    executors = {d.name: ThreadPoolExecutor(max_workers=1, thread_name_prefix=d.name) for d in domains}
+    triggers = {d.name: asyncio.Queue() for d in domains if d.rescreen}
+    queues = {}
+    for d in domains:
+        for source in d.sources if d.rescreen else ():
+            queues.setdefault(source, []).append((d.name, triggers[d.name]))
+
+    tasks = [
+        asyncio.create_task(run_domain(d, executors[d.name], triggers.get(d.name)), name=d.name)
+        for d in domains
+    ]
+    if queues:
+        tasks.append(asyncio.create_task(listen_activations(queues), name="activations"))
+    logger.info(f"Orchestrator started. Domains: {', '.join(d.name for d in domains)}")
+
+    await stop.wait()
+    logger.info("Shutting down...")
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for ex in executors.values():
+        ex.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    selected = os.getenv("ORCHESTRATOR_DOMAINS")
+    domains = DOMAINS
+    if selected:
+        names = {n.strip() for n in selected.split(",") if n.strip()}
+        domains = [d for d in DOMAINS if d.name in names]
+    asyncio.run(main(domains))
@@ -0,0 +1,173 @@
+import os
+import sys
+import time
+import logging
+from bisect import bisect_left
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv()
+
+from app.infra.db import get_conn
+from app.infra.ledger import append_event
+from app.screening.index import SnapshotMissing
+from app.screening.matching import MATCHING_VERSION, SCREENS_BY_EVENT_TYPE
+from app.screening.replay import LATENCY_BUCKETS_MS, replay_event
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("replay_auditor")
+
+# Continuously replays a sample of recent receipts so a receipt that no longer
+# reproduces against its snapshot (Rule 7) is caught within minutes, not when a
+# customer asks. Each sampled receipt is audited once; results go to
+# replay_audits and mismatches to the ledger as replay_mismatch events.
+#
+# The worker runs at low priority and throttles itself to a CPU budget: after
+# each replay it sleeps long enough that its CPU time stays at CPU_BUDGET of
+# one core, so it never competes with API traffic for more than that.
+
+CPU_BUDGET = float(os.getenv("REPLAY_AUDIT_CPU_BUDGET", "0.1"))
+WINDOW_HOURS = int(os.getenv("REPLAY_AUDIT_WINDOW_HOURS", "24"))
+SAMPLE_RATE = float(os.getenv("REPLAY_AUDIT_SAMPLE_RATE", "0.1"))
+BATCH_SIZE = int(os.getenv("REPLAY_AUDIT_BATCH_SIZE", "100"))
+IDLE_SECONDS = int(os.getenv("REPLAY_AUDIT_IDLE_SECONDS", "60"))
+REPORT_SECONDS = int(os.getenv("REPLAY_AUDIT_REPORT_SECONDS", "300"))
+NICENESS = int(os.getenv("REPLAY_AUDIT_NICE", "10"))
+
+ACTOR_ID = "replay_auditor"
+
+
+class Histogram:
+    """Replay latency counts per LATENCY_BUCKETS_MS upper bound (last bucket is overflow)."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def observe(self, ms: float):
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+
+    def __str__(self):
+        labels = [f"<={b}" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        return " ".join(f"{label}:{n}" for label, n in zip(labels, self.counts) if n)
+
+
+def sample_receipts(cur) -> list:
+    """Unaudited screening receipts from the window, sampled by a stable hash of the receipt id."""
+    cur.execute("""
+        SELECT e.aggregate_id, e.event_type, e.payload
+        FROM events e
+        WHERE e.created_at >= NOW() - make_interval(hours => %s)
+          AND e.event_type = ANY(%s)
+          AND jsonb_typeof(e.payload->'data_version') = 'object'
+          AND abs(hashtext(e.aggregate_id)) %% 10000 < %s
+          AND NOT EXISTS (SELECT 1 FROM replay_audits a WHERE a.receipt_id = e.aggregate_id)
+        ORDER BY e.created_at DESC
+        LIMIT %s
+    """, (WINDOW_HOURS, list(SCREENS_BY_EVENT_TYPE), int(SAMPLE_RATE * 10000), BATCH_SIZE))
+    return cur.fetchall()
+
+
+def record(cur, receipt_id, event_type, version_id, hash_verified, consistent, error, latency_ms):
+    cur.execute("""
+        INSERT INTO replay_audits
+          (receipt_id, event_type, version_id, hash_verified, result_consistent, error, latency_ms)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (receipt_id) DO NOTHING
+    """, (receipt_id, event_type, version_id, hash_verified, consistent, error, latency_ms))
+
+
+def audit(cur, receipt_id: str, event_type: str, payload: dict) -> dict:
+    """Replay one receipt and record the outcome. Returns counters for the report."""
+    started = time.perf_counter()
+    version_id = payload["data_version"].get("version_id")
+    try:
+        result = replay_event(cur, event_type, payload)
+    except SnapshotMissing as e:
+        latency_ms = (time.perf_counter() - started) * 1000
+        record(cur, receipt_id, event_type, version_id, None, None, str(e), latency_ms)
+        return {"latency_ms": latency_ms, "outcome": "no_snapshot"}
+
+    latency_ms = (time.perf_counter() - started) * 1000
+    record(cur, receipt_id, event_type, version_id, result.hash_verified, result.result_consistent,
+           result.parse_error, latency_ms)
+
+    if result.result_consistent and result.hash_verified:
+        return {"latency_ms": latency_ms, "outcome": "consistent"}
+
+    append_event(cur, "replay_mismatch", "claim", receipt_id, "system", ACTOR_ID, {
+        "receipt_id": receipt_id,
+        "event_type": event_type,
+        "data_version": payload["data_version"],
+        "hash_verified": result.hash_verified,
+        "result_consistent": result.result_consistent,
+        "original_match": payload.get("match", False),
+        "replay_match": result.replay_match,
+        "original_hit_keys": payload.get("hit_keys"),
+        "replay_hit_keys": [h["key"] for h in result.hits],
+        "original_matching_version": payload.get("matching_version"),
+        "matching_version": MATCHING_VERSION,
+        "parse_error": result.parse_error,
+    })
+    logger.warning(f"Replay mismatch: receipt {receipt_id} ({event_type}, version {version_id}) "
+                   f"hash_verified={result.hash_verified} consistent={result.result_consistent}")
+    return {"latency_ms": latency_ms, "outcome": "mismatch"}
+
+
+def throttle(cpu_seconds: float):
+    """Sleep so that cpu_seconds of work averages out to CPU_BUDGET of one core."""
+    if 0 < CPU_BUDGET < 1:
+        time.sleep(cpu_seconds * (1 / CPU_BUDGET - 1))
+
+
+def run_auditor():
+    if NICENESS:
+        os.nice(NICENESS)
+    logger.info(f"Replay auditor started. CPU budget {CPU_BUDGET:.0%}, sample rate {SAMPLE_RATE:.0%}, window {WINDOW_HOURS}h")
+
+    histogram = Histogram()
+    outcomes = {"consistent": 0, "mismatch": 0, "no_snapshot": 0, "error": 0}
+    last_report = time.monotonic()
+    conn = None
+
+    while True:
+        try:
+            if conn is None or conn.closed:
+                conn = get_conn()
+            cur = conn.cursor()
+            receipts = sample_receipts(cur)
+            conn.commit()
+
+            for receipt_id, event_type, payload in receipts:
+                cpu_started = time.process_time()
+                try:
+                    result = audit(cur, receipt_id, event_type, payload)
+                    conn.commit()
+                    histogram.observe(result["latency_ms"])
+                    outcomes[result["outcome"]] += 1
+                except Exception as e:
+                    conn.rollback()
+                    outcomes["error"] += 1
+                    logger.error(f"Audit of receipt {receipt_id} failed: {e}")
+                    # recorded so the receipt is not resampled forever
+                    record(cur, receipt_id, event_type, payload["data_version"].get("version_id"),
+                           None, None, f"Replay error: {str(e)}", 0)
+                    conn.commit()
+                throttle(time.process_time() - cpu_started)
+            cur.close()
+
+            if time.monotonic() - last_report >= REPORT_SECONDS:
+                logger.info(f"Audited: {outcomes} | latency ms: {histogram}")
+                last_report = time.monotonic()
+
+            if len(receipts) < BATCH_SIZE:
+                time.sleep(IDLE_SECONDS)
+        except Exception as e:
+            logger.error(f"Replay auditor error: {e}")
+            if conn is not None:
+                conn.close()
+            conn = None
+            time.sleep(IDLE_SECONDS)
+
+
+if __name__ == "__main__":
+    run_auditor()
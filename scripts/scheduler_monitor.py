@@ -2,229 +2,642 @@ import os
 import sys
 import json
 import uuid
+import hashlib
 import time
+import socket
 import logging
 from datetime import datetime, timezone
+from itertools import islice
 
-import psycopg2
-from rapidfuzz import fuzz
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv()
+
+from app.infra.db import get_conn
+from app.screening.engine import BatchScreener, active_versions, serving_rows
+from app.screening.matching import MATCHING_VERSION, SCREENS, normalize_query
+from app.screening.reverse import (
+    ReverseScreenUnavailable, backfill_match_keys, confirmed_versions, record_reverse_screen, version_delta,
+)
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
+# A cycle loads the active version of every monitored list once, screens the
+# monitors in batches against those in-memory indexes (spread over
+# MONITOR_WORKERS processes) and writes each batch back in one transaction.
+# Cycles are split into leased batches (see "Leased Batches") so any number of
+# `--worker` replicas can share one.
+# When a list version is activated the orchestrator runs a reverse cycle
+# (app/screening/reverse.py) that only re-screens the monitors its changes can
+# affect; the timed loop below (and the orchestrator's sweep) is a safety net.
+
+MONITOR_SCREENS = ("ofac_sdn", "bis_dpl", "ofac_consolidated")
+BATCH_SIZE = int(os.getenv("MONITOR_BATCH_SIZE", "1000"))
+WORKERS = int(os.getenv("MONITOR_WORKERS", str(os.cpu_count() or 1)))
+
 
 # ---------------------------
-# DB Connection
+# Screening Logic
 # ---------------------------
 
-def get_conn():
-    return psycopg2.connect(
-        host=os.getenv("DB_HOST", "localhost"),
-        port=os.getenv("DB_PORT", "5432"),
-        dbname=os.getenv("DB_NAME", "mic"),
-        user=os.getenv("DB_USER", "mic_app"),
-        password=os.getenv("DB_PASSWORD", "mic_app_pass"),
+# Scores within the same bucket fingerprint the same, so rounding noise is not
+# reported as a change.
+SCORE_BUCKET = 5
+
+
+def fingerprint(index, hits: list) -> str:
+    """
+    Stable hash of a list's whole hit set: each hit's entry (uid, and its name
+    and programs, which change with the entry) and score bucket, sorted.
+    """
+    keys, names, programs = index.keys, index.names, index.programs
+    # Short names can hit thousands of entries: plain strings sort and hash
+    # about twice as fast as tuples through json.
+    entries = sorted(
+        f"{keys[h.index]}\x1f{names[h.index]}\x1f{programs[h.index]}\x1f{int(h.score // SCORE_BUCKET)}"
+        for h in hits
     )
+    return hashlib.blake2b("\x1e".join(entries).encode(), digest_size=8).hexdigest()
+
+
+def build_result(screener: BatchScreener, hits: dict, bis_countries: dict, checked_at: datetime,
+                 previous: dict | None = None) -> dict:
+    """
+    One monitor's check result from its hits on the screened lists. Lists the
+    screener did not cover keep their entry from `previous`.
+    """
+    results = {k: v for k, v in (previous or {}).items() if k in MONITOR_SCREENS}
+    for list_name, index in screener.indexes.items():
+        top_hit = None
+        if hits[list_name]:
+            top = hits[list_name][0]
+            key = index.keys[top.index]
+            if list_name == "bis_dpl":
+                top_hit = {"name": index.names[top.index], "country": bis_countries.get(key, (None,))[0], "score": top.match_score}
+            else:
+                top_hit = {"uid": key, "name": index.names[top.index], "score": top.match_score}
+        results[list_name] = {
+            "match": len(hits[list_name]) > 0,
+            "hit_count": len(hits[list_name]),
+            "top_hit": top_hit,
+            "version_id": screener.data_version(list_name)["version_id"],
+            "fingerprint": fingerprint(index, hits[list_name]),
+        }
+
+    results["any_match"] = any(r["match"] for r in results.values() if isinstance(r, dict))
+    results["matching_version"] = MATCHING_VERSION
+    results["checked_at"] = checked_at.isoformat()
+    return results
+
+
+def check_state(result: dict) -> dict:
+    """The compact part of a result stored in last_check_fingerprints (sql/013_check_fingerprints.sql)."""
+    state = {"matching_version": result["matching_version"]}
+    for list_name in MONITOR_SCREENS:
+        if list_name in result:
+            state[list_name] = {
+                "version_id": result[list_name]["version_id"],
+                "fingerprint": result[list_name].get("fingerprint"),
+            }
+    return state
 
 
 # ---------------------------
-# Screening Logic
+# Change Detection
 # ---------------------------
 
-FUZZY_THRESHOLD = 85
+# Cycles only read each monitor's check state. A monitor whose fingerprints
+# all match its stored ones is confirmed without touching its full result;
+# only when one differs is last_check_result loaded, rewritten and - if
+# result_changed - an event recorded.
 
-def screen_entity(entity_name: str) -> dict:
-    results = {}
+def fingerprints_differ(state: dict | None, current: dict) -> bool:
+    """Whether any list `current` screened has a different hit set than the stored state says."""
+    if state is None:
+        return True
+    return any(
+        (state.get(list_name) or {}).get("fingerprint") != current[list_name]["fingerprint"]
+        for list_name in MONITOR_SCREENS
+        if list_name in current
+    )
 
-    conn = get_conn()
-    cur = conn.cursor()
 
-    try:
-        # OFAC SDN
-        cur.execute("""
-            SELECT uid, last_name, first_name, entity_type, programs
-            FROM ofac_sdn
-            WHERE UPPER(last_name) LIKE %s
-            OR UPPER(first_name || ' ' || last_name) LIKE %s
-            LIMIT 200
-        """, (f"%{entity_name.upper()[:4]}%", f"%{entity_name.upper()[:4]}%"))
-        candidates = cur.fetchall()
-
-        sdn_hits = []
-        for row in candidates:
-            full_name = f"{row[2] or ''} {row[1]}".strip()
-            score = max(
-                fuzz.token_sort_ratio(entity_name.upper(), full_name.upper()),
-                fuzz.token_sort_ratio(entity_name.upper(), (row[1] or '').upper()),
-                fuzz.partial_ratio(entity_name.upper(), full_name.upper()),
-            )
-            if score >= FUZZY_THRESHOLD:
-                sdn_hits.append({"uid": row[0], "name": full_name, "score": round(score / 100, 2)})
+def result_changed(previous: dict, current: dict) -> bool:
+    if previous is None:
+        return True
+    for list_name in ["ofac_sdn", "bis_dpl", "ofac_consolidated"]:
+        prev = previous.get(list_name, {})
+        curr = current.get(list_name, {})
+        if prev.get("fingerprint") and curr.get("fingerprint"):
+            if prev["fingerprint"] != curr["fingerprint"]:
+                return True
+        # Results written before fingerprints existed only have the match flag.
+        elif prev.get("match", False) != curr.get("match", False):
+            return True
+    return False
 
-        results["ofac_sdn"] = {
-            "match": len(sdn_hits) > 0,
-            "hit_count": len(sdn_hits),
-            "top_hit": sdn_hits[0] if sdn_hits else None,
-        }
 
-        # BIS DPL
-        cur.execute("""
-            SELECT name, country, action
-            FROM bis_dpl
-            WHERE UPPER(name) LIKE %s
-            LIMIT 200
-        """, (f"%{entity_name.upper()[:4]}%",))
-        candidates = cur.fetchall()
-
-        bis_hits = []
-        for row in candidates:
-            score = max(
-                fuzz.token_sort_ratio(entity_name.upper(), (row[0] or '').upper()),
-                fuzz.partial_ratio(entity_name.upper(), (row[0] or '').upper()),
-            )
-            if score >= FUZZY_THRESHOLD:
-                bis_hits.append({"name": row[0], "country": row[1], "score": round(score / 100, 2)})
+def load_results(cur, monitor_ids: list) -> dict:
+    if not monitor_ids:
+        return {}
+    cur.execute("""
+        SELECT id::text, last_check_result
+        FROM monitored_entities
+        WHERE id = ANY(%s::uuid[])
+    """, (monitor_ids,))
+    return dict(cur.fetchall())
 
-        results["bis_dpl"] = {
-            "match": len(bis_hits) > 0,
-            "hit_count": len(bis_hits),
-            "top_hit": bis_hits[0] if bis_hits else None,
-        }
 
-        # OFAC Consolidated
-        cur.execute("""
-            SELECT uid, last_name, first_name, entity_type, programs
-            FROM ofac_consolidated
-            WHERE UPPER(last_name) LIKE %s
-            OR UPPER(first_name || ' ' || last_name) LIKE %s
-            LIMIT 200
-        """, (f"%{entity_name.upper()[:4]}%", f"%{entity_name.upper()[:4]}%"))
-        candidates = cur.fetchall()
-
-        con_hits = []
-        for row in candidates:
-            full_name = f"{row[2] or ''} {row[1]}".strip()
-            score = max(
-                fuzz.token_sort_ratio(entity_name.upper(), full_name.upper()),
-                fuzz.token_sort_ratio(entity_name.upper(), (row[1] or '').upper()),
-                fuzz.partial_ratio(entity_name.upper(), full_name.upper()),
+# ---------------------------
+# Bulk Writes
+# ---------------------------
+
+# Confirmed monitors only have last_check_at advanced (and their check state,
+# when they were confirmed against new list versions), in one set-based UPDATE
+# per batch: the full result (a TOASTed JSONB) is not rewritten, which keeps
+# WAL and dead tuples down. So last_check_result is the result as of its last
+# change and last_check_at when it was last confirmed.
+
+def write_batch(cur, confirmed: list, rewritten: list, now: datetime):
+    """
+    confirmed: (monitor_id, check_state or None if unchanged);
+    rewritten: (monitor_id, previous_result, current_result, changed).
+    """
+    if confirmed:
+        execute_values(cur, """
+            UPDATE monitored_entities m
+            SET last_check_at = v.checked_at,
+                last_check_fingerprints = COALESCE(v.state, m.last_check_fingerprints)
+            FROM (VALUES %s) AS v (id, state, checked_at)
+            WHERE m.id = v.id
+        """, [
+            (monitor_id, json.dumps(state) if state else None, now)
+            for monitor_id, state in confirmed
+        ], template="(%s::uuid, %s::jsonb, %s::timestamptz)", page_size=len(confirmed))
+
+    if rewritten:
+        execute_values(cur, """
+            UPDATE monitored_entities m
+            SET last_check_at = v.checked_at,
+                last_check_result = v.result,
+                last_check_fingerprints = v.state,
+                last_status_change_at = CASE WHEN v.changed THEN v.checked_at ELSE m.last_status_change_at END,
+                updated_at = v.checked_at
+            FROM (VALUES %s) AS v (id, result, state, changed, checked_at)
+            WHERE m.id = v.id
+        """, [
+            (monitor_id, json.dumps(current), json.dumps(check_state(current)), changed, now)
+            for monitor_id, _, current, changed in rewritten
+        ], template="(%s::uuid, %s::jsonb, %s::jsonb, %s::boolean, %s::timestamptz)", page_size=len(rewritten))
+
+    events = [
+        (
+            str(uuid.uuid4()), monitor_id,
+            "status_changed" if previous is not None else "initial_check",
+            json.dumps(previous) if previous else None,
+            json.dumps(current),
+            now,
+        )
+        for monitor_id, previous, current, changed in rewritten
+        if changed
+    ]
+    if events:
+        execute_values(cur, """
+            INSERT INTO monitor_events (
+                id, monitor_id, client_id, event_type, previous_result,
+                current_result, detected_at
             )
-            if score >= FUZZY_THRESHOLD:
-                con_hits.append({"uid": row[0], "name": full_name, "score": round(score / 100, 2)})
+            SELECT v.id, v.monitor_id, m.client_id, v.event_type, v.previous_result,
+                   v.current_result, v.detected_at
+            FROM (VALUES %s) AS v (id, monitor_id, event_type, previous_result, current_result, detected_at)
+            JOIN monitored_entities m ON m.id = v.monitor_id
+        """, events, template="(%s::uuid, %s::uuid, %s, %s::jsonb, %s::jsonb, %s::timestamptz)",
+            page_size=len(events))
+    return len(events)
 
-        results["ofac_consolidated"] = {
-            "match": len(con_hits) > 0,
-            "hit_count": len(con_hits),
-            "top_hit": con_hits[0] if con_hits else None,
-        }
 
-    finally:
-        cur.close()
-        conn.close()
+# ---------------------------
+# Checking
+# ---------------------------
 
-    results["any_match"] = any(r["match"] for r in results.values() if isinstance(r, dict))
-    results["checked_at"] = datetime.now(timezone.utc).isoformat()
+def batched(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
 
-    return results
+
+def stale(state: dict | None, screener: BatchScreener) -> bool:
+    """Whether a monitor was last checked against other versions of the screener's lists."""
+    if state is None or state.get("matching_version") != MATCHING_VERSION:
+        return True
+    return any(
+        (state.get(list_name) or {}).get("version_id") != screener.data_version(list_name)["version_id"]
+        for list_name in screener.indexes
+    )
+
+
+class ScreenerCache:
+    """
+    Keeps a BatchScreener (and its pool) per set of screened lists across
+    chunks and batches, rebuilt when any of those lists' active versions change.
+    """
+
+    def __init__(self):
+        self.screeners = {}
+
+    def get(self, cur, screen_names) -> BatchScreener:
+        screen_names = tuple(screen_names)
+        versions = active_versions(cur, {SCREENS[n].source for n in screen_names})
+        current = self.screeners.get(screen_names)
+        if current is not None and current.versions == versions:
+            return current
+        if current is not None:
+            current.__exit__(None, None, None)
+            del self.screeners[screen_names]
+        screener = BatchScreener(cur, screen_names, WORKERS)
+        if screener.errors:
+            # Screening without a list would report its matches as cleared.
+            raise RuntimeError(f"Lists unavailable, cycle skipped: {screener.errors}")
+        self.screeners[screen_names] = screener
+        return screener
+
+    def close(self):
+        for screener in self.screeners.values():
+            screener.__exit__(None, None, None)
+        self.screeners = {}
+
+
+def check_entities(conn, cur, screener: BatchScreener, entities: list, only_stale: bool = False) -> tuple[int, int]:
+    """Screen `entities` with `screener` and write them back. Returns (checked, changed)."""
+    if only_stale:
+        entities = [e for e in entities if stale(e[2], screener)]
+    if not entities:
+        return 0, 0
+    # Many clients monitor the same names: screen each normalized name (and
+    # entity type) once and fan its hits out to every monitor of that name.
+    groups = {}
+    for entity in entities:
+        groups.setdefault((normalize_query(entity[1]), entity[3]), []).append(entity)
+    batches = list(batched(groups.items(), BATCH_SIZE))
+    screened = screener.screen([[name for (name, _), _ in batch] for batch in batches])
+    checked_total = changed_total = 0
+
+    for batch, hits in zip(batches, screened):
+        now = datetime.now(timezone.utc)
+        bis_countries = {}
+        if "bis_dpl" in screener.indexes:
+            bis_index = screener.indexes["bis_dpl"]
+            bis_keys = [bis_index.keys[h["bis_dpl"][0].index] for h in hits if h["bis_dpl"]]
+            bis_countries = serving_rows(cur, "bis_dpl", "row_hash", ("country",), bis_keys)
+
+        confirmed, differing = [], []
+        for (_, monitors), name_hits in zip(batch, hits):
+            current = build_result(screener, name_hits, bis_countries, now)
+            for monitor_id, entity_name, state, entity_type in monitors:
+                if fingerprints_differ(state, current):
+                    differing.append((monitor_id, state, name_hits))
+                    continue
+                # Same hits; record the versions (and matcher) it was confirmed against.
+                merged = {**state, **check_state(current)}
+                confirmed.append((monitor_id, merged if merged != state else None))
+        try:
+            previous_results = load_results(cur, [m for m, state, _ in differing if state is not None])
+            rewritten = []
+            for monitor_id, state, name_hits in differing:
+                previous = previous_results.get(monitor_id)
+                current = build_result(screener, name_hits, bis_countries, now, previous)
+                rewritten.append((monitor_id, previous, current, result_changed(previous, current)))
+            changed_total += write_batch(cur, confirmed, rewritten, now)
+            conn.commit()
+            checked_total += len(confirmed) + len(rewritten)
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error writing batch of {len(confirmed) + len(differing)} monitors: {str(e)}")
+            # Fail the caller before it checkpoints past these monitors.
+            raise
+    return checked_total, changed_total
+
+
+def check_scope(conn, cur, screeners: ScreenerCache, lists, entities: list) -> tuple[int, int]:
+    """
+    Check `entities` against every monitored list, or - when `lists` is given
+    (a version of those lists was activated) - re-screen only against those
+    lists, and only the monitors not already checked against their active
+    versions. Monitors never checked are always screened against every list.
+    """
+    if lists is None:
+        return check_entities(conn, cur, screeners.get(cur, MONITOR_SCREENS), entities)
+    scope = tuple(l for l in MONITOR_SCREENS if l in lists)
+    unchecked = [e for e in entities if e[2] is None]
+    checked = changed = 0
+    if unchecked:
+        # Only these need every list: an unavailable list outside `scope`
+        # must not hold up a re-screen of the lists that were activated.
+        checked, changed = check_entities(conn, cur, screeners.get(cur, MONITOR_SCREENS), unchecked)
+    rescreened, rechanged = check_entities(conn, cur, screeners.get(cur, scope),
+                                           [e for e in entities if e[2] is not None], only_stale=True)
+    return checked + rescreened, changed + rechanged
 
 
 # ---------------------------
-# Change Detection
+# Leased Batches
 # ---------------------------
 
-def result_changed(previous: dict, current: dict) -> bool:
-    if previous is None:
-        return True
-    for list_name in ["ofac_sdn", "bis_dpl", "ofac_consolidated"]:
-        prev_match = previous.get(list_name, {}).get("match", False)
-        curr_match = current.get(list_name, {}).get("match", False)
-        if prev_match != curr_match:
-            return True
-    return False
+# A cycle is planned as id ranges of LEASE_BATCH_SIZE active monitors
+# (sql/012_monitor_work.sql). Any number of workers claim batches with
+# FOR UPDATE SKIP LOCKED and process them in chunks of BATCH_SIZE, recording
+# a checkpoint and extending the lease after each. A worker that dies, or
+# fails to write a chunk, loses its lease and the batch resumes from the last
+# checkpoint; re-checking the chunk in progress is harmless because writes are
+# idempotent (change detection compares against the stored result).
+
+LEASE_BATCH_SIZE = int(os.getenv("MONITOR_LEASE_BATCH_SIZE", "5000"))
+LEASE_SECONDS = int(os.getenv("MONITOR_LEASE_SECONDS", "300"))
+WORKER_IDLE_SECONDS = int(os.getenv("MONITOR_WORKER_IDLE_SECONDS", "30"))
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+PLAN_LOCK_ID = 360_002
+
+
+class LeaseLost(Exception):
+    """Another worker took over the batch after this worker's lease expired."""
+
+
+def plan_cycle(conn, cur, lists=None) -> int:
+    """Open a cycle over the active monitors, or join the open one for the same lists. Returns its cycle_id."""
+    scope = None if lists is None else sorted(l for l in MONITOR_SCREENS if l in lists)
+    cur.execute("SELECT pg_advisory_xact_lock(%s)", (PLAN_LOCK_ID,))
+    cur.execute("""
+        SELECT cycle_id FROM monitor_cycles
+        WHERE completed_at IS NULL AND lists IS NOT DISTINCT FROM %s::text[]
+        ORDER BY cycle_id LIMIT 1
+    """, (scope,))
+    row = cur.fetchone()
+    if row:
+        conn.commit()
+        logger.info(f"Joining open monitor cycle {row[0]}")
+        return row[0]
+
+    cur.execute("INSERT INTO monitor_cycles (lists) VALUES (%s) RETURNING cycle_id", (scope,))
+    cycle_id = cur.fetchone()[0]
+    # uuid has no min/max; its text form sorts the same way.
+    cur.execute("""
+        INSERT INTO monitor_batches (cycle_id, batch_no, first_id, last_id)
+        SELECT %s, batch_no, MIN(id::text)::uuid, MAX(id::text)::uuid
+        FROM (
+            SELECT id, ((row_number() OVER (ORDER BY id)) - 1) / %s AS batch_no
+            FROM monitored_entities
+            WHERE status = 'active'
+        ) ranked
+        GROUP BY batch_no
+    """, (cycle_id, LEASE_BATCH_SIZE))
+    batches = cur.rowcount
+    cur.execute("""
+        UPDATE monitor_cycles
+        SET batches = %s, completed_at = CASE WHEN %s = 0 THEN NOW() END
+        WHERE cycle_id = %s
+    """, (batches, batches, cycle_id))
+    conn.commit()
+    logger.info(f"Planned monitor cycle {cycle_id} ({'sweep' if scope is None else ', '.join(scope)}): {batches} batches")
+    return cycle_id
+
+
+def claim_batch(conn, cur, cycle_id=None):
+    """Lease the next unclaimed (or abandoned) batch, of `cycle_id` or of any open cycle."""
+    cur.execute("""
+        UPDATE monitor_batches b
+        SET status = 'leased',
+            leased_by = %s,
+            lease_until = NOW() + make_interval(secs => %s),
+            attempts = b.attempts + 1
+        FROM (
+            SELECT cycle_id, batch_no FROM monitor_batches
+            WHERE (status = 'pending' OR (status = 'leased' AND lease_until < NOW()))
+              AND (%s::bigint IS NULL OR cycle_id = %s::bigint)
+            ORDER BY cycle_id, batch_no
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        ) c, monitor_cycles m
+        WHERE b.cycle_id = c.cycle_id AND b.batch_no = c.batch_no AND m.cycle_id = b.cycle_id
+        RETURNING b.cycle_id, b.batch_no, m.lists, b.first_id, b.last_id, b.checkpoint_id, b.attempts
+    """, (WORKER_ID, LEASE_SECONDS, cycle_id, cycle_id))
+    row = cur.fetchone()
+    conn.commit()
+    return row
+
+
+def checkpoint(conn, cur, cycle_id: int, batch_no: int, last_id, checked: int, changed: int):
+    cur.execute("""
+        UPDATE monitor_batches
+        SET checkpoint_id = %s,
+            checked = checked + %s,
+            changed = changed + %s,
+            lease_until = NOW() + make_interval(secs => %s)
+        WHERE cycle_id = %s AND batch_no = %s AND status = 'leased' AND leased_by = %s
+    """, (last_id, checked, changed, LEASE_SECONDS, cycle_id, batch_no, WORKER_ID))
+    lost = cur.rowcount == 0
+    conn.commit()
+    if lost:
+        raise LeaseLost(f"batch {cycle_id}/{batch_no}")
+
+
+def complete_batch(conn, cur, cycle_id: int, batch_no: int):
+    cur.execute("""
+        UPDATE monitor_batches
+        SET status = 'done', completed_at = NOW(), lease_until = NULL
+        WHERE cycle_id = %s AND batch_no = %s AND leased_by = %s
+    """, (cycle_id, batch_no, WORKER_ID))
+    cur.execute("""
+        UPDATE monitor_cycles
+        SET completed_at = NOW()
+        WHERE cycle_id = %s AND completed_at IS NULL
+          AND NOT EXISTS (SELECT 1 FROM monitor_batches WHERE cycle_id = %s AND status <> 'done')
+        RETURNING batches
+    """, (cycle_id, cycle_id))
+    finished = cur.fetchone()
+    conn.commit()
+    if finished:
+        logger.info(f"Monitor cycle {cycle_id} complete ({finished[0]} batches)")
+
+
+def process_batch(conn, cur, screeners: ScreenerCache, batch) -> tuple[int, int]:
+    cycle_id, batch_no, lists, first_id, last_id, checkpoint_id, attempts = batch
+    if checkpoint_id:
+        logger.info(f"Resuming batch {cycle_id}/{batch_no} after {checkpoint_id} (attempt {attempts})")
+    checked_total = changed_total = 0
+    while True:
+        cur.execute("""
+            SELECT id, entity_name, last_check_fingerprints, entity_type
+            FROM monitored_entities
+            WHERE status = 'active'
+              AND id BETWEEN %s AND %s
+              AND (%s::uuid IS NULL OR id > %s::uuid)
+            ORDER BY id
+            LIMIT %s
+        """, (first_id, last_id, checkpoint_id, checkpoint_id, BATCH_SIZE))
+        entities = [(str(r[0]), r[1], r[2], r[3]) for r in cur.fetchall()]
+        conn.commit()
+        if not entities:
+            break
+        checked, changed = check_scope(conn, cur, screeners, lists, entities)
+        checkpoint_id = entities[-1][0]
+        checkpoint(conn, cur, cycle_id, batch_no, checkpoint_id, checked, changed)
+        checked_total += checked
+        changed_total += changed
+    complete_batch(conn, cur, cycle_id, batch_no)
+    return checked_total, changed_total
+
+
+def work(conn, cur, screeners: ScreenerCache, cycle_id=None) -> tuple[int, int, int]:
+    """Process batches until none can be claimed. Returns (batches, checked, changed)."""
+    batches = checked_total = changed_total = 0
+    while batch := claim_batch(conn, cur, cycle_id):
+        try:
+            checked, changed = process_batch(conn, cur, screeners, batch)
+        except LeaseLost as e:
+            logger.warning(f"Lease lost on {e}, moving on")
+            continue
+        batches += 1
+        checked_total += checked
+        changed_total += changed
+    return batches, checked_total, changed_total
 
 
 # ---------------------------
 # Main Loop
 # ---------------------------
 
-def run_monitor_cycle():
-    logger.info("Starting monitor cycle")
+def run_monitor_cycle(lists=None):
+    """
+    Plan a cycle (see check_scope for `lists`) and work on its batches until
+    none are left to claim; other workers may be sharing it.
+    """
+    scope = MONITOR_SCREENS if lists is None else tuple(l for l in MONITOR_SCREENS if l in lists)
+    logger.info(f"Starting monitor cycle ({'sweep' if lists is None else 'lists ' + ', '.join(scope)})")
+    if not scope:
+        return
+    started = time.perf_counter()
     conn = get_conn()
     cur = conn.cursor()
+    screeners = ScreenerCache()
 
     try:
-        cur.execute("""
-            SELECT id, entity_name, last_check_result
-            FROM monitored_entities
-            WHERE status = 'active'
-        """)
-        entities = cur.fetchall()
-        logger.info(f"Found {len(entities)} active monitored entities")
+        cycle_id = plan_cycle(conn, cur, lists)
+        batches, checked_total, changed_total = work(conn, cur, screeners, cycle_id)
+        logger.info(
+            f"Monitor cycle {cycle_id}: this worker did {batches} batches, {checked_total} checked, "
+            f"{changed_total} changed in {time.perf_counter() - started:.1f}s"
+        )
     finally:
+        screeners.close()
         cur.close()
         conn.close()
 
-    for row in entities:
-        monitor_id = str(row[0])
-        entity_name = row[1]
-        previous_result = row[2]
-
-        logger.info(f"Checking: {entity_name}")
 
+def run_worker():
+    """Work on any open cycle's batches; run as many replicas as needed."""
+    logger.info(f"Monitor worker {WORKER_ID} started")
+    screeners = ScreenerCache()
+    conn = None
+    while True:
         try:
-            current_result = screen_entity(entity_name)
-            changed = result_changed(previous_result, current_result)
-
-            conn = get_conn()
+            if conn is None or conn.closed:
+                conn = get_conn()
             cur = conn.cursor()
-            try:
-                now = datetime.now(timezone.utc)
-
-                if changed:
-                    cur.execute("""
-                        UPDATE monitored_entities
-                        SET last_check_at = %s,
-                            last_check_result = %s,
-                            last_status_change_at = %s,
-                            updated_at = %s
-                        WHERE id = %s
-                    """, (now, json.dumps(current_result), now, now, monitor_id))
-
-                    event_id = str(uuid.uuid4())
-                    event_type = "status_changed" if previous_result is not None else "initial_check"
-                    cur.execute("""
-                        INSERT INTO monitor_events (
-                            id, monitor_id, event_type, previous_result,
-                            current_result, detected_at
-                        )
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                    """, (
-                        event_id, monitor_id, event_type,
-                        json.dumps(previous_result) if previous_result else None,
-                        json.dumps(current_result),
-                        now
-                    ))
-                    logger.info(f"Change detected for {entity_name} — event written")
-
-                else:
-                    cur.execute("""
-                        UPDATE monitored_entities
-                        SET last_check_at = %s,
-                            last_check_result = %s,
-                            updated_at = %s
-                        WHERE id = %s
-                    """, (now, json.dumps(current_result), now, monitor_id))
-                    logger.info(f"No change for {entity_name}")
-
-                conn.commit()
-
-            finally:
-                cur.close()
+            batches, checked, changed = work(conn, cur, screeners)
+            cur.close()
+            if batches:
+                logger.info(f"Worked {batches} batches: {checked} checked, {changed} changed")
+        except Exception as e:
+            logger.error(f"Worker error: {str(e)}")
+            if conn is not None:
                 conn.close()
+            conn = None
+        time.sleep(WORKER_IDLE_SECONDS)
+
+
+def reverse_screen_list(conn, cur, list_name: str) -> tuple[int, int]:
+    """
+    Bring every monitor up to the active version of one list. Monitors whose
+    match_key can hit one of the version's changed entries are re-screened; the
+    rest of those confirmed against the previous version cannot screen
+    differently and are carried over by recording the reverse screen, without
+    writing them. Returns (re-screened, changed).
+    """
+    delta = version_delta(cur, list_name)
+    backfill_match_keys(cur, "monitored_entities")
+    conn.commit()
+    confirmed = confirmed_versions(cur, "monitored_entities", list_name, delta.previous_version_id)
+
+    # Never checked, checked with another matcher or against a version not
+    # carried into the previous one, or possibly affected by the change set.
+    cur.execute("""
+        SELECT id, entity_name, last_check_fingerprints, entity_type
+        FROM monitored_entities
+        WHERE status = 'active'
+          AND (
+            last_check_fingerprints IS NULL
+            OR (last_check_fingerprints->>'matching_version')::int IS DISTINCT FROM %(matching_version)s
+            OR ((last_check_fingerprints->%(list)s->>'version_id')::int = ANY(%(confirmed)s)) IS NOT TRUE
+            OR match_key IS NULL
+            OR match_key = ANY(%(keys)s)
+          )
+          AND (
+            last_check_fingerprints IS NULL
+            OR (last_check_fingerprints->>'matching_version')::int IS DISTINCT FROM %(matching_version)s
+            OR (last_check_fingerprints->%(list)s->>'version_id')::int IS DISTINCT FROM %(current)s
+          )
+    """, {"matching_version": MATCHING_VERSION, "list": list_name, "confirmed": confirmed,
+          "current": delta.data_version["version_id"], "keys": list(delta.keys)})
+    entities = [(str(r[0]), r[1], r[2], r[3]) for r in cur.fetchall()]
+    conn.commit()
+
+    screeners = ScreenerCache()
+    try:
+        unchecked = [e for e in entities if e[2] is None]
+        checked_total = changed_total = 0
+        if unchecked:
+            # As in check_scope: other lists are only needed for never-checked monitors.
+            checked_total, changed_total = check_entities(conn, cur, screeners.get(cur, MONITOR_SCREENS), unchecked)
+        rescreened, changed = check_entities(conn, cur, screeners.get(cur, (list_name,)),
+                                             [e for e in entities if e[2] is not None])
+    finally:
+        screeners.close()
 
-        except Exception as e:
-            logger.error(f"Error checking {entity_name}: {str(e)}")
-            continue
+    record_reverse_screen(cur, "monitored_entities", list_name, delta, checked_total + rescreened)
+    conn.commit()
+    return checked_total + rescreened, changed_total + changed
+
+
+def run_reverse_cycle(lists):
+    """
+    Re-screen after activations of `lists` by reverse screening their change
+    sets. Lists without a usable change set get a scoped forward cycle.
+    """
+    scope = [l for l in MONITOR_SCREENS if l in lists]
+    started = time.perf_counter()
+    fallback = []
+    conn = get_conn()
+    cur = conn.cursor()
+
+    try:
+        for list_name in scope:
+            try:
+                checked, changed = reverse_screen_list(conn, cur, list_name)
+                logger.info(f"Reverse screen {list_name}: {checked} re-screened, {changed} changed")
+            except ReverseScreenUnavailable as e:
+                conn.rollback()
+                logger.warning(f"Reverse screen {list_name} unavailable ({e}), re-screening all monitors")
+                fallback.append(list_name)
+    finally:
+        cur.close()
+        conn.close()
+
+    if fallback:
+        run_monitor_cycle(lists=fallback)
+    logger.info(f"Reverse cycle done in {time.perf_counter() - started:.1f}s")
 
 
 # ---------------------------
@@ -234,6 +647,9 @@ def run_monitor_cycle():
 CHECK_INTERVAL_SECONDS = int(os.getenv("MONITOR_INTERVAL_SECONDS", "3600"))
 
 if __name__ == "__main__":
+    if "--worker" in sys.argv:
+        # Extra capacity: only works on cycles planned by the scheduler (or the orchestrator).
+        run_worker()
     logger.info(f"Monitor scheduler starting. Interval: {CHECK_INTERVAL_SECONDS}s")
     while True:
         try:
@@ -241,4 +657,4 @@ if __name__ == "__main__":
         except Exception as e:
             logger.error(f"Cycle error: {str(e)}")
         logger.info(f"Sleeping {CHECK_INTERVAL_SECONDS}s until next cycle")
-        time.sleep(CHECK_INTERVAL_SECONDS)
\ No newline at end of file
+        time.sleep(CHECK_INTERVAL_SECONDS)
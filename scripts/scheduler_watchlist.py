@@ -1,169 +1,219 @@
 import os
+import sys
 import json
 import time
-import requests
-import psycopg2
+import logging
 from datetime import datetime, timezone
+from itertools import islice
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv()
 
-INTERVAL_SECONDS = 4 * 60 * 60  # 4 hours
-API_BASE = os.getenv("API_BASE", "http://api:8000")
-SYSTEM_API_KEY = os.getenv("SYSTEM_API_KEY", "DEVKEY999")
+from app.infra.db import get_conn
+from app.infra.outbox import enqueue_webhooks
+from app.screening.engine import BatchScreener
+from app.screening.matching import MAX_HITS, normalize_query
+from app.screening.receipts import issue_receipt
+from app.screening.reverse import (
+    ReverseScreenUnavailable, backfill_match_keys, confirmed_versions, record_reverse_screen, version_delta,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
 
+# Entries are screened in-process against the active versions of the three
+# lists (the same matcher and receipts as /verify/ofac, /verify/bis and
+# /verify/ofac-consolidated), batches of names spread over WATCHLIST_WORKERS
+# processes. Each batch's receipts and updates are committed together.
 
-def get_conn():
-    return psycopg2.connect(
-        host=os.getenv("DB_HOST", "localhost"),
-        port=os.getenv("DB_PORT", 5432),
-        dbname=os.getenv("DB_NAME", "mic"),
-        user=os.getenv("DB_USER", "mic_app"),
-        password=os.getenv("DB_PASSWORD")
-    )
+WATCHLIST_SCREENS = ("ofac_sdn", "bis_dpl", "ofac_consolidated")
+BATCH_SIZE = int(os.getenv("WATCHLIST_BATCH_SIZE", "200"))
+WORKERS = int(os.getenv("WATCHLIST_WORKERS", str(os.cpu_count() or 1)))
+
+INTERVAL_SECONDS = 4 * 60 * 60  # 4 hours
 
 
-def get_active_watchlist(cur):
+def get_active_watchlist(cur, ids=None):
     cur.execute("""
         SELECT id, client_id, entity_name, entity_type, last_match_status
         FROM watchlist
         WHERE is_active = TRUE
+          AND (%s::int[] IS NULL OR id = ANY(%s::int[]))
         ORDER BY added_at ASC
-    """)
+    """, (ids, ids))
     return cur.fetchall()
 
 
-def get_client_webhooks(cur, client_id):
-    cur.execute("""
-        SELECT endpoint_url
-        FROM webhooks
-        WHERE client_id = %s AND is_active = TRUE
-    """, (client_id,))
-    return [row[0] for row in cur.fetchall()]
-
-
-def screen_entity(entity_name):
-    """Run entity through all three verify endpoints. Return claim_ids and whether any match was found."""
-    headers = {
-        "Content-Type": "application/json",
-        "X-Api-Key": SYSTEM_API_KEY
-    }
-    payload = json.dumps({"entity_name": entity_name})
-    endpoints = [
-        ("/verify/ofac", "ofac_match"),
-        ("/verify/bis", "bis_match"),
-        ("/verify/ofac-consolidated", "ofac_consolidated_match"),
-    ]
+def screen_entity(cur, screener: BatchScreener, entity_name: str, hits: dict, now: datetime):
+    """Write one receipt per list for a screened name. Return claim_ids and whether any match was found."""
     claim_ids = []
     any_match = False
-
-    for endpoint, match_key in endpoints:
-        try:
-            response = requests.post(
-                f"{API_BASE}{endpoint}",
-                data=payload,
-                headers=headers,
-                timeout=30
-            )
-            if response.status_code == 200:
-                data = response.json()
-                claim_id = data.get("claim_id")
-                if claim_id:
-                    claim_ids.append(claim_id)
-                    print(f"  [{endpoint}] claim_id: {claim_id}")
-                if data.get(match_key):
-                    any_match = True
-            else:
-                print(f"  [{endpoint}] ERROR {response.status_code}: {response.text}")
-        except Exception as e:
-            print(f"  [{endpoint}] EXCEPTION: {e}")
-
+    for screen_name in WATCHLIST_SCREENS:
+        index = screener.indexes[screen_name]
+        hit_keys = [index.keys[h.index] for h in hits[screen_name]]
+        claim_ids.append(issue_receipt(cur, screener.screens[screen_name], entity_name,
+                                       screener.data_version(screen_name), hit_keys, now))
+        any_match = any_match or bool(hit_keys)
     return claim_ids, any_match
 
 
-def fire_webhooks(endpoints, entity_name, new_status, last_receipt_id, screened_at):
-    """Fire alert to all registered webhook endpoints."""
-    payload = {
+def queue_alert(cur, client_id, entity_name, new_status, last_receipt_id, screened_at):
+    """Queue the alert for the client's webhooks; scripts/webhook_dispatcher.py delivers it."""
+    return enqueue_webhooks(cur, client_id, "watchlist_alert", {
         "event": "watchlist_alert",
         "entity_name": entity_name,
         "change": new_status,
         "receipt_id": last_receipt_id,
         "screened_at": screened_at.isoformat(),
-    }
-    headers = {"Content-Type": "application/json"}
-    for url in endpoints:
-        try:
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
-            print(f"  Webhook fired to {url} — status {response.status_code}")
-        except Exception as e:
-            print(f"  Webhook failed for {url}: {e}")
+    })
 
 
-def update_watchlist_entry(cur, watchlist_id, claim_ids, new_match_status):
+def update_watchlist_entry(cur, watchlist_id, claim_ids, new_match_status, checked_versions):
     last_receipt_id = claim_ids[-1] if claim_ids else None
+    now = datetime.now(timezone.utc)
     cur.execute("""
         UPDATE watchlist
         SET last_checked_at = %s,
             last_receipt_id = %s,
-            last_match_status = %s
+            last_status_change_at = CASE WHEN last_match_status IS DISTINCT FROM %s THEN %s
+                                         ELSE last_status_change_at END,
+            last_match_status = %s,
+            checked_versions = %s
         WHERE id = %s
-    """, (datetime.now(timezone.utc), last_receipt_id, new_match_status, watchlist_id))
-
+    """, (now, last_receipt_id, new_match_status, now, new_match_status, json.dumps(checked_versions), watchlist_id))
+
+
+def reverse_candidates(lists):
+    """
+    Ids of the active entries an activation of `lists` may affect - those whose
+    match_key can hit a changed entry, plus those not confirmed against the
+    version it replaced - and the deltas to record once they are screened.
+    None when a list has no usable change set.
+    """
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        backfill_match_keys(cur, "watchlist")
+        conn.commit()
+        ids, deltas = set(), {}
+        for list_name in [l for l in WATCHLIST_SCREENS if l in lists]:
+            try:
+                delta = version_delta(cur, list_name)
+            except ReverseScreenUnavailable as e:
+                logger.warning(f"Reverse screen {list_name} unavailable ({e}), screening all entries")
+                return None
+            confirmed = confirmed_versions(cur, "watchlist", list_name, delta.previous_version_id)
+            cur.execute("""
+                SELECT id FROM watchlist
+                WHERE is_active = TRUE
+                  AND (((checked_versions->>%(list)s)::int = ANY(%(confirmed)s)) IS NOT TRUE
+                       OR match_key IS NULL OR match_key = ANY(%(keys)s))
+                  AND (checked_versions->>%(list)s)::int IS DISTINCT FROM %(current)s
+            """, {"list": list_name, "confirmed": confirmed, "keys": list(delta.keys),
+                  "current": delta.data_version["version_id"]})
+            ids.update(row[0] for row in cur.fetchall())
+            deltas[list_name] = delta
+        return sorted(ids), deltas
+    finally:
+        conn.rollback()
+        cur.close()
+        conn.close()
 
-def run_once():
-    now = datetime.now(timezone.utc)
-    print(f"[{now}] Watchlist scheduler starting...")
 
+def run_reverse(lists):
+    candidates = reverse_candidates(lists)
+    if candidates is None:
+        run_once()
+        return
+    ids, deltas = candidates
+    if ids:
+        run_once(ids)
+    else:
+        logger.info("No watchlist entries affected by the activated versions.")
+
+    # The other entries are carried over to the new versions without a write.
+    conn = get_conn()
+    cur = conn.cursor()
     try:
-        conn = get_conn()
-        cur = conn.cursor()
+        for list_name, delta in deltas.items():
+            record_reverse_screen(cur, "watchlist", list_name, delta, len(ids))
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
 
-        entries = get_active_watchlist(cur)
-        print(f"Active watchlist entries: {len(entries)}")
+
+def run_once(ids=None):
+    """Screen every active entry, or only those in `ids`. Failures propagate to the caller."""
+    logger.info("Watchlist scheduler starting...")
+
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        entries = get_active_watchlist(cur, ids)
+        logger.info(f"Active watchlist entries: {len(entries)}")
 
         if not entries:
-            print("Nothing to screen. Sleeping.")
-            cur.close()
-            conn.close()
+            logger.info("Nothing to screen.")
             return
 
+        # Entries of the same name and type (often across clients) are screened
+        # once; each entry still gets its own receipts, change detection, update
+        # and webhooks.
+        groups = {}
         for row in entries:
-            watchlist_id, client_id, entity_name, entity_type, last_match_status = row
-            print(f"Screening: {entity_name} ({entity_type})")
-
-            claim_ids, any_match = screen_entity(entity_name)
-            new_match_status = "match" if any_match else "clear"
-
-            # Change detection
-            status_changed = new_match_status != last_match_status
-            if status_changed:
-                print(f"  STATUS CHANGE: {last_match_status} → {new_match_status}")
-                webhook_urls = get_client_webhooks(cur, client_id)
-                if webhook_urls:
-                    last_receipt_id = claim_ids[-1] if claim_ids else None
-                    fire_webhooks(webhook_urls, entity_name, new_match_status, last_receipt_id, now)
-                else:
-                    print(f"  No webhooks registered for client {client_id}")
-            else:
-                print(f"  No status change ({new_match_status})")
-
-            update_watchlist_entry(cur, watchlist_id, claim_ids, new_match_status)
-            print(f"  Updated watchlist entry {watchlist_id}")
-
-        conn.commit()
+            groups.setdefault((normalize_query(row[2]), row[3]), []).append(row)
+        logger.info(f"Unique names to screen: {len(groups)}")
+
+        with BatchScreener(cur, WATCHLIST_SCREENS, WORKERS) as screener:
+            if screener.errors:
+                # Screening without a list would clear its matches.
+                raise RuntimeError(f"Lists unavailable, run skipped: {screener.errors}")
+            conn.commit()
+
+            batches = []
+            rest = iter(groups.values())
+            while batch := list(islice(rest, BATCH_SIZE)):
+                batches.append(batch)
+            # Receipts record the same top MAX_HITS hits as /verify, so replay reproduces them.
+            screened = screener.screen([[rows[0][2] for rows in batch] for batch in batches], limit=MAX_HITS)
+            checked_versions = {l: screener.data_version(l)["version_id"] for l in WATCHLIST_SCREENS}
+
+            for batch, batch_hits in zip(batches, screened):
+                now = datetime.now(timezone.utc)
+                alerts = 0
+                for rows, hits in zip(batch, batch_hits):
+                    for watchlist_id, client_id, entity_name, entity_type, last_match_status in rows:
+                        # The receipt records the name as this entry spells it.
+                        claim_ids, any_match = screen_entity(cur, screener, entity_name, hits, now)
+                        new_match_status = "match" if any_match else "clear"
+
+                        # Change detection
+                        if new_match_status != last_match_status:
+                            logger.info(f"  STATUS CHANGE: {entity_name} ({entity_type}) {last_match_status} → {new_match_status}")
+                            alerts += queue_alert(cur, client_id, entity_name, new_match_status, claim_ids[-1], now)
+                        update_watchlist_entry(cur, watchlist_id, claim_ids, new_match_status, checked_versions)
+                # Receipts, updates and their alerts commit together.
+                conn.commit()
+                logger.info(f"  Screened {len(batch)} names, {sum(len(rows) for rows in batch)} entries updated, "
+                            f"{alerts} alerts queued")
+
+        logger.info("Watchlist run complete.")
+    finally:
+        # Batches committed before a failure stay; the rest is retried next run.
         cur.close()
         conn.close()
-        print(f"[{datetime.now(timezone.utc)}] Watchlist run complete.")
-
-    except Exception as e:
-        print(f"[ERROR] {e}")
 
 
 def run_scheduler():
-    print("Watchlist Scheduler started. Interval: 4 hours.")
+    logger.info("Watchlist Scheduler started. Interval: 4 hours.")
     while True:
-        run_once()
-        print(f"Next run in 4 hours...")
+        try:
+            run_once()
+        except Exception as e:
+            logger.error(f"Watchlist run failed: {e}")
+        logger.info("Next run in 4 hours...")
         time.sleep(INTERVAL_SECONDS)
 
 
@@ -0,0 +1,308 @@
+import os
+import sys
+import time
+import random
+import signal
+import asyncio
+import logging
+import threading
+from bisect import bisect_left
+
+import httpx
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv()
+
+from app.infra.db import get_conn
+from app.infra.outbox import sign
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("webhook_dispatcher")
+logging.getLogger("httpx").setLevel(logging.WARNING)   # one line per request otherwise
+
+# Delivers the webhook outbox (sql/010_webhook_outbox.sql), independent of the
+# schedulers that enqueue alerts.
+#
+# - One pooled keep-alive httpx client; at most CONCURRENCY requests in flight,
+#   and at most ENDPOINT_CONCURRENCY per endpoint, so a slow endpoint only
+#   queues its own deliveries.
+# - Failed deliveries are retried with exponential backoff (with jitter) and
+#   become 'dead' after MAX_ATTEMPTS.
+# - Per-endpoint circuit breaker: after BREAKER_FAILURES consecutive failures
+#   the endpoint is skipped for BREAKER_SECONDS, then probed with one delivery.
+# - Batched deliveries (webhooks with a batch window) become due when their
+#   window closes; claiming one closes it to further alerts.
+# - Deliveries to webhooks with a secret are signed (X-Webhook-Signature).
+# - Claimed rows are leased (next_attempt_at pushed past LEASE_SECONDS), so
+#   several dispatchers can run and a crashed one's deliveries are retried.
+
+CONCURRENCY = int(os.getenv("WEBHOOK_CONCURRENCY", "64"))
+ENDPOINT_CONCURRENCY = int(os.getenv("WEBHOOK_ENDPOINT_CONCURRENCY", "4"))
+TIMEOUT_SECONDS = float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", "10"))
+MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "10"))
+BACKOFF_SECONDS = float(os.getenv("WEBHOOK_BACKOFF_SECONDS", "5"))
+MAX_BACKOFF_SECONDS = float(os.getenv("WEBHOOK_MAX_BACKOFF_SECONDS", "3600"))
+BREAKER_FAILURES = int(os.getenv("WEBHOOK_BREAKER_FAILURES", "5"))
+BREAKER_SECONDS = float(os.getenv("WEBHOOK_BREAKER_SECONDS", "60"))
+LEASE_SECONDS = int(os.getenv("WEBHOOK_LEASE_SECONDS", "120"))
+POLL_SECONDS = float(os.getenv("WEBHOOK_POLL_SECONDS", "1"))
+REPORT_SECONDS = int(os.getenv("WEBHOOK_REPORT_SECONDS", "300"))
+
+# Upper bounds (ms) of the request latency histogram buckets.
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Request latency counts per LATENCY_BUCKETS_MS upper bound (last bucket is overflow)."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def observe(self, ms: float):
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+
+    def __str__(self):
+        labels = [f"<={b}" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        return " ".join(f"{label}:{n}" for label, n in zip(labels, self.counts) if n)
+
+
+class Breaker:
+    """Consecutive-failure circuit breaker for one endpoint."""
+
+    def __init__(self):
+        self.failures = 0
+        self.opened_until = 0.0
+
+    def capacity(self, now: float) -> int:
+        """How many deliveries the endpoint may have in flight right now."""
+        if self.failures < BREAKER_FAILURES:
+            return ENDPOINT_CONCURRENCY
+        if now < self.opened_until:
+            return 0
+        return 1   # half-open: one probe
+
+    def success(self):
+        self.failures = 0
+        self.opened_until = 0.0
+
+    def failure(self, now: float) -> bool:
+        """Record a failure; True when this opens (or re-opens) the circuit."""
+        self.failures += 1
+        if self.failures >= BREAKER_FAILURES:
+            self.opened_until = now + BREAKER_SECONDS
+            return True
+        return False
+
+
+# ---------------------------
+# Outbox access
+# ---------------------------
+
+class Outbox:
+    """The dispatcher's DB connection; called from worker threads, one statement at a time."""
+
+    def __init__(self):
+        self.conn = None
+        self.lock = threading.Lock()
+
+    def _execute(self, sql, params):
+        with self.lock:
+            try:
+                if self.conn is None or self.conn.closed:
+                    self.conn = get_conn()
+                cur = self.conn.cursor()
+                cur.execute(sql, params)
+                rows = cur.fetchall() if cur.description else None
+                self.conn.commit()
+                cur.close()
+                return rows
+            except Exception:
+                if self.conn is not None:
+                    self.conn.close()
+                self.conn = None
+                raise
+
+    def claim(self, limit: int, capacity: dict, default_capacity: int) -> list:
+        """
+        Lease up to `limit` due deliveries, at most `capacity[url]` per endpoint
+        (default_capacity for endpoints not listed), oldest first per endpoint.
+        """
+        urls, caps = list(capacity), list(capacity.values())
+        return self._execute("""
+            WITH due AS (
+                SELECT o.id, o.next_attempt_at,
+                       row_number() OVER (PARTITION BY o.endpoint_url ORDER BY o.next_attempt_at, o.id) AS rn,
+                       COALESCE(c.cap, %s) AS cap
+                FROM webhook_outbox o
+                LEFT JOIN unnest(%s::text[], %s::int[]) AS c (url, cap) ON c.url = o.endpoint_url
+                WHERE o.status = 'pending' AND o.next_attempt_at <= NOW()
+            ),
+            picked AS (
+                SELECT id FROM due
+                WHERE rn <= cap
+                ORDER BY rn, next_attempt_at
+                LIMIT %s
+            )
+            UPDATE webhook_outbox o
+            SET next_attempt_at = NOW() + make_interval(secs => %s),
+                coalesce_until = NULL
+            FROM picked
+            WHERE o.id = picked.id
+              AND o.status = 'pending'
+              AND o.next_attempt_at <= NOW()
+            RETURNING o.id, o.endpoint_url, o.event_type, o.payload::text, o.attempts,
+                      (SELECT w.secret FROM webhooks w WHERE w.id = o.webhook_id)
+        """, (default_capacity, urls, caps, limit, LEASE_SECONDS))
+
+    def delivered(self, delivery_id: int, status_code: int):
+        self._execute("""
+            UPDATE webhook_outbox
+            SET status = 'delivered',
+                attempts = attempts + 1,
+                last_status_code = %s,
+                last_error = NULL,
+                delivered_at = NOW(),
+                latency_ms = EXTRACT(EPOCH FROM (NOW() - created_at)) * 1000
+            WHERE id = %s
+        """, (status_code, delivery_id))
+
+    def failed(self, delivery_id: int, attempts: int, status_code, error: str) -> bool:
+        """Record a failed attempt; True when the delivery is now dead."""
+        dead = attempts + 1 >= MAX_ATTEMPTS
+        delay = min(BACKOFF_SECONDS * 2 ** attempts, MAX_BACKOFF_SECONDS) * random.uniform(0.5, 1.0)
+        self._execute("""
+            UPDATE webhook_outbox
+            SET status = CASE WHEN %s THEN 'dead' ELSE 'pending' END,
+                attempts = attempts + 1,
+                last_status_code = %s,
+                last_error = %s,
+                next_attempt_at = NOW() + make_interval(secs => %s)
+            WHERE id = %s
+        """, (dead, status_code, error, delay, delivery_id))
+        return dead
+
+
+# ---------------------------
+# Dispatcher
+# ---------------------------
+
+class Dispatcher:
+    def __init__(self, outbox: Outbox, client: httpx.AsyncClient):
+        self.outbox = outbox
+        self.client = client
+        self.breakers = {}     # endpoint_url -> Breaker
+        self.in_flight = {}    # endpoint_url -> count
+        self.tasks = set()
+        self.histogram = Histogram()
+        self.outcomes = {"delivered": 0, "retried": 0, "dead": 0}
+
+    def breaker(self, url: str) -> Breaker:
+        return self.breakers.setdefault(url, Breaker())
+
+    def capacity(self) -> dict:
+        """Remaining per-endpoint capacity, for endpoints that are not at the default."""
+        now = time.monotonic()
+        urls = set(self.in_flight) | {u for u, b in self.breakers.items() if b.failures >= BREAKER_FAILURES}
+        return {u: max(self.breaker(u).capacity(now) - self.in_flight.get(u, 0), 0) for u in urls}
+
+    async def deliver(self, delivery_id: int, url: str, event_type: str, body: str, attempts: int,
+                      secret: str | None):
+        try:
+            await self._deliver(delivery_id, url, event_type, body, attempts, secret)
+        finally:
+            self.in_flight[url] -= 1
+            if not self.in_flight[url]:
+                del self.in_flight[url]
+
+    async def _deliver(self, delivery_id: int, url: str, event_type: str, body: str, attempts: int,
+                       secret: str | None):
+        status_code, error = None, None
+        started = time.perf_counter()
+        try:
+            headers = {
+                "Content-Type": "application/json",
+                "X-Webhook-Event": event_type,
+                "X-Webhook-Delivery": str(delivery_id),
+                "X-Webhook-Attempt": str(attempts + 1),
+            }
+            if secret:
+                timestamp = int(time.time())
+                headers["X-Webhook-Timestamp"] = str(timestamp)
+                headers["X-Webhook-Signature"] = sign(secret, timestamp, body)
+            response = await self.client.post(url, content=body, headers=headers)
+            status_code = response.status_code
+            if not 200 <= status_code < 300:
+                error = f"HTTP {status_code}"
+        except Exception as e:
+            # Not only httpx.HTTPError: a malformed URL raises httpx.InvalidURL,
+            # and it must count as a failed attempt or the row is re-leased forever.
+            error = f"{type(e).__name__}: {e}"
+        self.histogram.observe((time.perf_counter() - started) * 1000)
+
+        breaker = self.breaker(url)
+        try:
+            if error is None:
+                breaker.success()
+                await asyncio.to_thread(self.outbox.delivered, delivery_id, status_code)
+                self.outcomes["delivered"] += 1
+                return
+            if breaker.failure(time.monotonic()):
+                logger.warning(f"Circuit open for {url} for {BREAKER_SECONDS:.0f}s after {breaker.failures} failures")
+            dead = await asyncio.to_thread(self.outbox.failed, delivery_id, attempts, status_code, error)
+            self.outcomes["dead" if dead else "retried"] += 1
+            if dead:
+                logger.error(f"Delivery {delivery_id} to {url} dead after {attempts + 1} attempts: {error}")
+        except Exception as e:
+            # The lease expires and the delivery is retried.
+            logger.error(f"Could not record delivery {delivery_id}: {e}")
+
+    async def run(self, stop: asyncio.Event):
+        last_report = time.monotonic()
+        while not stop.is_set():
+            free = CONCURRENCY - len(self.tasks)
+            rows = []
+            if free > 0:
+                try:
+                    rows = await asyncio.to_thread(self.outbox.claim, free, self.capacity(), ENDPOINT_CONCURRENCY)
+                except Exception as e:
+                    logger.error(f"Claiming deliveries failed: {e}")
+
+            for delivery_id, url, event_type, body, attempts, secret in rows:
+                self.in_flight[url] = self.in_flight.get(url, 0) + 1
+                task = asyncio.create_task(self.deliver(delivery_id, url, event_type, body, attempts, secret))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+
+            if time.monotonic() - last_report >= REPORT_SECONDS:
+                open_circuits = [u for u, b in self.breakers.items() if b.capacity(time.monotonic()) == 0]
+                logger.info(f"Deliveries: {self.outcomes} | in flight {len(self.tasks)} | "
+                            f"open circuits {len(open_circuits)} | latency ms: {self.histogram}")
+                last_report = time.monotonic()
+
+            # Claimed everything due (or all there is room for): wait for the
+            # poll interval or a finished delivery.
+            waits = [asyncio.create_task(stop.wait())] + list(self.tasks)
+            await asyncio.wait(waits, timeout=POLL_SECONDS, return_when=asyncio.FIRST_COMPLETED)
+            waits[0].cancel()
+
+        if self.tasks:
+            await asyncio.wait(self.tasks, timeout=TIMEOUT_SECONDS)
+
+
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    limits = httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY)
+    async with httpx.AsyncClient(timeout=TIMEOUT_SECONDS, limits=limits) as client:
+        logger.info(f"Webhook dispatcher started. Concurrency {CONCURRENCY} ({ENDPOINT_CONCURRENCY} per endpoint), "
+                    f"max attempts {MAX_ATTEMPTS}")
+        await Dispatcher(Outbox(), client).run(stop)
+    logger.info("Webhook dispatcher stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
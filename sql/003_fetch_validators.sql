@@ -0,0 +1,16 @@
+-- 003_fetch_validators.sql
+-- HTTP validators (ETag / Last-Modified) per list URL, used for conditional fetches
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS fetch_validators (
+  source_url    TEXT PRIMARY KEY,
+  etag          TEXT,
+  last_modified TEXT,
+  content_hash  TEXT NOT NULL,
+  updated_at    TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+GRANT SELECT, INSERT, UPDATE ON TABLE fetch_validators TO mic_app;
+
+COMMIT;
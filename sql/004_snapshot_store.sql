@@ -0,0 +1,40 @@
+-- 004_snapshot_store.sql
+-- Raw snapshots move to the content-addressed snapshot store (app/infra/snapshot_store.py).
+-- New rows carry only the content hash and the store path; raw_bytes stays for legacy rows.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS ingestion_snapshots (
+  version_id   INTEGER NOT NULL REFERENCES ingestion_versions(version_id),
+  source       TEXT NOT NULL,
+  content_hash TEXT NOT NULL,
+  raw_bytes    TEXT,
+  created_at   TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE ingestion_snapshots
+  ADD COLUMN IF NOT EXISTS store_path TEXT;
+
+ALTER TABLE ingestion_snapshots
+  ALTER COLUMN raw_bytes DROP NOT NULL;
+
+-- Every snapshot must be recoverable from exactly one place.
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1
+    FROM pg_constraint
+    WHERE conname = 'ingestion_snapshots_payload_check'
+  ) THEN
+    ALTER TABLE ingestion_snapshots
+      ADD CONSTRAINT ingestion_snapshots_payload_check
+      CHECK (raw_bytes IS NOT NULL OR store_path IS NOT NULL);
+  END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_ingestion_snapshots_version
+  ON ingestion_snapshots (version_id);
+
+GRANT SELECT, INSERT ON TABLE ingestion_snapshots TO mic_app;
+
+COMMIT;
@@ -0,0 +1,29 @@
+-- 005_ingestion_changes.sql
+-- Per-version change sets: which entries were added, modified or removed
+-- relative to the previous version of the same source.
+
+BEGIN;
+
+ALTER TABLE ingestion_versions
+  ADD COLUMN IF NOT EXISTS previous_version_id INTEGER REFERENCES ingestion_versions(version_id);
+
+CREATE TABLE IF NOT EXISTS ingestion_changes (
+  version_id        INTEGER NOT NULL REFERENCES ingestion_versions(version_id),
+  source            TEXT NOT NULL,
+  entry_key         TEXT NOT NULL,
+  change_type       TEXT NOT NULL,
+  row_hash          TEXT,
+  previous_row_hash TEXT,
+
+  PRIMARY KEY (version_id, entry_key),
+
+  CONSTRAINT ingestion_changes_type_check
+    CHECK (change_type IN ('added','modified','removed'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_ingestion_changes_source_version
+  ON ingestion_changes (source, version_id);
+
+GRANT SELECT, INSERT ON TABLE ingestion_changes TO mic_app;
+
+COMMIT;
@@ -0,0 +1,20 @@
+-- 006_version_activation.sql
+-- Explicit activation of ingestion versions (CORE_INFRA_RULES Rule 6).
+-- The pipeline sets activated_at only after the snapshot is locked and the
+-- serving table is updated; verification uses the latest activated version.
+
+BEGIN;
+
+ALTER TABLE ingestion_versions
+  ADD COLUMN IF NOT EXISTS activated_at TIMESTAMPTZ;
+
+-- Versions written before this migration were active as soon as they were recorded.
+UPDATE ingestion_versions
+SET activated_at = ingested_at
+WHERE activated_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_ingestion_versions_source_activated
+  ON ingestion_versions (source, activated_at DESC)
+  WHERE activated_at IS NOT NULL;
+
+COMMIT;
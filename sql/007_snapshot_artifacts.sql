@@ -0,0 +1,14 @@
+-- 007_snapshot_artifacts.sql
+-- Pre-parsed columnar artifact per snapshot (app/ingestion/artifact.py).
+-- Derived from the raw snapshot, stored write-once in the snapshot store;
+-- artifact_hash is the sha256 of the artifact file itself.
+
+BEGIN;
+
+ALTER TABLE ingestion_snapshots
+  ADD COLUMN IF NOT EXISTS artifact_path TEXT,
+  ADD COLUMN IF NOT EXISTS artifact_hash TEXT;
+
+GRANT UPDATE (artifact_path, artifact_hash) ON TABLE ingestion_snapshots TO mic_app;
+
+COMMIT;
@@ -0,0 +1,28 @@
+-- 008_replay_audits.sql
+-- Outcomes of the background replay auditor (scripts/replay_auditor.py):
+-- one row per sampled receipt, with the replay's consistency and latency.
+-- Mismatches are also appended to the ledger as replay_mismatch events.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS replay_audits (
+  receipt_id        TEXT PRIMARY KEY,
+  event_type        TEXT NOT NULL,
+  version_id        INTEGER,
+  hash_verified     BOOLEAN,
+  result_consistent BOOLEAN,
+  error             TEXT,
+  latency_ms        DOUBLE PRECISION NOT NULL,
+  audited_at        TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_replay_audits_audited_at
+  ON replay_audits (audited_at);
+
+-- The auditor samples recent receipts by time.
+CREATE INDEX IF NOT EXISTS idx_events_created_at
+  ON events (created_at);
+
+GRANT SELECT, INSERT ON TABLE replay_audits TO mic_app;
+
+COMMIT;
@@ -0,0 +1,24 @@
+-- 009_match_keys.sql
+-- Prefilter key of each monitored and watchlisted name (app.screening.matching
+-- prefilter_key), indexed so reverse screening can look up the names a list
+-- version's changes may affect. Existing rows are backfilled by the re-screen
+-- step (app.screening.reverse.backfill_match_keys), not here: the key must be
+-- computed exactly as the matcher computes it.
+
+BEGIN;
+
+ALTER TABLE monitored_entities
+  ADD COLUMN IF NOT EXISTS match_key TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_monitored_entities_match_key
+  ON monitored_entities (match_key)
+  WHERE status = 'active';
+
+ALTER TABLE watchlist
+  ADD COLUMN IF NOT EXISTS match_key TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_watchlist_match_key
+  ON watchlist (match_key)
+  WHERE is_active = TRUE;
+
+COMMIT;
@@ -0,0 +1,44 @@
+-- 010_webhook_outbox.sql
+-- Durable webhook outbox. Alerts are written here in the same transaction as
+-- the screening result that caused them and delivered by
+-- scripts/webhook_dispatcher.py with retries; deliveries that exhaust their
+-- attempts stay behind as status 'dead' (the dead-letter queue).
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS webhook_outbox (
+  id               BIGSERIAL PRIMARY KEY,
+  webhook_id       INTEGER NOT NULL,
+  client_id        TEXT NOT NULL,
+  endpoint_url     TEXT NOT NULL,
+  event_type       TEXT NOT NULL,
+  payload          JSONB NOT NULL,
+  status           TEXT NOT NULL DEFAULT 'pending',
+  attempts         INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  last_status_code INTEGER,
+  last_error       TEXT,
+  latency_ms       DOUBLE PRECISION,
+  created_at       TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  delivered_at     TIMESTAMPTZ,
+
+  CONSTRAINT webhook_outbox_status_check
+    CHECK (status IN ('pending','delivered','dead'))
+);
+
+-- The dispatcher claims due deliveries in next_attempt_at order.
+CREATE INDEX IF NOT EXISTS idx_webhook_outbox_due
+  ON webhook_outbox (next_attempt_at)
+  WHERE status = 'pending';
+
+CREATE INDEX IF NOT EXISTS idx_webhook_outbox_dead
+  ON webhook_outbox (client_id, created_at)
+  WHERE status = 'dead';
+
+CREATE INDEX IF NOT EXISTS idx_webhook_outbox_created_at
+  ON webhook_outbox (created_at);
+
+GRANT SELECT, INSERT, UPDATE ON TABLE webhook_outbox TO mic_app;
+GRANT USAGE ON SEQUENCE webhook_outbox_id_seq TO mic_app;
+
+COMMIT;
@@ -0,0 +1,22 @@
+-- 011_webhook_batching.sql
+-- Opt-in coalesced webhook delivery and payload signing.
+-- A webhook with batch_window_seconds set receives its alerts as one batch
+-- per window: the first alert opens an outbox row held until coalesce_until,
+-- later ones are appended to it until the window closes (the dispatcher
+-- clears coalesce_until when it claims the row). Deliveries to webhooks with
+-- a secret carry an HMAC-SHA256 signature (app/infra/outbox.py sign()).
+
+BEGIN;
+
+ALTER TABLE webhooks
+  ADD COLUMN IF NOT EXISTS secret TEXT,
+  ADD COLUMN IF NOT EXISTS batch_window_seconds INTEGER;
+
+ALTER TABLE webhook_outbox
+  ADD COLUMN IF NOT EXISTS coalesce_until TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS idx_webhook_outbox_open_batches
+  ON webhook_outbox (webhook_id, event_type)
+  WHERE coalesce_until IS NOT NULL;
+
+COMMIT;
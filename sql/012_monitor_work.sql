@@ -0,0 +1,50 @@
+-- 012_monitor_work.sql
+-- Monitor cycles split into leased batches, so several monitor workers
+-- (scripts/scheduler_monitor.py) can share one cycle. A cycle covers the
+-- active monitors in id ranges of one batch each; a worker claims a batch with
+-- FOR UPDATE SKIP LOCKED, holds it under a lease it extends at every
+-- checkpoint, and a batch whose lease expired is picked up again from its
+-- checkpoint.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS monitor_cycles (
+  cycle_id      BIGSERIAL PRIMARY KEY,
+  lists         TEXT[],                 -- NULL: every monitored list
+  batches       INTEGER NOT NULL DEFAULT 0,
+  created_at    TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  completed_at  TIMESTAMPTZ
+);
+
+CREATE TABLE IF NOT EXISTS monitor_batches (
+  cycle_id       BIGINT NOT NULL REFERENCES monitor_cycles(cycle_id),
+  batch_no       INTEGER NOT NULL,
+  first_id       UUID NOT NULL,
+  last_id        UUID NOT NULL,
+  status         TEXT NOT NULL DEFAULT 'pending',
+  leased_by      TEXT,
+  lease_until    TIMESTAMPTZ,
+  checkpoint_id  UUID,                  -- last monitor id written
+  attempts       INTEGER NOT NULL DEFAULT 0,
+  checked        INTEGER NOT NULL DEFAULT 0,
+  changed        INTEGER NOT NULL DEFAULT 0,
+  completed_at   TIMESTAMPTZ,
+
+  PRIMARY KEY (cycle_id, batch_no),
+
+  CONSTRAINT monitor_batches_status_check
+    CHECK (status IN ('pending','leased','done'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_monitor_batches_open
+  ON monitor_batches (cycle_id, batch_no)
+  WHERE status <> 'done';
+
+CREATE INDEX IF NOT EXISTS idx_monitor_cycles_open
+  ON monitor_cycles (cycle_id)
+  WHERE completed_at IS NULL;
+
+GRANT SELECT, INSERT, UPDATE ON TABLE monitor_cycles, monitor_batches TO mic_app;
+GRANT USAGE ON SEQUENCE monitor_cycles_cycle_id_seq TO mic_app;
+
+COMMIT;
@@ -0,0 +1,30 @@
+-- 013_check_fingerprints.sql
+-- Compact check state of each monitor, next to the full last_check_result:
+-- {"matching_version": n, "<list>": {"version_id": n, "fingerprint": "<hex>"}}
+-- where the fingerprint hashes the list's whole hit set
+-- (scripts/scheduler_monitor.py). Monitor cycles read and compare only this
+-- column and load last_check_result when a fingerprint differs.
+--
+-- Existing results are backfilled without fingerprints; the first cycle
+-- computes them, falling back to the per-list match flags to decide whether
+-- a monitor's status changed.
+
+BEGIN;
+
+ALTER TABLE monitored_entities
+  ADD COLUMN IF NOT EXISTS last_check_fingerprints JSONB;
+
+UPDATE monitored_entities m
+SET last_check_fingerprints = (
+  SELECT jsonb_object_agg(
+           e.key,
+           CASE WHEN jsonb_typeof(e.value) = 'object'
+                THEN jsonb_build_object('version_id', e.value->'version_id', 'fingerprint', NULL)
+                ELSE e.value END)
+  FROM jsonb_each(m.last_check_result) e
+  WHERE e.key IN ('matching_version', 'ofac_sdn', 'bis_dpl', 'ofac_consolidated')
+)
+WHERE m.last_check_result IS NOT NULL
+  AND m.last_check_fingerprints IS NULL;
+
+COMMIT;
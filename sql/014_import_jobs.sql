@@ -0,0 +1,35 @@
+-- 014_import_jobs.sql
+-- Bulk imports of monitors and watchlist entries (POST /monitor/import,
+-- POST /watchlist/import). The upload is spooled, then validated and COPYed in
+-- chunks in the background; this row tracks its progress for polling.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS import_jobs (
+  job_id           UUID PRIMARY KEY,
+  client_id        TEXT NOT NULL,
+  target           TEXT NOT NULL,
+  format           TEXT NOT NULL,
+  status           TEXT NOT NULL DEFAULT 'queued',
+  bytes_received   BIGINT NOT NULL DEFAULT 0,
+  rows_read        INTEGER NOT NULL DEFAULT 0,
+  rows_imported    INTEGER NOT NULL DEFAULT 0,
+  rows_duplicate   INTEGER NOT NULL DEFAULT 0,
+  rows_rejected    INTEGER NOT NULL DEFAULT 0,
+  errors           JSONB NOT NULL DEFAULT '[]'::jsonb,   -- first rejected rows: {"line", "error"}
+  error            TEXT,                                 -- why a failed job stopped
+  created_at       TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  completed_at     TIMESTAMPTZ,
+
+  CONSTRAINT import_jobs_target_check
+    CHECK (target IN ('monitor','watchlist')),
+  CONSTRAINT import_jobs_status_check
+    CHECK (status IN ('queued','running','done','failed'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_import_jobs_client
+  ON import_jobs (client_id, created_at DESC);
+
+GRANT SELECT, INSERT, UPDATE ON TABLE import_jobs TO mic_app;
+
+COMMIT;
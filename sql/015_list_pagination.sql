@@ -0,0 +1,21 @@
+-- 015_list_pagination.sql
+-- Keyset pagination of GET /monitor, GET /watchlist and GET /webhooks: each
+-- client's rows in (created, id) order, newest first. watchlist also records when its match
+-- status last changed, for the changed_since filter (monitored_entities has
+-- last_status_change_at already).
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_monitored_entities_client_created
+  ON monitored_entities (client_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_watchlist_client_added
+  ON watchlist (client_id, added_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_webhooks_client_created
+  ON webhooks (client_id, created_at DESC, id DESC);
+
+ALTER TABLE watchlist
+  ADD COLUMN IF NOT EXISTS last_status_change_at TIMESTAMPTZ;
+
+COMMIT;
@@ -0,0 +1,33 @@
+-- 016_monitor_event_feed.sql
+-- Change feed over monitor_events (GET /monitor/events). Events are read in
+-- (txid, seq) order: the id of the transaction that wrote them, then insert
+-- order. The feed only serves events whose transaction is older than every
+-- transaction still running (pg_snapshot_xmin), so an event can never appear
+-- behind a cursor a client already holds - which ordering by detected_at or
+-- seq alone cannot promise while several monitor workers write concurrently.
+-- client_id is copied from the monitor so a client's feed is one index range.
+--
+-- The price is lag: pg_snapshot_xmin is held back by the oldest running write
+-- transaction in the database, including an ingestion cycle's (one
+-- transaction from recording a version to activating it). Events committed
+-- meanwhile are served once it ends.
+
+BEGIN;
+
+ALTER TABLE monitor_events
+  ADD COLUMN IF NOT EXISTS client_id TEXT,
+  ADD COLUMN IF NOT EXISTS seq BIGSERIAL,
+  ADD COLUMN IF NOT EXISTS txid XID8 NOT NULL DEFAULT pg_current_xact_id();
+
+UPDATE monitor_events e
+SET client_id = m.client_id
+FROM monitored_entities m
+WHERE m.id = e.monitor_id
+  AND e.client_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_monitor_events_feed
+  ON monitor_events (client_id, txid, seq);
+
+GRANT USAGE ON SEQUENCE monitor_events_seq_seq TO mic_app;
+
+COMMIT;
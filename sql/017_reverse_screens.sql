@@ -0,0 +1,35 @@
+-- 017_reverse_screens.sql
+-- Completed reverse screens (app/screening/reverse.py), one row per target
+-- table, list and activated version. A row records that every row of the
+-- target confirmed against previous_version_id and not re-screened was
+-- thereby confirmed against version_id too: the carried-over rows are not
+-- rewritten, so an activation writes only the rows its change set affects.
+-- A row's confirmed version is the one it was last screened against, followed
+-- forward through this table (reverse.confirmed_versions).
+--
+-- watchlist.checked_versions records the version of each list an entry was
+-- last screened against ({"<list>": version_id}); entries screened before it
+-- existed have none and are re-screened on the next activation.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS reverse_screens (
+  target               TEXT NOT NULL,
+  list_name            TEXT NOT NULL,
+  version_id           INTEGER NOT NULL REFERENCES ingestion_versions(version_id),
+  previous_version_id  INTEGER NOT NULL REFERENCES ingestion_versions(version_id),
+  rescreened           INTEGER NOT NULL DEFAULT 0,
+  completed_at         TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+  PRIMARY KEY (target, list_name, version_id),
+
+  CONSTRAINT reverse_screens_target_check
+    CHECK (target IN ('monitored_entities','watchlist'))
+);
+
+ALTER TABLE watchlist
+  ADD COLUMN IF NOT EXISTS checked_versions JSONB;
+
+GRANT SELECT, INSERT, UPDATE ON TABLE reverse_screens TO mic_app;
+
+COMMIT;
@@ -0,0 +1,27 @@
+from app.ingestion.delta import ChangeSet
+
+
+def test_classify_against_previous_manifest():
+    changes = ChangeSet({"a": "h1", "b": "h2", "c": "h3"}, previous_version_id=4)
+
+    assert changes.classify("a", "h1") is None
+    assert changes.classify("b", "h2-new") == "modified"
+    assert changes.classify("d", "h4") == "added"
+    # A key repeated in the same version is only counted once.
+    assert changes.classify("d", "h4-dup") is None
+
+    assert changes.seen == {"a", "b", "d"}
+    assert changes.added == [("d", "h4")]
+    assert changes.modified == [("b", "h2-new", "h2")]
+    assert changes.removed == [("c", "h3")]
+    assert changes.total == 3
+    assert changes.summary() == {"previous_version_id": 4, "added": 1, "modified": 1, "removed": 1}
+
+
+def test_without_previous_manifest_everything_is_added():
+    changes = ChangeSet({})
+    for key in ("a", "b"):
+        assert changes.classify(key, "h") == "added"
+
+    assert changes.removed == []
+    assert changes.summary()["previous_version_id"] is None
@@ -0,0 +1,34 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.infra.pagination import decode_cursor, encode_cursor
+
+CREATED_AT = datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+
+
+def raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+def test_decode_cursor_round_trips_uuid_and_int_ids():
+    row_id = str(uuid.uuid4())
+    assert decode_cursor(encode_cursor(CREATED_AT, row_id)) == (CREATED_AT.isoformat(), row_id)
+    assert decode_cursor(encode_cursor(CREATED_AT, 42), int) == (CREATED_AT.isoformat(), "42")
+
+
+@pytest.mark.parametrize("cursor, id_type", [
+    ("not-a-cursor", uuid.UUID),
+    (raw_cursor({"created_at": "2026-01-05"}), uuid.UUID),
+    (raw_cursor(["yesterday", str(uuid.uuid4())]), uuid.UUID),
+    (raw_cursor([CREATED_AT.isoformat(), "1 OR 1=1"]), uuid.UUID),
+    (raw_cursor([CREATED_AT.isoformat(), "1 OR 1=1"]), int),
+    (encode_cursor(CREATED_AT, 42), uuid.UUID),
+    (encode_cursor(CREATED_AT, str(uuid.uuid4())), int),
+])
+def test_decode_cursor_rejects_malformed_cursors(cursor, id_type):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor, id_type)
@@ -0,0 +1,110 @@
+import json
+from datetime import datetime, timezone
+
+from app.routers import replay
+from app.screening.index import VersionIndex
+from app.screening.matching import NameIndex
+
+VERIFIED_AT = datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConn:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self):
+        return FakeCursor(self.rows)
+
+    def close(self):
+        pass
+
+
+def receipt(receipt_id, entity, match, hit_keys):
+    payload = {
+        "entity": entity,
+        "match": match,
+        "hit_keys": hit_keys,
+        "data_version": {"version_id": 7, "source": "ofac_sdn", "content_hash": "abc"},
+    }
+    return (receipt_id, "ofac_verification", payload, VERIFIED_AT)
+
+
+def test_bulk_replay_streams_receipt_lines(monkeypatch):
+    index = NameIndex.build("ofac_sdn", 7, [
+        ("sdn:1", "IVANOV, Petr", "Petr", "IVANOV", "individual", "RUSSIA-EO14024"),
+        ("sdn:2", "ACME TRADING LLC", None, "ACME TRADING LLC", "entity", "SDGT"),
+    ])
+    rows = [
+        receipt("r-match", "ACME TRADING LLC", True, ["sdn:2"]),
+        receipt("r-clear", "Jane Unrelated", False, []),
+        receipt("r-stale", "Jane Unrelated", True, ["sdn:1"]),
+    ]
+    monkeypatch.setattr(replay, "get_conn", lambda: FakeConn(rows))
+    monkeypatch.setattr(replay, "load_version", lambda cur, version_id, source: VersionIndex(index, "abc", "snapshot"))
+
+    lines = [json.loads(line) for line in replay._bulk_replay_lines(replay.BulkReplayRequest(version_id=7))]
+    receipts, summary = lines[:-1], lines[-1]
+
+    assert "error" not in summary
+    assert [r["receipt_id"] for r in receipts] == ["r-match", "r-clear", "r-stale"]
+    assert [r["result_consistent"] for r in receipts] == [True, True, False]
+    assert receipts[0]["hits"][0]["key"] == "sdn:2"
+    assert all(r["hash_verified"] for r in receipts)
+    assert summary["receipts"] == 3
+    assert summary["consistent"] == 2
+    assert summary["inconsistent"] == 1
+
+
+def test_bulk_replay_skips_receipts_without_a_version(monkeypatch):
+    index = NameIndex.build("ofac_sdn", 7, [
+        ("sdn:2", "ACME TRADING LLC", None, "ACME TRADING LLC", "entity", "SDGT"),
+    ])
+    no_version = receipt("r-null", "ACME TRADING LLC", True, ["sdn:2"])
+    no_version[2]["data_version"] = None
+    no_version_id = receipt("r-no-id", "ACME TRADING LLC", True, ["sdn:2"])
+    del no_version_id[2]["data_version"]["version_id"]
+    rows = [no_version, receipt("r-match", "ACME TRADING LLC", True, ["sdn:2"]), no_version_id]
+    monkeypatch.setattr(replay, "get_conn", lambda: FakeConn(rows))
+    monkeypatch.setattr(replay, "load_version", lambda cur, version_id, source: VersionIndex(index, "abc", "snapshot"))
+
+    lines = [json.loads(line) for line in replay._bulk_replay_lines(replay.BulkReplayRequest(version_id=7))]
+    receipts, summary = lines[:-1], lines[-1]
+
+    assert "error" not in summary
+    assert [r["receipt_id"] for r in receipts] == ["r-match"]
+    assert summary["receipts"] == 1
+    assert summary["consistent"] == 1
+
+
+def test_bulk_replay_flags_truncated_runs(monkeypatch):
+    index = NameIndex.build("ofac_sdn", 7, [
+        ("sdn:2", "ACME TRADING LLC", None, "ACME TRADING LLC", "entity", "SDGT"),
+    ])
+    rows = [receipt(f"r-{i}", "Jane Unrelated", False, []) for i in range(3)]
+    monkeypatch.setattr(replay, "get_conn", lambda: FakeConn(rows))
+    monkeypatch.setattr(replay, "load_version", lambda cur, version_id, source: VersionIndex(index, "abc", "snapshot"))
+    request = replay.BulkReplayRequest(version_id=7)
+
+    monkeypatch.setattr(replay, "BULK_REPLAY_MAX_RECEIPTS", 2)
+    summary = json.loads(list(replay._bulk_replay_lines(request))[-1])
+    assert summary["receipts"] == 2
+    assert summary["truncated"] is True
+
+    monkeypatch.setattr(replay, "BULK_REPLAY_MAX_RECEIPTS", 3)
+    summary = json.loads(list(replay._bulk_replay_lines(request))[-1])
+    assert summary["receipts"] == 3
+    assert summary["truncated"] is False
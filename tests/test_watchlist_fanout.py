@@ -0,0 +1,94 @@
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import scheduler_watchlist  # noqa: E402
+
+
+class FakeConn:
+    def cursor(self):
+        return SimpleNamespace(close=lambda: None)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeScreener:
+    """Matches any name normalizing to ACME TRADING LLC on every list."""
+
+    screened = []
+
+    def __init__(self, cur, screen_names, workers):
+        self.errors = {}
+        self.indexes = {name: SimpleNamespace(keys=[f"{name}:1"]) for name in screen_names}
+        self.screens = {name: name for name in screen_names}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def data_version(self, screen_name):
+        return {"version_id": 7, "source": screen_name}
+
+    def screen(self, batches, limit=None):
+        for names in batches:
+            FakeScreener.screened.extend(names)
+            yield [
+                {name: [SimpleNamespace(index=0)] if entity.upper() == "ACME TRADING LLC" else []
+                 for name in self.indexes}
+                for entity in names
+            ]
+
+
+def test_run_once_screens_each_name_once_and_issues_receipts_per_entry(monkeypatch):
+    entries = [
+        (1, "client-a", "ACME TRADING LLC", "entity", None),
+        (2, "client-b", "Acme Trading LLC", "entity", "match"),
+        (3, "client-a", "Acme Trading LLC", "individual", None),
+        (4, "client-c", "Jane Unrelated", "individual", "match"),
+    ]
+    receipts, alerts, updates = [], [], {}
+
+    def issue_receipt(cur, screen, entity_name, data_version, hit_keys, now):
+        receipts.append((entity_name, screen, hit_keys))
+        return f"claim-{len(receipts)}"
+
+    FakeScreener.screened = []
+    monkeypatch.setattr(scheduler_watchlist, "get_conn", FakeConn)
+    monkeypatch.setattr(scheduler_watchlist, "get_active_watchlist", lambda cur, ids: entries)
+    monkeypatch.setattr(scheduler_watchlist, "BatchScreener", FakeScreener)
+    monkeypatch.setattr(scheduler_watchlist, "issue_receipt", issue_receipt)
+    monkeypatch.setattr(scheduler_watchlist, "queue_alert",
+                        lambda cur, client_id, entity_name, status, receipt_id, now: alerts.append(
+                            (client_id, entity_name, status, receipt_id)) or 1)
+    monkeypatch.setattr(scheduler_watchlist, "update_watchlist_entry",
+                        lambda cur, watchlist_id, claim_ids, status, versions: updates.update(
+                            {watchlist_id: (claim_ids, status, versions)}))
+
+    scheduler_watchlist.run_once()
+
+    # Entries 1 and 2 share a name and type; entry 3 differs in type only.
+    assert FakeScreener.screened == ["ACME TRADING LLC", "Acme Trading LLC", "Jane Unrelated"]
+
+    # One receipt per list for every entry, each in the entry's own spelling.
+    lists = len(scheduler_watchlist.WATCHLIST_SCREENS)
+    assert len(receipts) == 4 * lists
+    assert [name for name, _, _ in receipts[lists:2 * lists]] == ["Acme Trading LLC"] * lists
+    claims = [set(claim_ids) for claim_ids, _, _ in updates.values()]
+    assert all(len(c) == lists for c in claims)
+    assert all(a.isdisjoint(b) for i, a in enumerate(claims) for b in claims[i + 1:])
+
+    assert {i: status for i, (_, status, _) in updates.items()} == {1: "match", 2: "match", 3: "match", 4: "clear"}
+    assert updates[1][2] == {name: 7 for name in scheduler_watchlist.WATCHLIST_SCREENS}
+    assert alerts == [
+        ("client-a", "ACME TRADING LLC", "match", updates[1][0][-1]),
+        ("client-a", "Acme Trading LLC", "match", updates[3][0][-1]),
+        ("client-c", "Jane Unrelated", "clear", updates[4][0][-1]),
+    ]